@@ -0,0 +1,82 @@
+"""
+Benchmark HTML main-content extraction against the saved corpus.
+
+Each benchmarks/extraction_corpus/<name>.html has a hand-written
+<name>.txt holding the text a reader would consider the main content.
+For every page and engine we report the extraction time and token-level
+precision/recall/F1 against that reference, plus whether the lxml engine
+judged its output clean enough to skip LLM cleanup.
+
+Usage:
+    python bench_extraction.py            # 50 timed runs per page
+    python bench_extraction.py --runs 200
+"""
+
+import argparse
+import os
+import re
+import time
+from collections import Counter
+
+from services.extractor import ContentExtractor
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "extraction_corpus")
+
+
+def tokens(text: str) -> Counter:
+    return Counter(re.findall(r"\w+", text.lower()))
+
+
+def score(extracted: str, reference: str):
+    got, want = tokens(extracted), tokens(reference)
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def time_engine(engine, html: bytes, runs: int):
+    result = engine(html)
+    start = time.perf_counter()
+    for _ in range(runs):
+        engine(html)
+    return result, (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=50, help="timed runs per page and engine")
+    args = parser.parse_args()
+
+    engines = [("bs4", ContentExtractor.extract_with_soup)]
+    if ContentExtractor.available():
+        engines.insert(0, ("lxml", ContentExtractor.extract))
+    else:
+        print("lxml not installed - benchmarking the BeautifulSoup engine only")
+
+    pages = sorted(f[:-5] for f in os.listdir(CORPUS_DIR) if f.endswith(".html"))
+    totals = {name: {"ms": 0.0, "f1": 0.0} for name, _ in engines}
+
+    print(f"{'page':<16} {'engine':<6} {'ms':>8} {'prec':>6} {'recall':>6} {'f1':>6}  confident")
+    for page in pages:
+        with open(os.path.join(CORPUS_DIR, f"{page}.html"), "rb") as f:
+            html = f.read()
+        with open(os.path.join(CORPUS_DIR, f"{page}.txt"), encoding="utf-8") as f:
+            reference = f.read()
+
+        for name, engine in engines:
+            result, ms = time_engine(engine, html, args.runs)
+            precision, recall, f1 = score(result["content"], reference)
+            totals[name]["ms"] += ms
+            totals[name]["f1"] += f1
+            confident = "yes" if result.get("confident") else "no"
+            print(f"{page:<16} {name:<6} {ms:>8.2f} {precision:>6.2f} {recall:>6.2f} {f1:>6.2f}  {confident}")
+
+    print()
+    for name, total in totals.items():
+        print(f"{name:<6} mean {total['ms'] / len(pages):.2f} ms/page, mean F1 {total['f1'] / len(pages):.3f}")
+
+
+if __name__ == "__main__":
+    main()
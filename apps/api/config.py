@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -11,9 +12,32 @@ class Settings(BaseSettings):
             return self.DATABASE_URL.replace("postgres://", "postgresql://", 1)
         return self.DATABASE_URL
 
+    # Postgres connection pool, per engine (the API runs a sync and an async engine, so a replica
+    # holds at most 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections; see GET /health/db)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # below Supabase/Render idle disconnects
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_STATEMENT_TIMEOUT_MS: int = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 = no limit
+    # Behind PgBouncer / Supabase's pooler in transaction mode: no prepared statement cache,
+    # statement timeout set per transaction
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # SQLite profile (ignored for Postgres): WAL lets readers run alongside the single writer
+    SQLITE_WAL: bool = os.getenv("SQLITE_WAL", "true").lower() == "true"
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable enough with WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "15000"))  # wait for the write lock
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # 256MB
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))  # 64MB page cache per connection
+    SQLITE_WRITE_DRAIN_TIMEOUT: float = float(os.getenv("SQLITE_WRITE_DRAIN_TIMEOUT", "30"))  # seconds to finish queued writes at exit
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecretkey")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    # Authenticated users are cached per token subject for this long (0 disables)
+    AUTH_USER_CACHE_TTL: float = float(os.getenv("AUTH_USER_CACHE_TTL", "60"))
+    AUTH_USER_CACHE_MAX: int = int(os.getenv("AUTH_USER_CACHE_MAX", "10000"))
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     GOOGLE_AI_API_KEY: str = os.getenv("GOOGLE_AI_API_KEY", "")
@@ -24,9 +48,89 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
     WORKER_URL: str = os.getenv("WORKER_URL", "http://localhost:8001/transcribe")
+    # Comma-separated worker pool (e.g. http://w1:8001,http://w2:8001); WORKER_URL alone still works
+    WORKER_URLS: str = os.getenv("WORKER_URLS", "")
+    WORKER_HEALTH_INTERVAL: float = float(os.getenv("WORKER_HEALTH_INTERVAL", "15"))
+    WORKER_HEALTH_TIMEOUT: float = float(os.getenv("WORKER_HEALTH_TIMEOUT", "3"))
+    # Consecutive failures that take a worker out of rotation, and for how long
+    WORKER_CIRCUIT_FAILURES: int = int(os.getenv("WORKER_CIRCUIT_FAILURES", "3"))
+    WORKER_CIRCUIT_COOLDOWN: float = float(os.getenv("WORKER_CIRCUIT_COOLDOWN", "60"))
+    # Worker transcriptions are submitted as jobs and polled until done
+    WORKER_POLL_INTERVAL: float = float(os.getenv("WORKER_POLL_INTERVAL", "3"))
+    WORKER_JOB_TIMEOUT: int = int(os.getenv("WORKER_JOB_TIMEOUT", "1800"))  # 30 minutes
+    # Optional: this API's /ingest/worker-callback as reachable from the worker; wakes pollers early
+    WORKER_CALLBACK_URL: str = os.getenv("WORKER_CALLBACK_URL", "")
+    WORKER_CALLBACK_TOKEN: str = os.getenv("WORKER_CALLBACK_TOKEN", "")  # shared with the worker
 
     MAX_CONTENT_LENGTH: int = 10 * 1024 * 1024  # 10MB limit
 
+    # Uploads are streamed to this directory instead of being held in memory
+    UPLOAD_SPOOL_DIR: str = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "vibeknowing_uploads"))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 1MB
+
+    # Large text/JSON (source text, summaries, chunks, artifacts) moves to stored_contents, compressed
+    CONTENT_EXTERNAL_THRESHOLD: int = int(os.getenv("CONTENT_EXTERNAL_THRESHOLD", "8192"))  # bytes
+    CONTENT_COMPRESSION: str = os.getenv("CONTENT_COMPRESSION", "zstd")  # zstd (falls back to zlib if not installed), zlib or none
+    CONTENT_COMPRESSION_LEVEL: int = int(os.getenv("CONTENT_COMPRESSION_LEVEL", "6"))
+
+    # Generated artifacts are versioned per (scope, type, variant); older versions are compacted
+    ARTIFACT_KEEP_VERSIONS: int = int(os.getenv("ARTIFACT_KEEP_VERSIONS", "3"))  # per key, latest included
+    ARTIFACT_KEEP_DAYS: int = int(os.getenv("ARTIFACT_KEEP_DAYS", "30"))  # older non-latest versions go too; 0 = no age limit
+    ARTIFACT_COMPACTION_INTERVAL: float = float(os.getenv("ARTIFACT_COMPACTION_INTERVAL", "3600"))  # seconds; 0 = disabled
+    ARTIFACT_COMPACTION_BATCH: int = int(os.getenv("ARTIFACT_COMPACTION_BATCH", "500"))  # versions deleted per transaction
+
+    # Content-addressed blob store for uploads ('local' or 's3'; MinIO works for s3)
+    BLOB_STORE_BACKEND: str = os.getenv("BLOB_STORE_BACKEND", "local")
+    BLOB_STORE_DIR: str = os.getenv("BLOB_STORE_DIR", "./blobs")
+    BLOB_S3_BUCKET: str = os.getenv("BLOB_S3_BUCKET", "vibeknowing-blobs")
+    BLOB_S3_ENDPOINT_URL: str = os.getenv("BLOB_S3_ENDPOINT_URL", "")  # e.g. http://localhost:9000 for MinIO
+    BLOB_S3_ACCESS_KEY: str = os.getenv("BLOB_S3_ACCESS_KEY", "")
+    BLOB_S3_SECRET_KEY: str = os.getenv("BLOB_S3_SECRET_KEY", "")
+    BLOB_S3_REGION: str = os.getenv("BLOB_S3_REGION", "")
+
+    # Pooled HTTP fetching for the scrapers
+    HTTP_POOL_HOSTS: int = int(os.getenv("HTTP_POOL_HOSTS", "32"))  # hosts kept alive per thread
+    HTTP_POOL_PER_HOST: int = int(os.getenv("HTTP_POOL_PER_HOST", "4"))
+    HTTP_RETRIES: int = int(os.getenv("HTTP_RETRIES", "2"))
+    HTTP_RETRY_BACKOFF: float = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))  # seconds, doubled per retry
+    SCRAPER_MAX_HTML_BYTES: int = int(os.getenv("SCRAPER_MAX_HTML_BYTES", str(10 * 1024 * 1024)))  # larger pages are parsed truncated
+    SCRAPER_MAX_PDF_BYTES: int = int(os.getenv("SCRAPER_MAX_PDF_BYTES", str(100 * 1024 * 1024)))  # spooled to disk; larger PDFs are rejected
+    SCRAPER_MAX_TEXT_CHARS: int = int(os.getenv("SCRAPER_MAX_TEXT_CHARS", "100000"))  # text budget per page/PDF
+
+    # LLM cleanup of scraped pages: 'auto' skips it when the extraction scores clean, or 'always'/'never'
+    SCRAPER_LLM_CLEANUP: str = os.getenv("SCRAPER_LLM_CLEANUP", "auto")
+    CLEANUP_CHUNK_CHARS: int = int(os.getenv("CLEANUP_CHUNK_CHARS", "12000"))  # cleaned in parallel per chunk
+    CLEANUP_MAX_WORKERS: int = int(os.getenv("CLEANUP_MAX_WORKERS", "4"))
+    CLEANUP_MAX_CHARS: int = int(os.getenv("CLEANUP_MAX_CHARS", "400000"))  # longer documents keep the rest as extracted
+
+    # Playwright browser pool (JS-rendered pages)
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", "2"))  # warm Chromium instances
+    BROWSER_CONTEXT_MAX_PAGES: int = int(os.getenv("BROWSER_CONTEXT_MAX_PAGES", "50"))  # pages per context before recycling
+    BROWSER_NAVIGATION_TIMEOUT_MS: int = int(os.getenv("BROWSER_NAVIGATION_TIMEOUT_MS", "60000"))
+    BROWSER_NETWORK_IDLE_MS: int = int(os.getenv("BROWSER_NETWORK_IDLE_MS", "3000"))
+    BROWSER_READY_TIMEOUT_MS: int = int(os.getenv("BROWSER_READY_TIMEOUT_MS", "5000"))  # DOM-stability fallback cap
+    BROWSER_RENDER_TIMEOUT_MS: int = int(os.getenv("BROWSER_RENDER_TIMEOUT_MS", "90000"))  # incl. queueing for a browser
+
+    # Bulk URL ingestion (/ingest/bulk)
+    BULK_INGEST_MAX_ITEMS: int = int(os.getenv("BULK_INGEST_MAX_ITEMS", "200"))
+    BULK_INGEST_CONCURRENCY: int = int(os.getenv("BULK_INGEST_CONCURRENCY", "6"))  # items in flight across all bulk jobs
+    BULK_INGEST_PER_DOMAIN: int = int(os.getenv("BULK_INGEST_PER_DOMAIN", "2"))  # concurrent fetches per domain
+    BULK_INGEST_DOMAIN_DELAY: float = float(os.getenv("BULK_INGEST_DOMAIN_DELAY", "1.0"))  # seconds between fetch starts per domain
+    BULK_INGEST_JOB_TTL_SECONDS: int = int(os.getenv("BULK_INGEST_JOB_TTL_SECONDS", "3600"))  # finished job records kept this long
+
+    # Transcript cache (shared across users, keyed by canonical video ID)
+    TRANSCRIPT_CACHE_TTL_HOURS: int = int(os.getenv("TRANSCRIPT_CACHE_TTL_HOURS", "720"))  # 30 days for new ingests
+    TRANSCRIPT_CACHE_REFRESH_TTL_HOURS: int = int(os.getenv("TRANSCRIPT_CACHE_REFRESH_TTL_HOURS", "24"))  # /ingest/refresh
+
+    # Whisper Settings
+    WHISPER_MAX_CONCURRENCY: int = int(os.getenv("WHISPER_MAX_CONCURRENCY", "4"))  # in-flight requests per provider
+
+    # OCR Settings (scanned PDFs)
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", "0"))  # 0 = one per CPU core
+    OCR_PAGE_BATCH: int = int(os.getenv("OCR_PAGE_BATCH", "8"))  # pages rendered per batch
+    OCR_DPI: int = int(os.getenv("OCR_DPI", "200"))
+    OCR_CACHE_DIR: str = os.getenv("OCR_CACHE_DIR", os.path.join(tempfile.gettempdir(), "vibeknowing_ocr_cache"))
+
     # Email Settings
     EMAIL_PROVIDER: str = os.getenv("EMAIL_PROVIDER", "smtp") # 'smtp' or 'resend'
     EMAIL_FROM: str = os.getenv("EMAIL_FROM", "VibeKnowing <onboarding@resend.dev>")
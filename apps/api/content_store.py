@@ -0,0 +1,207 @@
+"""Out-of-row, compressed storage for large text and JSON model attributes.
+
+Source.content_text/summary, SourceChunk.content_text and Artifact.content
+are ExternalText attributes. Values under CONTENT_EXTERNAL_THRESHOLD bytes
+stay in the model's own column. Larger values are compressed (zstd when
+installed, else zlib) into a stored_contents row that the model points at.
+Listing and scanning sources/artifacts then reads only the small rows.
+
+Reading the attribute loads and decompresses the stored row on first
+access; assigning it decides again where the value goes. Code that loads
+many rows and reads their text should eager-load it with
+load_content(Model, "attr", ...) instead of undefer().
+
+The attributes are not SQL-queryable: a filter, length() or ORDER BY on the
+inline column would silently skip every value stored out of row, so
+class-level access (Source.content_text) raises. Use the inline column
+(Source._content_text) only for load_only()/undefer(), or filter on the
+derived columns (content_length, content_hash, has_summary).
+
+A replaced or deleted value's stored row goes with it through the ORM's
+delete-orphan cascade. Bulk Query.delete() bypasses that: delete such rows
+with delete_rows(), which removes their stored content in the same
+transaction. sweep_orphans() collects whatever was left behind anyway.
+"""
+
+import json
+import zlib
+from typing import Optional, Tuple
+
+from sqlalchemy import exists, inspect, select
+from sqlalchemy.orm import Session, selectinload, undefer
+
+from config import settings
+
+# Optional zstandard import; zlib (stdlib) is the fallback codec
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _codec() -> str:
+    preferred = settings.CONTENT_COMPRESSION
+    if preferred == "zstd" and zstandard is None:
+        return "zlib"
+    return preferred
+
+
+def pack(text: str) -> Tuple[str, int, bytes]:
+    """(codec, uncompressed size, data) for a string."""
+    raw = text.encode("utf-8")
+    codec = _codec()
+    if codec == "zstd":
+        data = zstandard.ZstdCompressor(level=settings.CONTENT_COMPRESSION_LEVEL).compress(raw)
+    elif codec == "zlib":
+        data = zlib.compress(raw, min(settings.CONTENT_COMPRESSION_LEVEL, 9))
+    else:
+        codec, data = "none", raw
+    return codec, len(raw), data
+
+
+def unpack(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Stored content is zstd-compressed; install zstandard to read it")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec == "zlib":
+        raw = zlib.decompress(data)
+    else:
+        raw = data
+    return raw.decode("utf-8")
+
+
+def is_large(text: Optional[str]) -> bool:
+    return text is not None and len(text.encode("utf-8")) >= settings.CONTENT_EXTERNAL_THRESHOLD
+
+
+class NotQueryable:
+    """What an ExternalText attribute is on the class: any SQL or comparison use raises.
+
+    It still exists, so hasattr() and the declarative constructor accept the
+    attribute name as a keyword.
+    """
+
+    def __init__(self, message: str):
+        self._message = message
+
+    def _fail(self, *args, **kwargs):
+        raise TypeError(self._message)
+
+    __clause_element__ = __eq__ = __ne__ = __lt__ = __le__ = __gt__ = __ge__ = __bool__ = _fail
+    __hash__ = object.__hash__
+
+    def __getattr__(self, name):
+        # ilike(), desc(), in_(), property, ...
+        raise TypeError(self._message)
+
+
+class ExternalText:
+    """Model attribute kept inline when small and in stored_contents when large.
+
+    inline is the mapped column attribute (e.g. "_content_text") and stored
+    the many-to-one relationship to StoredContent (e.g. "content_text_stored").
+    On the class, the attribute raises: it has no SQL expression that
+    covers both places (see the module docstring).
+    """
+
+    def __init__(self, inline: str, stored: str, is_json: bool = False):
+        self.inline = inline
+        self.stored = stored
+        self.is_json = is_json
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self._cache = f"_{name}_unpacked"
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return NotQueryable(
+                f"{owner.__name__}.{self.name} is partly stored out of row and can't be used in SQL; "
+                f"use load_content({owner.__name__}, {self.name!r}) to load it, or "
+                f"{owner.__name__}.{self.inline} knowing it misses large values"
+            )
+        # The foreign key is an ordinary column, so rows kept inline never query stored_contents
+        stored = getattr(obj, self.stored)
+        if stored is None:
+            return getattr(obj, self.inline)
+        cached = obj.__dict__.get(self._cache)
+        if cached is not None and cached[0] is stored.data:
+            return cached[1]
+        value = unpack(stored.codec, stored.data)
+        if self.is_json:
+            value = json.loads(value)
+        obj.__dict__[self._cache] = (stored.data, value)
+        return value
+
+    def __set__(self, obj, value):
+        text = json.dumps(value) if self.is_json and value is not None else value
+        if is_large(text):
+            stored_class = inspect(type(obj)).relationships[self.stored].mapper.class_
+            codec, size, data = pack(text)
+            # The replaced row, if any, is removed by the delete-orphan cascade
+            setattr(obj, self.stored, stored_class(codec=codec, size=size, data=data))
+            nullable = getattr(type(obj), self.inline).property.columns[0].nullable
+            setattr(obj, self.inline, None if nullable else "")
+            obj.__dict__[self._cache] = (data, value)
+        else:
+            setattr(obj, self.stored, None)
+            setattr(obj, self.inline, value)
+            obj.__dict__.pop(self._cache, None)
+
+    def changed(self, obj) -> bool:
+        """Whether the value was assigned since the last flush (never triggers a load)."""
+        attrs = inspect(obj).attrs
+        return attrs[self.inline].history.has_changes() or attrs[self.stored].history.has_changes()
+
+
+def load_content(model, *names) -> list:
+    """Query options loading the given ExternalText attributes with the rows, inline or stored."""
+    options = []
+    for name in names:
+        attribute: ExternalText = model.__dict__[name]
+        options.append(undefer(getattr(model, attribute.inline)))
+        options.append(selectinload(getattr(model, attribute.stored)))
+    return options
+
+
+def _external_refs(model) -> list:
+    """(ref column, stored model) for each ExternalText attribute of model."""
+    relationships = inspect(model).relationships
+    refs = []
+    for attribute in vars(model).values():
+        if isinstance(attribute, ExternalText):
+            relationship = relationships[attribute.stored]
+            refs.append((next(iter(relationship.local_columns)), relationship.mapper.class_))
+    return refs
+
+
+def delete_rows(db: Session, model, *criteria, batch_size: int = 500) -> int:
+    """Bulk-delete the model rows matching criteria along with their stored content."""
+    stored = []
+    for ref, stored_model in _external_refs(model):
+        stored.append((stored_model, db.scalars(select(ref).where(*criteria, ref.isnot(None))).all()))
+    deleted = db.query(model).filter(*criteria).delete(synchronize_session=False)
+    # The rows referencing them are gone, so the foreign keys allow this now
+    for stored_model, ids in stored:
+        for start in range(0, len(ids), batch_size):
+            db.query(stored_model).filter(stored_model.id.in_(ids[start:start + batch_size])) \
+                .delete(synchronize_session=False)
+    return deleted
+
+
+def sweep_orphans(db: Session, stored_model, limit: int = 500) -> int:
+    """Delete up to limit stored rows that no foreign key points at any more."""
+    stored_table = stored_model.__table__
+    referenced = [
+        exists().where(fk.parent == stored_table.c.id)
+        for table in stored_model.metadata.sorted_tables
+        for fk in table.foreign_keys
+        if fk.column.table is stored_table
+    ]
+    ids = db.scalars(
+        select(stored_table.c.id).where(*[~clause for clause in referenced]).limit(limit)
+    ).all()
+    if ids:
+        db.query(stored_model).filter(stored_model.id.in_(ids)).delete(synchronize_session=False)
+    return len(ids)
@@ -1,22 +1,305 @@
-from sqlalchemy import create_engine
+import atexit
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Future
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from config import settings
 
 SQLALCHEMY_DATABASE_URL = settings.SQLALCHEMY_DATABASE_URI
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+IS_MEMORY_SQLITE = IS_SQLITE and (":memory:" in SQLALCHEMY_DATABASE_URL or SQLALCHEMY_DATABASE_URL.rstrip("/") == "sqlite:")
+
+
+class PoolMetrics:
+    """Checkout wait times and saturation of one engine's connection pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent = deque(maxlen=1000)  # seconds, for percentiles
+
+    def record(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            self._recent.append(waited)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts, wait_total, wait_max = self.checkouts, self.timeouts, self.wait_total, self.wait_max
+
+        def percentile(p: float) -> float:
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))] * 1000, 2) if recent else 0.0
+
+        data = {
+            "name": self.name,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms_avg": round(wait_total / checkouts * 1000, 2) if checkouts else 0.0,
+            "wait_ms_p95": percentile(0.95),
+            "wait_ms_max": round(wait_max * 1000, 2),
+        }
+        pool = self.pool
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            data.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                # share of size + max_overflow in use; at 1.0 new checkouts queue for DB_POOL_TIMEOUT
+                "saturation": round(pool.checkedout() / capacity, 3) if capacity > 0 else None,
+            })
+        return data
+
+
+def _timed_pool(base, metrics: PoolMetrics):
+    """A pool class that records how long each checkout waited (recreate() keeps the class)."""
+    def _do_get(self):
+        metrics.pool = self
+        start = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_timeout()
+            raise
+        metrics.record(time.perf_counter() - start)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
+
+
+def _pool_args(base, metrics: PoolMetrics) -> dict:
+    if IS_MEMORY_SQLITE:
+        return {}  # SQLAlchemy's single-connection pool for :memory:
+    args = {"poolclass": _timed_pool(base, metrics), "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if not IS_SQLITE:
+        args.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+    return args
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
 
 connect_args = {}
-if "sqlite" in SQLALCHEMY_DATABASE_URL:
-    connect_args = {"check_same_thread": False}
+if IS_SQLITE:
+    # timeout is pysqlite's own wait for a locked database, in seconds
+    connect_args = {"check_same_thread": False, "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+elif settings.DB_STATEMENT_TIMEOUT_MS and not settings.DB_PGBOUNCER:
+    connect_args = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args)
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args,
+                       **_pool_args(QueuePool, sync_pool_metrics))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def _async_url(url: str):
+    """The same database through its asyncio driver: asyncpg for Postgres, aiosqlite for SQLite."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}
+    # asyncpg takes ssl=... rather than libpq's sslmode=... (Supabase/Render URLs carry sslmode=require)
+    args = {}
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"])
+        if sslmode not in ("disable", "allow"):
+            args["ssl"] = sslmode
+    if settings.DB_PGBOUNCER:
+        # Transaction pooling hands each transaction a different server connection,
+        # so asyncpg must not rely on named prepared statements surviving between them
+        args["statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+        url = url.update_query_dict({"prepared_statement_cache_size": "0"})
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        args["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    return url.set(drivername="postgresql+asyncpg"), args
+
+
+# Async engine for the hot read/chat endpoints, so their queries do not block
+# the event loop. Both engines share the models and the same database.
+try:
+    _async_db_url, _async_connect_args = _async_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(_async_db_url, connect_args=_async_connect_args,
+                                       **_pool_args(AsyncAdaptedQueuePool, async_pool_metrics))
+except ImportError as e:
+    print(f"Async database driver not installed ({e}); async endpoints are unavailable")
+    async_engine = None
+
+# expire_on_commit=False: attributes stay readable after commit without an (awaited) refresh
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False) if async_engine else None
+
+
+def _set_local_statement_timeout(connection):
+    # PgBouncer drops startup options, and a session-level SET would leak to other
+    # clients in transaction pooling; SET LOCAL lasts exactly one transaction.
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+
+
+if not IS_SQLITE and settings.DB_PGBOUNCER and settings.DB_STATEMENT_TIMEOUT_MS:
+    event.listen(engine, "begin", _set_local_statement_timeout)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "begin", _set_local_statement_timeout)
+
+
+def pool_status() -> dict:
+    """Pool metrics for both engines; each engine has its own pool of up to size + max_overflow connections."""
+    return {
+        "database": make_url(SQLALCHEMY_DATABASE_URL).get_backend_name(),
+        "pgbouncer": settings.DB_PGBOUNCER,
+        "pools": [sync_pool_metrics.snapshot()] + ([async_pool_metrics.snapshot()] if async_engine else []),
+    }
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    """Per-connection SQLite settings; journal_mode=WAL is persistent but cheap to re-assert."""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL and not IS_MEMORY_SQLITE:
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")  # negative = KiB
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+if IS_SQLITE:
+    event.listen(engine, "connect", _apply_sqlite_profile)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_profile)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database driver not installed (aiosqlite / asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# SQLite allows one writer at a time. Small, frequent writes from background
+# threads and streaming endpoints go through a single writer thread so they
+# queue here, each in its own short transaction, instead of piling up on the
+# database lock and timing out. Postgres handles concurrent writers itself,
+# so there the writes run inline. Writes still queued at exit are finished
+# before the process ends (drain_writes).
+_write_queue: "queue.Queue" = queue.Queue()
+_writer_thread = None
+_writer_lock = threading.Lock()
+
+
+def _writer_loop():
+    while True:
+        item = _write_queue.get()
+        if item is None:
+            return
+        future, fn, args = item
+        if not future.set_running_or_notify_cancel():
+            continue
+        db = SessionLocal()
+        try:
+            result = fn(db, *args)
+            db.commit()
+            future.set_result(result)
+        except BaseException as e:
+            db.rollback()
+            future.set_exception(e)
+        finally:
+            db.close()
+
+
+def _ensure_writer():
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="sqlite-writer", daemon=True)
+            _writer_thread.start()
+
+
+def _log_write_error(future: Future):
+    if future.exception() is not None:
+        print(f"Queued database write failed: {future.exception()}")
+
+
+def submit_write(fn, *args) -> Future:
+    """Run fn(db, *args) in its own short transaction (committed on success); returns a Future.
+
+    fn must not hold on to ORM objects from db: the session is closed once the
+    write commits. Failures are logged; call .result() to have them raised.
+    """
+    future: Future = Future()
+    future.add_done_callback(_log_write_error)
+    if not IS_SQLITE:
+        db = SessionLocal()
+        try:
+            result = fn(db, *args)
+            db.commit()
+            future.set_result(result)
+        except Exception as e:
+            db.rollback()
+            future.set_exception(e)
+        finally:
+            db.close()
+        return future
+
+    _ensure_writer()
+    _write_queue.put((future, fn, args))
+    return future
+
+
+def run_write(fn, *args, timeout: float = None):
+    """submit_write and wait for it; returns fn's result or raises its exception."""
+    return submit_write(fn, *args).result(timeout=timeout)
+
+
+def drain_writes(timeout: float = None):
+    """Finish the queued writes and stop the writer thread (registered to run at exit)."""
+    thread = _writer_thread
+    if thread is None or not thread.is_alive():
+        return
+    pending = _write_queue.qsize()
+    if pending:
+        print(f"Finishing {pending} queued database write(s) before exit")
+    _write_queue.put(None)
+    thread.join(settings.SQLITE_WRITE_DRAIN_TIMEOUT if timeout is None else timeout)
+    if thread.is_alive():
+        print(f"Gave up on {_write_queue.qsize()} queued database write(s) at exit")
+
+
+# The writer is a daemon thread; atexit runs before daemon threads are stopped
+atexit.register(drain_writes)
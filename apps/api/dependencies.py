@@ -1,44 +1,121 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from database import get_db
-from sqlalchemy.orm import Session
+from database import get_async_db, get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 import models
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from config import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+# Verified users by token subject (email), so authenticated requests skip the
+# users lookup. Tokens are still decoded and expiry-checked on every request.
+# In-process only: other replicas see a profile change within the TTL.
+_user_cache: Dict[str, Tuple[float, dict]] = {}
+_user_cache_lock = threading.Lock()
+_USER_COLUMNS = [column.key for column in models.User.__table__.columns]
+
+def _cached_user(email: str) -> Optional[models.User]:
+    with _user_cache_lock:
+        entry = _user_cache.get(email)
+        if entry and entry[0] <= time.monotonic():
+            del _user_cache[email]
+            entry = None
+    if not entry:
+        return None
+    # A fresh detached instance per request: callers can't share or mutate the cached row
+    user = models.User(**entry[1])
+    make_transient_to_detached(user)
+    return user
+
+def _cache_user(user: Optional[models.User]):
+    if user is None or settings.AUTH_USER_CACHE_TTL <= 0:
+        return
+    columns = {key: getattr(user, key) for key in _USER_COLUMNS}
+    with _user_cache_lock:
+        if len(_user_cache) >= settings.AUTH_USER_CACHE_MAX:
+            now = time.monotonic()
+            for key in [k for k, (expires, _) in _user_cache.items() if expires <= now]:
+                del _user_cache[key]
+            if len(_user_cache) >= settings.AUTH_USER_CACHE_MAX:
+                _user_cache.clear()
+        _user_cache[user.email] = (time.monotonic() + settings.AUTH_USER_CACHE_TTL, columns)
+
+def invalidate_cached_user(email: Optional[str] = None):
+    """Drop a user (after a profile change), or everyone when email is None."""
+    with _user_cache_lock:
+        if email is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(email, None)
+
+def _load_user(email: str, db: Session) -> Optional[models.User]:
+    user = _cached_user(email)
+    if user is None:
+        user = db.query(models.User).filter(models.User.email == email).first()
+        _cache_user(user)
+    return user
+
+async def _load_user_async(email: str, db: AsyncSession) -> Optional[models.User]:
+    user = _cached_user(email)
+    if user is None:
+        user = (await db.execute(select(models.User).where(models.User.email == email))).scalars().first()
+        _cache_user(user)
+    return user
+
+def _token_email(token: Optional[str]) -> Optional[str]:
+    """The email (sub) of a valid token, else None."""
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    email = _token_email(token)
+    if email is None:
+        raise _credentials_exception()
         
-    user = db.query(models.User).filter(models.User.email == email).first()
+    user = _load_user(email, db)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
         
     return user
 
 async def get_optional_user(token: Optional[str] = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Optional[models.User]:
-    if not token:
+    email = _token_email(token)
+    if email is None:
         return None
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            return None
-        user = db.query(models.User).filter(models.User.email == email).first()
-        return user
-    except JWTError:
+    return _load_user(email, db)
+
+# Variants for endpoints on the async session (database.get_async_db)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)):
+    email = _token_email(token)
+    if email is None:
+        raise _credentials_exception()
+    user = await _load_user_async(email, db)
+    if user is None:
+        raise _credentials_exception()
+    return user
+
+async def get_optional_user_async(token: Optional[str] = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> Optional[models.User]:
+    email = _token_email(token)
+    if email is None:
         return None
+    return await _load_user_async(email, db)
@@ -1,5 +1,5 @@
 from database import engine
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -52,7 +52,92 @@ def run_hotfix():
             conn.rollback()
             logger.info(f"Skipped 'category_id' on 'curriculums' (might already exist): {e}")
 
+        # 5. Denormalized status/size columns on sources, backfilled once when added
+        added = []
+        for column, ddl in [
+            ("status", "VARCHAR(255)"),
+            ("content_length", "INTEGER NOT NULL DEFAULT 0"),
+            ("content_hash", "VARCHAR(64)"),
+            ("chunk_count", "INTEGER NOT NULL DEFAULT 0"),
+            ("has_summary", "BOOLEAN NOT NULL DEFAULT FALSE"),
+        ]:
+            try:
+                conn.execute(text(f"ALTER TABLE sources ADD {column} {ddl}"))
+                conn.commit()
+                added.append(column)
+                logger.info(f"Successfully added '{column}' to 'sources' table.")
+            except Exception as e:
+                conn.rollback()
+                logger.info(f"Skipped '{column}' on 'sources' (might already exist): {e}")
+
+        for index, column in [("ix_sources_status", "status"), ("ix_sources_content_hash", "content_hash")]:
+            try:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index} ON sources ({column})"))
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logger.info(f"Skipped index '{index}' (table might not exist yet): {e}")
+
+        if added:
+            backfill_source_columns(conn)
+
+        # 6. Sources written with text but no recorded outcome were left "pending" (only empty text is pending)
+        try:
+            result = conn.execute(text(
+                "UPDATE sources SET status = 'completed' WHERE status = 'pending' AND content_length > 0"
+            ))
+            conn.commit()
+            if result.rowcount:
+                logger.info(f"Marked {result.rowcount} sources with content as completed.")
+        except Exception as e:
+            conn.rollback()
+            logger.info(f"Skipped pending status repair: {e}")
+
     logger.info("Hotfix migration complete.")
 
+def backfill_source_columns(conn, batch_size: int = 200):
+    """Fill the denormalized source columns for rows written before they existed."""
+    import json
+    from models import source_content_hash
+
+    try:
+        conn.execute(text(
+            "UPDATE sources SET chunk_count = "
+            "(SELECT COUNT(*) FROM source_chunks WHERE source_chunks.source_id = sources.id)"
+        ))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.info(f"Skipped chunk_count backfill (no source_chunks table yet): {e}")
+
+    ids = [row[0] for row in conn.execute(text("SELECT id FROM sources"))]
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        # One batch of text in memory at a time
+        rows = conn.execute(
+            text("SELECT id, content_text, summary, meta_data FROM sources WHERE id IN :ids")
+            .bindparams(bindparam("ids", expanding=True)),
+            {"ids": batch},
+        ).fetchall()
+        for source_id, content_text, summary, meta_data in rows:
+            if isinstance(meta_data, str):
+                try:
+                    meta_data = json.loads(meta_data)
+                except ValueError:
+                    meta_data = None
+            status = (meta_data or {}).get("status") if isinstance(meta_data, dict) else None
+            conn.execute(text(
+                "UPDATE sources SET status = :status, content_length = :length, "
+                "content_hash = :hash, has_summary = :has_summary WHERE id = :id"
+            ), {
+                "id": source_id,
+                "status": status or ("completed" if content_text else "pending"),
+                "length": len(content_text or ""),
+                "hash": source_content_hash(content_text),
+                "has_summary": bool(summary and summary.strip()),
+            })
+        conn.commit()
+    logger.info(f"Backfilled denormalized columns for {len(ids)} sources.")
+
 if __name__ == "__main__":
     run_hotfix()
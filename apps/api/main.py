@@ -20,6 +20,7 @@ _httpx.Client.__init__ = _patched_client_init
 sys.path.insert(0, str(Path(__file__).parent))
 
 from database import engine
+from dependencies import invalidate_cached_user
 import models
 from routers import ingest, ai, create, sources, categories, auth, oauth, settings
 from config import settings as app_settings
@@ -38,6 +39,18 @@ except Exception as e:
 # Create tables
 models.Base.metadata.create_all(bind=engine)
 
+# Apply Alembic migrations (idempotent against create_all; see migrations/env.py)
+try:
+    from alembic import command
+    from alembic.config import Config
+    command.upgrade(Config(str(Path(__file__).parent / "alembic.ini")), "head")
+except Exception as e:
+    print(f"Alembic migration skipped or failed: {e}")
+
+# Trim old artifact versions in the background (see services/artifact_store.py)
+from services.artifact_store import ArtifactStore
+ArtifactStore.start_compaction()
+
 app = FastAPI(
     title="VibeKnowing V2 API",
     description="Backend API for VibeKnowing V2 - The Knowledge & Content Creation Suite",
@@ -74,6 +87,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Page cursors (sources listings, chat history) are returned as headers
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
 )
 
 app.include_router(ingest.router)
@@ -97,6 +112,12 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/db")
+async def db_pool_health():
+    """Connection pool checkout waits and saturation, for sizing replicas against the DB connection limit."""
+    from database import pool_status
+    return pool_status()
+
 @app.post("/reset-db-secret")
 async def reset_db_secret():
     """
@@ -106,6 +127,7 @@ async def reset_db_secret():
     try:
         force_reset_db.force_reset()
         seed_db.seed()
+        invalidate_cached_user()
         return {"status": "success", "message": "Database reset and seeded successfully."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to reset DB: {str(e)}"}
@@ -124,6 +146,7 @@ async def purge_db_secret(key: str):
     import purge_db
     try:
         purge_db.purge_database()
+        invalidate_cached_user()
         return {"status": "success", "message": "Database successfully purged (all data deleted)."}
     except Exception as e:
         return {"status": "error", "message": f"Failed to purge DB: {str(e)}"}
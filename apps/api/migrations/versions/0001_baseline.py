@@ -0,0 +1,20 @@
+"""Baseline: the schema created by create_all and hotfix_migration.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing databases already have these tables; new ones get them from create_all
+    pass
+
+
+def downgrade():
+    pass
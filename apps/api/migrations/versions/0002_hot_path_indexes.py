@@ -0,0 +1,46 @@
+"""Composite indexes for the hot read paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+- sources(url): URL dedup in ingest_url / bulk ingest
+- sources(project_id, created_at): project details and per-project source lists
+- artifacts(source_id, type, created_at), artifacts(project_id, type):
+  every GET quiz/flashcards/podcast/tutorial lookup
+- chat_messages(source_id, created_at), (category_id, created_at): chat history
+- projects(owner_id, coalesce(updated_at, created_at)): list_projects order
+- curriculum_nodes(curriculum_id, sequence_order): curriculum views
+
+Run bench_query_plans.py to see the query plans before and after.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_sources_url", "sources", ["url"]),
+    ("ix_sources_project_created", "sources", ["project_id", "created_at"]),
+    ("ix_artifacts_source_type_created", "artifacts", ["source_id", "type", "created_at"]),
+    ("ix_artifacts_project_type", "artifacts", ["project_id", "type"]),
+    ("ix_chat_messages_source_created", "chat_messages", ["source_id", "created_at"]),
+    ("ix_chat_messages_category_created", "chat_messages", ["category_id", "created_at"]),
+    ("ix_projects_owner_activity", "projects", ["owner_id", sa.text("coalesce(updated_at, created_at)")]),
+    ("ix_curriculum_nodes_curriculum_order", "curriculum_nodes", ["curriculum_id", "sequence_order"]),
+]
+
+
+def upgrade():
+    # IF NOT EXISTS: databases created after this revision already got them from create_all
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,114 @@
+"""Move large text/JSON out of row into compressed stored_contents
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+Adds stored_contents and a *_ref column next to each large attribute
+(sources.content_text/summary, source_chunks.content_text,
+artifacts.content), then moves existing values of CONTENT_EXTERNAL_THRESHOLD
+bytes or more out of their rows, compressed (see content_store.py).
+
+The freed space is reused by new rows; to shrink the files run VACUUM on
+SQLite or VACUUM FULL / pg_repack on Postgres.
+"""
+
+import json
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+from config import settings
+from content_store import pack, unpack
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# table, column, ref column, value left in the column when stored out of row
+TARGETS = [
+    ("sources", "content_text", "content_text_ref", None),
+    ("sources", "summary", "summary_ref", None),
+    ("source_chunks", "content_text", "content_ref", ""),
+    ("artifacts", "content", "content_ref", None),
+]
+BATCH_SIZE = 200
+
+stored_contents = sa.table(
+    "stored_contents",
+    sa.column("id"), sa.column("codec"), sa.column("size"), sa.column("data", sa.LargeBinary),
+)
+
+
+def _columns(inspector, table):
+    return {c["name"] for c in inspector.get_columns(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("stored_contents"):
+        op.create_table(
+            "stored_contents",
+            sa.Column("id", sa.String, primary_key=True),
+            sa.Column("codec", sa.String, nullable=False),
+            sa.Column("size", sa.Integer, nullable=False),
+            sa.Column("data", sa.LargeBinary, nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        )
+
+    for table, column, ref, placeholder in TARGETS:
+        if not inspector.has_table(table):
+            continue
+        if ref not in _columns(inspector, table):
+            op.add_column(table, sa.Column(ref, sa.String, nullable=True))
+            if bind.dialect.name != "sqlite":
+                op.create_foreign_key(f"fk_{table}_{ref}", table, "stored_contents", [ref], ["id"])
+        _move_out(bind, table, column, ref, placeholder)
+
+
+def _move_out(bind, table, column, ref, placeholder):
+    rows_table = sa.table(table, sa.column("id"), sa.column(column), sa.column(ref))
+    large = sa.func.length(sa.cast(rows_table.c[column], sa.Text)) >= settings.CONTENT_EXTERNAL_THRESHOLD
+    moved = 0
+    while True:
+        # Moved rows get a ref, so each batch picks up where the last one stopped
+        rows = bind.execute(
+            sa.select(rows_table.c.id, rows_table.c[column])
+            .where(rows_table.c[ref].is_(None), large).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        for row_id, value in rows:
+            text = value if isinstance(value, str) else json.dumps(value)
+            codec, size, data = pack(text)
+            stored_id = str(uuid.uuid4())
+            bind.execute(stored_contents.insert().values(id=stored_id, codec=codec, size=size, data=data))
+            bind.execute(rows_table.update().where(rows_table.c.id == row_id)
+                         .values({column: placeholder, ref: stored_id}))
+        moved += len(rows)
+    if moved:
+        print(f"Moved {moved} large {table}.{column} values to stored_contents")
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table, column, ref, _ in reversed(TARGETS):
+        if not inspector.has_table(table) or ref not in _columns(inspector, table):
+            continue
+        rows_table = sa.table(table, sa.column("id"), sa.column(ref))
+        rows = bind.execute(
+            sa.select(rows_table.c.id, stored_contents.c.codec, stored_contents.c.data)
+            .join(stored_contents, stored_contents.c.id == rows_table.c[ref])
+        ).fetchall()
+        for row_id, codec, data in rows:
+            bind.execute(sa.text(f"UPDATE {table} SET {column} = :value, {ref} = NULL WHERE id = :id"),
+                         {"value": unpack(codec, data), "id": row_id})
+        with op.batch_alter_table(table) as batch:
+            if bind.dialect.name != "sqlite":
+                batch.drop_constraint(f"fk_{table}_{ref}", type_="foreignkey")
+            batch.drop_column(ref)
+    op.drop_table("stored_contents")
@@ -0,0 +1,39 @@
+"""Chat history indexes for (created_at, id) keyset paging
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+- chat_messages(source_id, created_at, id): GET /ai/chat/history/{source_id}
+- chat_messages(category_id, user_id, created_at, id): GET /ai/chat/history-path/{category_id}
+- chat_messages(user_id, created_at, id): GET /ai/chat/history-global
+
+The two indexes from 0002 are rebuilt with the extra columns under the same
+names, so the page query is answered from the index in both directions.
+"""
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_chat_messages_source_created", ["source_id", "created_at", "id"], ["source_id", "created_at"]),
+    ("ix_chat_messages_category_created", ["category_id", "user_id", "created_at", "id"], ["category_id", "created_at"]),
+    ("ix_chat_messages_user_created", ["user_id", "created_at", "id"], None),
+]
+
+
+def upgrade():
+    for name, columns, _ in INDEXES:
+        op.drop_index(name, table_name="chat_messages", if_exists=True)
+        op.create_index(name, "chat_messages", columns)
+
+
+def downgrade():
+    for name, _, previous in reversed(INDEXES):
+        op.drop_index(name, table_name="chat_messages", if_exists=True)
+        if previous:
+            op.create_index(name, "chat_messages", previous)
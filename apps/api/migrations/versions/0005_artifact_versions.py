@@ -0,0 +1,124 @@
+"""Artifact versions keyed by (scope, type, variant) with a latest pointer
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+Adds artifacts.scope/variant/version and the artifact_heads table, then
+numbers the existing generated artifacts per key in created_at order and
+points each key at its newest one (see services/artifact_store.py).
+Variants of old rows are recovered from the titles they were saved with.
+Old versions beyond the retention policy are removed afterwards by the
+compaction thread, not here.
+"""
+
+import re
+import uuid
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TYPES = [
+    "summary", "quiz", "flashcard", "social_media", "diagram", "article", "podcast",
+    "linkedin_post", "instagram_post",
+]
+NEW_COLUMNS = [("scope", sa.String), ("variant", sa.String), ("version", sa.Integer)]
+INDEX = ("ix_artifacts_key_version", ["scope", "type", "variant", "version"])
+
+artifacts = sa.table(
+    "artifacts",
+    sa.column("id"), sa.column("project_id"), sa.column("source_id"), sa.column("type"),
+    sa.column("title"), sa.column("created_at"),
+    sa.column("scope"), sa.column("variant"), sa.column("version", sa.Integer),
+)
+artifact_heads = sa.table(
+    "artifact_heads",
+    sa.column("id"), sa.column("scope"), sa.column("type"), sa.column("variant"),
+    sa.column("artifact_id"), sa.column("version", sa.Integer),
+)
+
+
+def _legacy_variant(row) -> str:
+    """Style/platform an old artifact was generated for, from its title."""
+    title = row.title or ""
+    if row.type in ("summary", "social_media") or (row.type == "diagram" and not row.source_id):
+        # "Article Summary", "Twitter Post for ...", "Flowchart Diagram" (/create/diagram)
+        return title.split(" ", 1)[0].lower() if title else ""
+    if row.type in ("linkedin_post", "instagram_post"):
+        # "Linkedin Post (professional)"
+        match = re.search(r"\((.*)\)\s*$", title)
+        return match.group(1).lower() if match else ""
+    return ""
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("artifacts"):
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("artifacts")}
+    for name, type_ in NEW_COLUMNS:
+        if name not in columns:
+            op.add_column("artifacts", sa.Column(name, type_, nullable=True))
+    op.create_index(INDEX[0], "artifacts", INDEX[1], if_not_exists=True)
+
+    if not inspector.has_table("artifact_heads"):
+        op.create_table(
+            "artifact_heads",
+            sa.Column("id", sa.String, primary_key=True),
+            sa.Column("scope", sa.String, nullable=False),
+            sa.Column("type", sa.String, nullable=False),
+            sa.Column("variant", sa.String, nullable=False),
+            sa.Column("artifact_id", sa.String, sa.ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("version", sa.Integer, nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True)),
+            sa.UniqueConstraint("scope", "type", "variant", name="uq_artifact_heads_key"),
+        )
+
+    rows = bind.execute(
+        sa.select(artifacts.c.id, artifacts.c.project_id, artifacts.c.source_id, artifacts.c.type, artifacts.c.title)
+        .where(artifacts.c.type.in_(VERSIONED_TYPES), artifacts.c.scope.is_(None),
+               sa.or_(artifacts.c.source_id.isnot(None), artifacts.c.project_id.isnot(None)))
+        .order_by(artifacts.c.created_at, artifacts.c.id)
+    ).fetchall()
+    if not rows:
+        return
+
+    # Runs before the API serves requests, so no key has a head yet
+    latest = {}
+    versions = defaultdict(int)
+    for row in rows:
+        scope = f"source:{row.source_id}" if row.source_id else f"project:{row.project_id}"
+        key = (scope, row.type, _legacy_variant(row))
+        versions[key] += 1
+        bind.execute(artifacts.update().where(artifacts.c.id == row.id)
+                     .values(scope=scope, variant=key[2], version=versions[key]))
+        latest[key] = row.id
+
+    bind.execute(artifact_heads.insert(), [
+        {"id": str(uuid.uuid4()), "scope": scope, "type": type_, "variant": variant,
+         "artifact_id": artifact_id, "version": versions[(scope, type_, variant)]}
+        for (scope, type_, variant), artifact_id in latest.items()
+    ])
+    print(f"Versioned {len(rows)} artifacts under {len(latest)} keys")
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    op.drop_table("artifact_heads", if_exists=True)
+    if not inspector.has_table("artifacts"):
+        return
+    op.drop_index(INDEX[0], table_name="artifacts", if_exists=True)
+    columns = {c["name"] for c in inspector.get_columns("artifacts")}
+    with op.batch_alter_table("artifacts") as batch:
+        for name, _ in reversed(NEW_COLUMNS):
+            if name in columns:
+                batch.drop_column(name)
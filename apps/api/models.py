@@ -1,12 +1,19 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, JSON, Boolean
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, JSON, Boolean, Index, LargeBinary, UniqueConstraint, event, inspect
+from sqlalchemy.orm import deferred, relationship
+from sqlalchemy.sql import func, false
+from typing import Optional
 from database import Base
+from content_store import ExternalText
+import hashlib
 import uuid
+from datetime import datetime, timezone
 
 def generate_uuid():
     return str(uuid.uuid4())
 
+def utcnow():
+    return datetime.now(timezone.utc)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -50,34 +57,105 @@ class Project(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Matches the list_projects sort key (never-updated projects fall back to created_at)
+    __table_args__ = (Index("ix_projects_owner_activity", owner_id, func.coalesce(updated_at, created_at)),)
+
     owner = relationship("User", back_populates="projects")
     category = relationship("Category", back_populates="projects")
     sources = relationship("Source", back_populates="project", cascade="all, delete-orphan")
     artifacts = relationship("Artifact", back_populates="project", cascade="all, delete-orphan")
 
+class StoredContent(Base):
+    """A large text/JSON value moved out of its row (see content_store.py)."""
+    __tablename__ = "stored_contents"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    codec = Column(String, nullable=False) # zstd, zlib, none
+    size = Column(Integer, nullable=False) # uncompressed bytes
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+def _stored(ref_column):
+    # One StoredContent row per value; replacing or deleting the owner deletes it
+    return relationship(StoredContent, foreign_keys=[ref_column], cascade="all, delete-orphan", single_parent=True)
+
 class Source(Base):
     __tablename__ = "sources"
 
     id = Column(String, primary_key=True, default=generate_uuid)
     project_id = Column(String, ForeignKey("projects.id"))
     type = Column(String) # youtube, pdf, web, text
-    url = Column(String, nullable=True)
+    url = Column(String, nullable=True, index=True) # URL dedup on ingest
     title = Column(String, nullable=True)
-    content_text = Column(Text, nullable=True) # Full transcript or extracted text
-    summary = Column(Text, nullable=True) # AI-generated summary
+    # Large text is deferred inline, or compressed in stored_contents above
+    # CONTENT_EXTERNAL_THRESHOLD; load it up front with content_store.load_content()
+    _content_text = deferred(Column("content_text", Text, nullable=True))
+    content_text_ref = Column(String, ForeignKey("stored_contents.id", name="fk_sources_content_text_ref"), nullable=True)
+    content_text_stored = _stored(content_text_ref)
+    content_text = ExternalText("_content_text", "content_text_stored") # Full transcript or extracted text
+    _summary = deferred(Column("summary", Text, nullable=True))
+    summary_ref = Column(String, ForeignKey("stored_contents.id", name="fk_sources_summary_ref"), nullable=True)
+    summary_stored = _stored(summary_ref)
+    summary = ExternalText("_summary", "summary_stored") # AI-generated summary
     meta_data = Column(JSON, nullable=True) # Duration, author, etc.
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Denormalized so listings and status checks never read the text columns.
+    # status/content_length/content_hash/has_summary are kept in sync by
+    # _sync_source_columns below; chunk_count by whoever writes the chunks.
+    status = Column(String, nullable=True, index=True) # queued, processing, completed, partial, failed
+    content_length = Column(Integer, nullable=False, default=0, server_default="0")
+    content_hash = Column(String, nullable=True, index=True) # sha256 of content_text
+    chunk_count = Column(Integer, nullable=False, default=0, server_default="0")
+    has_summary = Column(Boolean, nullable=False, default=False, server_default=false())
+
+    __table_args__ = (Index("ix_sources_project_created", project_id, created_at),)
+
     project = relationship("Project", back_populates="sources")
     chunks = relationship("SourceChunk", back_populates="source", cascade="all, delete-orphan")
 
+def source_content_hash(text: Optional[str]) -> Optional[str]:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else None
+
+def set_source_status(source: "Source", status: str, error: Optional[str] = None):
+    """Record a writer's outcome in meta_data; Source.status follows on flush."""
+    meta = {k: v for k, v in (source.meta_data or {}).items() if k != "error"}
+    meta["status"] = status
+    if error:
+        meta["error"] = error
+    source.meta_data = meta
+
+@event.listens_for(Source, "before_insert")
+@event.listens_for(Source, "before_update")
+def _sync_source_columns(mapper, connection, target):
+    """Derive the denormalized columns from whatever changed in this flush."""
+    state = inspect(target)
+    inserting = not state.has_identity
+    # Attribute history never triggers a load, so unchanged deferred text stays unread
+    text_changed = Source.__dict__["content_text"].changed(target)
+    if inserting or text_changed:
+        text = target.content_text or ""
+        target.content_length = len(text)
+        target.content_hash = source_content_hash(text)
+    if inserting or Source.__dict__["summary"].changed(target):
+        target.has_summary = bool(target.summary and target.summary.strip())
+    status = (target.meta_data or {}).get("status")
+    if status and (inserting or state.attrs.meta_data.history.has_changes()):
+        target.status = status
+    elif not status and (inserting or text_changed) and not state.attrs.status.history.has_changes():
+        # Writers that don't record an outcome: the text itself says whether the source is usable
+        target.status = "completed" if target.content_length else "pending"
+
 class SourceChunk(Base):
     __tablename__ = "source_chunks"
 
     id = Column(String, primary_key=True, default=generate_uuid)
     source_id = Column(String, ForeignKey("sources.id", ondelete="CASCADE"), index=True)
     project_id = Column(String, ForeignKey("projects.id", ondelete="CASCADE"), index=True) # For cross-source filtering
-    content_text = Column(Text, nullable=False)
+    _content_text = Column("content_text", Text, nullable=False) # "" when stored out of row
+    content_ref = Column(String, ForeignKey("stored_contents.id", name="fk_source_chunks_content_ref"), nullable=True)
+    content_stored = _stored(content_ref)
+    content_text = ExternalText("_content_text", "content_stored")
     embedding = Column(JSON, nullable=True) # Stores List[float]
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -91,12 +169,65 @@ class Artifact(Base):
     source_id = Column(String, ForeignKey("sources.id"), nullable=True) # Link to specific source if applicable
     type = Column(String) # summary, quiz, flashcard, article, linkedin_post, diagram
     title = Column(String, nullable=True)
-    content = Column(JSON) # Structured content (e.g. Q&A list, or markdown text)
+    # Versioned artifacts (see services/artifact_store.py); NULL for single-row caches like tutorials
+    scope = Column(String, nullable=True) # source:<id> or project:<id>
+    variant = Column(String, nullable=True) # style/platform, "" when the type has none
+    version = Column(Integer, nullable=True)
+    _content = Column("content", JSON) # Structured content (e.g. Q&A list, or markdown text)
+    content_ref = Column(String, ForeignKey("stored_contents.id", name="fk_artifacts_content_ref"), nullable=True) # large content (tutorials)
+    content_stored = _stored(content_ref)
+    content = ExternalText("_content", "content_stored", is_json=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_artifacts_source_type_created", source_id, type, created_at),
+        Index("ix_artifacts_project_type", project_id, type),
+        Index("ix_artifacts_key_version", scope, type, variant, version),
+    )
+
     project = relationship("Project", back_populates="artifacts")
     source = relationship("Source", backref="artifacts")
 
+class ArtifactHead(Base):
+    """Latest version of each (scope, type, variant) artifact key."""
+    __tablename__ = "artifact_heads"
+    __table_args__ = (UniqueConstraint("scope", "type", "variant", name="uq_artifact_heads_key"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    scope = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    variant = Column(String, nullable=False, default="")
+    artifact_id = Column(String, ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow)
+
+class TranscriptCache(Base):
+    """Video transcripts shared across users, keyed by platform + canonical video ID."""
+    __tablename__ = "transcript_cache"
+    __table_args__ = (UniqueConstraint("platform", "video_id", name="uq_transcript_cache_video"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    platform = Column(String, nullable=False) # youtube, ted, instagram, tiktok, vimeo
+    video_id = Column(String, nullable=False)
+    title = Column(String, nullable=True)
+    transcript = Column(Text, nullable=False)
+    method = Column(String, nullable=True) # youtube_transcript_api, subtitles, audio, worker_*
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+class BlobExtraction(Base):
+    """Text extracted from an uploaded file, keyed by the file's sha256."""
+    __tablename__ = "blob_extractions"
+    __table_args__ = (UniqueConstraint("content_hash", "variant", name="uq_blob_extraction_variant"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    content_hash = Column(String, nullable=False, index=True) # sha256 of the uploaded bytes
+    variant = Column(String, nullable=False, default="default") # default, ocr (force_ocr PDFs)
+    source_type = Column(String) # audio, pdf, docx, text
+    content_text = Column(Text, nullable=False)
+    method = Column(String, nullable=True) # worker, whisper, pypdf, ocr, ...
+    size_bytes = Column(Integer, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
@@ -106,7 +237,15 @@ class ChatMessage(Base):
     user_id = Column(String, ForeignKey("users.id"), nullable=True)
     role = Column(String)  # 'user' or 'assistant'
     content = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set in Python too: sub-second timestamps keep (created_at, id) in write order on SQLite
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+
+    # History is paged by (created_at, id) within each scope
+    __table_args__ = (
+        Index("ix_chat_messages_source_created", source_id, created_at, id),
+        Index("ix_chat_messages_category_created", category_id, user_id, created_at, id),
+        Index("ix_chat_messages_user_created", user_id, created_at, id),
+    )
 
     source = relationship("Source", backref="chat_messages")
     category = relationship("Category", backref="chat_messages")
@@ -174,4 +313,6 @@ class CurriculumNode(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (Index("ix_curriculum_nodes_curriculum_order", curriculum_id, sequence_order),)
+
     curriculum = relationship("Curriculum", back_populates="nodes")
@@ -18,7 +18,7 @@ def purge_database():
             pass
 
         tables = [
-            "chat_messages", "artifacts", "sources", "projects", 
+            "chat_messages", "artifact_heads", "artifacts", "sources", "projects", 
             "categories", "otps", "users", "chunks", "summaries", "transcripts"
         ]
 
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, BackgroundTasks
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 from typing import Optional
-from database import get_db
+from database import get_async_db, get_db
 import models
+from content_store import delete_rows, load_content
 from services.ai import AIService
-from dependencies import get_optional_user, get_current_user
+from services.artifact_store import ArtifactStore
+from dependencies import get_optional_user, get_current_user, get_optional_user_async
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse
 import json
@@ -83,6 +87,22 @@ def _tutorial_scope(content_len: int, source_count: int = 1) -> tuple[int, int]:
         return 5, 3          # 15 chapters total — very large corpus
 
 
+def _ingested_sources(db: Session, project_ids: list) -> list:
+    """Sources with extracted text, loaded in one query with their (deferred) text columns."""
+    sources = db.query(models.Source).options(
+        *load_content(models.Source, "content_text", "summary")
+    ).filter(
+        models.Source.project_id.in_(project_ids),
+        models.Source.content_length > 0,
+    ).order_by(models.Source.created_at).all()
+    return [s for s in sources if s.content_text.strip()]
+
+
+def _artifacts():
+    """Artifact select with content loaded too, inline or stored (no lazy loads on the async session)."""
+    return select(models.Artifact).options(*load_content(models.Artifact, "content"))
+
+
 def _get_ai_params(request: Request, task: str = "chat") -> dict:
     """
     Extract AI provider/model/key from request headers.
@@ -130,10 +150,11 @@ class ChatRequest(BaseModel):
 
 
 @router.post("/chat")
-async def chat(request_body: ChatRequest, request: Request, db: Session = Depends(get_db), current_user: Optional[models.User] = Depends(get_optional_user)):
+async def chat(request_body: ChatRequest, request: Request, db: AsyncSession = Depends(get_async_db), current_user: Optional[models.User] = Depends(get_optional_user_async)):
     source = None
     if request_body.source_id:
-        source = db.query(models.Source).filter(models.Source.id == request_body.source_id).first()
+        source = await db.scalar(select(models.Source).options(*load_content(models.Source, "content_text"))
+                                 .where(models.Source.id == request_body.source_id))
         if not source or not source.content_text:
             raise HTTPException(status_code=404, detail="Source content not found")
 
@@ -152,7 +173,7 @@ async def chat(request_body: ChatRequest, request: Request, db: Session = Depend
         content=request_body.message
     )
     db.add(user_message)
-    db.commit()
+    await db.commit()
 
     ai_params = _get_ai_params(request, "chat")
     print(f"[RAG] User: {current_user.email if current_user else 'ANONYMOUS'} | Scope: {request_body.scope} | Provider: {ai_params.get('provider')} | Has API Key: {bool(ai_params.get('api_key'))}")
@@ -177,27 +198,31 @@ async def chat(request_body: ChatRequest, request: Request, db: Session = Depend
     print(f"[RAG] Embedding generated: {bool(query_vector)} | Vector length: {len(query_vector) if query_vector else 0}")
     
     if query_vector:
-        # Fetch chunks depending on scope
+        # Fetch chunks depending on scope, each with its source's title (used for citations)
+        chunks_query = select(models.SourceChunk).options(
+            joinedload(models.SourceChunk.source).load_only(models.Source.id, models.Source.title),
+            *load_content(models.SourceChunk, "content_text"),
+        )
         if request_body.scope == "all":
             if current_user:
-                chunks = db.query(models.SourceChunk)\
-                    .join(models.Source, models.SourceChunk.source_id == models.Source.id)\
-                    .join(models.Project, models.Source.project_id == models.Project.id)\
-                    .filter(models.Project.owner_id == current_user.id).all()
+                chunks = (await db.scalars(chunks_query
+                    .join(models.Source, models.SourceChunk.source_id == models.Source.id)
+                    .join(models.Project, models.Source.project_id == models.Project.id)
+                    .where(models.Project.owner_id == current_user.id))).all()
             else:
                 chunks = []
         elif request_body.scope == "category" and request_body.category_id:
             # Filter by Learning Path (Category)
-            chunks = db.query(models.SourceChunk)\
-                .join(models.Source, models.SourceChunk.source_id == models.Source.id)\
-                .join(models.Project, models.Source.project_id == models.Project.id)\
-                .filter(models.Project.category_id == request_body.category_id).all()
+            chunks = (await db.scalars(chunks_query
+                .join(models.Source, models.SourceChunk.source_id == models.Source.id)
+                .join(models.Project, models.Source.project_id == models.Project.id)
+                .where(models.Project.category_id == request_body.category_id))).all()
         else:
             # scope == "source" — requires a valid source
             if source:
-                chunks = db.query(models.SourceChunk).filter(
+                chunks = (await db.scalars(chunks_query.where(
                     models.SourceChunk.source_id == source.id
-                ).all()
+                ))).all()
             else:
                 chunks = []
             
@@ -232,19 +257,23 @@ async def chat(request_body: ChatRequest, request: Request, db: Session = Depend
     if not system_memory:
         # Fallback to whole document(s) if no chunks
         if request_body.scope == "all":
+            # Only sources with text, with content_text loaded in the same query (it is deferred)
+            with_text = select(models.Source).options(*load_content(models.Source, "content_text"))\
+                .where(models.Source.content_length > 0)
             if current_user:
-                all_sources = db.query(models.Source)\
-                    .join(models.Project, models.Source.project_id == models.Project.id)\
-                    .filter(models.Project.owner_id == current_user.id).all()
+                all_sources = (await db.scalars(with_text
+                    .join(models.Project, models.Source.project_id == models.Project.id)
+                    .where(models.Project.owner_id == current_user.id))).all()
             elif source:
-                all_sources = db.query(models.Source).filter(
+                all_sources = (await db.scalars(with_text.where(
                     models.Source.project_id == source.project_id
-                ).all()
+                ))).all()
             else:
                 all_sources = []
             for idx, s in enumerate(all_sources):
-                if s.content_text:
-                    system_memory += f"[ID: {idx+1} | Source: {s.title}]\n{s.content_text}\n\n"
+                system_memory += f"[ID: {idx+1} | Source: {s.title}]\n{s.content_text}\n\n"
+                if len(system_memory) >= 50000:
+                    break
             system_memory = system_memory[:50000]
         elif source:
             system_memory = f"[ID: 1 | Source: {source.title}]\n{source.content_text[:30000]}"
@@ -294,9 +323,8 @@ async def chat(request_body: ChatRequest, request: Request, db: Session = Depend
                         full_response.append(chunk.text)
                         yield chunk.text
         finally:
-            # Save assistant message after streaming completes
-            from database import SessionLocal
-            new_db = SessionLocal()
+            # Save assistant message after streaming completes (queued; the stream does not wait)
+            from database import submit_write
             asst_msg = models.ChatMessage(
                 source_id=request_body.source_id,
                 category_id=request_body.category_id,
@@ -304,21 +332,61 @@ async def chat(request_body: ChatRequest, request: Request, db: Session = Depend
                 role="assistant",
                 content="".join(full_response)
             )
-            new_db.add(asst_msg)
-            new_db.commit()
-            new_db.close()
+            submit_write(lambda new_db: new_db.add(asst_msg))
 
     return StreamingResponse(iter_stream(), media_type="text/plain")
 
-@router.get("/chat/history/{source_id}")
-async def get_chat_history(source_id: str, db: Session = Depends(get_db)):
-    """Retrieve chat history for a source"""
-    messages = db.query(models.ChatMessage).filter(
-        models.ChatMessage.source_id == source_id
-    ).order_by(models.ChatMessage.created_at).all()
-    
+# Chat history pages: newest CHAT_PAGE_SIZE messages by default, older/newer ones by cursor
+CHAT_PAGE_SIZE = 50
+CHAT_MAX_PAGE_SIZE = 200
+
+
+async def _chat_page(db: AsyncSession, statement, response: Response, limit: int,
+                     before: Optional[str], after: Optional[str]) -> list:
+    """
+    One page of messages in chronological order, keyset-paged by (created_at, id).
+
+    before/after are message ids from a previous page. X-Prev-Cursor is set
+    when older messages exist (pass it as before=) and X-Next-Cursor when
+    newer ones do (pass it as after=).
+    """
+    Message = models.ChatMessage
+    if before and after:
+        raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+    cursor = before or after
+    if cursor:
+        if not await db.scalar(select(Message.id).where(Message.id == cursor)):
+            raise HTTPException(status_code=400, detail="Invalid or stale cursor")
+        # The anchor's timestamp is compared inside the database, so stored formats always match
+        anchor = select(Message.created_at).where(Message.id == cursor).scalar_subquery()
+        if after:
+            statement = statement.where(or_(Message.created_at > anchor,
+                                            and_(Message.created_at == anchor, Message.id > cursor)))
+        else:
+            statement = statement.where(or_(Message.created_at < anchor,
+                                            and_(Message.created_at == anchor, Message.id < cursor)))
+
+    # Walk the index away from the cursor (newest first unless paging forward)
+    if after:
+        statement = statement.order_by(Message.created_at, Message.id)
+    else:
+        statement = statement.order_by(Message.created_at.desc(), Message.id.desc())
+    messages = list((await db.scalars(statement.limit(limit + 1))).all())
+    more = len(messages) > limit
+    messages = messages[:limit]
+    if not after:
+        messages.reverse()
+
+    # Paging forward, the cursor row itself is older; paging back, it is newer
+    has_older = True if after else more
+    has_newer = more if after else bool(before)
+    if messages and has_older:
+        response.headers["X-Prev-Cursor"] = messages[0].id
+    if messages and has_newer:
+        response.headers["X-Next-Cursor"] = messages[-1].id
     return [
         {
+            "id": msg.id,
             "role": msg.role,
             "content": msg.content,
             "created_at": msg.created_at.isoformat() if msg.created_at else None
@@ -326,45 +394,60 @@ async def get_chat_history(source_id: str, db: Session = Depends(get_db)):
     ]
 
 
+@router.get("/chat/history/{source_id}")
+async def get_chat_history(
+    source_id: str,
+    response: Response,
+    limit: int = Query(CHAT_PAGE_SIZE, ge=1, le=CHAT_MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Retrieve chat history for a source (latest page; see _chat_page for cursors)"""
+    statement = select(models.ChatMessage).where(models.ChatMessage.source_id == source_id)
+    return await _chat_page(db, statement, response, limit, before, after)
+
+
 @router.get("/chat/history-global")
-async def get_global_chat_history(db: Session = Depends(get_db), current_user: Optional[models.User] = Depends(get_optional_user)):
+async def get_global_chat_history(
+    response: Response,
+    limit: int = Query(CHAT_PAGE_SIZE, ge=1, le=CHAT_MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[models.User] = Depends(get_optional_user_async),
+):
     """Retrieve global chat history (messages with no source_id and no category_id)"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required for global chat history")
         
-    messages = db.query(models.ChatMessage).filter(
+    statement = select(models.ChatMessage).where(
         models.ChatMessage.source_id == None,
         models.ChatMessage.category_id == None,
         models.ChatMessage.user_id == current_user.id
-    ).order_by(models.ChatMessage.created_at).all()
-    
-    return [
-        {
-            "role": msg.role,
-            "content": msg.content,
-            "created_at": msg.created_at.isoformat() if msg.created_at else None
-        } for msg in messages
-    ]
+    )
+    return await _chat_page(db, statement, response, limit, before, after)
 
 
 @router.get("/chat/history-path/{category_id}")
-async def get_category_chat_history(category_id: str, db: Session = Depends(get_db), current_user: Optional[models.User] = Depends(get_optional_user)):
+async def get_category_chat_history(
+    category_id: str,
+    response: Response,
+    limit: int = Query(CHAT_PAGE_SIZE, ge=1, le=CHAT_MAX_PAGE_SIZE),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[models.User] = Depends(get_optional_user_async),
+):
     """Retrieve chat history for a specific Learning Path"""
     if not current_user:
         raise HTTPException(status_code=401, detail="Authentication required for path chat history")
         
-    messages = db.query(models.ChatMessage).filter(
+    statement = select(models.ChatMessage).where(
         models.ChatMessage.category_id == category_id,
         models.ChatMessage.user_id == current_user.id
-    ).order_by(models.ChatMessage.created_at).all()
-    
-    return [
-        {
-            "role": msg.role,
-            "content": msg.content,
-            "created_at": msg.created_at.isoformat() if msg.created_at else None
-        } for msg in messages
-    ]
+    )
+    return await _chat_page(db, statement, response, limit, before, after)
 
 
 @router.post("/tutorial/{source_id}")
@@ -619,17 +702,17 @@ Write the complete chapter content as this exact JSON:
 @router.get("/tutorial/project/{project_id}")
 async def get_project_tutorial(
     project_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return cached path-level tutorial for a project, or null if not yet generated."""
-    existing = (
-        db.query(models.Artifact)
-        .filter(
+    existing = await db.scalar(
+        _artifacts()
+        .where(
             models.Artifact.project_id == project_id,
             models.Artifact.source_id == None,
             models.Artifact.type == "tutorial",
         )
-        .first()
+        .limit(1)
     )
     if existing and existing.content:
         return existing.content
@@ -650,7 +733,7 @@ async def generate_project_tutorial(
         raise HTTPException(status_code=404, detail="Project not found")
 
     # Collect ingested sources (those with extracted text)
-    ingested = [s for s in project.sources if s.content_text and s.content_text.strip()]
+    ingested = _ingested_sources(db, [project.id])
     if not ingested:
         raise HTTPException(
             status_code=400,
@@ -911,18 +994,18 @@ Write the complete chapter content as this exact JSON:
 @router.get("/tutorial/category/{category_id}")
 async def get_category_tutorial(
     category_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Return cached category-level tutorial, or null if not yet generated."""
-    existing = (
-        db.query(models.Artifact)
-        .filter(
+    existing = await db.scalar(
+        _artifacts()
+        .where(
             models.Artifact.project_id == None,
             models.Artifact.source_id == None,
             models.Artifact.type == "tutorial",
             models.Artifact.title == f"cat:{category_id}",
         )
-        .first()
+        .limit(1)
     )
     if existing and existing.content:
         return existing.content
@@ -948,9 +1031,7 @@ async def generate_category_tutorial(
         raise HTTPException(status_code=400, detail="No projects found in this category.")
 
     # Aggregate all ingested sources across all projects
-    ingested = []
-    for proj in cat_projects:
-        ingested.extend([s for s in proj.sources if s.content_text and s.content_text.strip()])
+    ingested = _ingested_sources(db, [proj.id for proj in cat_projects])
 
     if not ingested:
         raise HTTPException(
@@ -1212,14 +1293,13 @@ async def summarize(source_id: str, request: Request, style: str = "article", fo
     source.summary = summary
     db.commit()
     
-    artifact = models.Artifact(
+    artifact = ArtifactStore.save(
+        db, "summary", {"text": summary},
         project_id=source.project_id,
         source_id=source.id,
-        type="summary",
+        variant=style,
         title=f"{style.capitalize()} Summary",
-        content={"text": summary}
     )
-    db.add(artifact)
     db.commit()
     
     return {"summary": summary, "artifact_id": artifact.id, "cached": False}
@@ -1243,29 +1323,23 @@ async def generate_quiz(source_id: str, request: Request, force: bool = False, d
     if not quiz_data.get("questions"):
         raise HTTPException(status_code=500, detail="AI returned an empty quiz. Please try again.")
 
-    artifact = models.Artifact(
+    ArtifactStore.save(
+        db, "quiz", quiz_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="quiz",
         title=f"Quiz for {source.title}",
-        content=quiz_data
     )
-    db.add(artifact)
     db.commit()
     
     return quiz_data
 
 
 @router.get("/quiz/{source_id}")
-async def get_quiz(source_id: str, db: Session = Depends(get_db)):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
+async def get_quiz(source_id: str, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Source.id).where(models.Source.id == source_id)):
         raise HTTPException(status_code=404, detail="Source not found")
     
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.project_id == source.project_id,
-        models.Artifact.type == "quiz"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "quiz", source_id=source_id)
     
     if not artifact:
         return {"questions": []}
@@ -1280,10 +1354,7 @@ async def generate_flashcards(source_id: str, request: Request, force: bool = Fa
         raise HTTPException(status_code=404, detail="Source content not found")
 
     if not force:
-        existing_artifact = db.query(models.Artifact).filter(
-            models.Artifact.source_id == source_id,
-            models.Artifact.type == "flashcard"
-        ).order_by(models.Artifact.created_at.desc()).first()
+        existing_artifact = ArtifactStore.latest(db, "flashcard", source_id=source_id)
         
         if existing_artifact:
             return existing_artifact.content
@@ -1300,29 +1371,23 @@ async def generate_flashcards(source_id: str, request: Request, force: bool = Fa
     if not flashcards_data.get("flashcards"):
         raise HTTPException(status_code=500, detail="AI returned empty flashcards. Please try again.")
 
-    artifact = models.Artifact(
+    ArtifactStore.save(
+        db, "flashcard", flashcards_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="flashcard",
         title=f"Flashcards for {source.title}",
-        content=flashcards_data
     )
-    db.add(artifact)
     db.commit()
     
     return flashcards_data
 
 
 @router.get("/flashcards/{source_id}")
-async def get_flashcards(source_id: str, db: Session = Depends(get_db)):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
+async def get_flashcards(source_id: str, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Source.id).where(models.Source.id == source_id)):
         raise HTTPException(status_code=404, detail="Source not found")
     
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "flashcard"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "flashcard", source_id=source_id)
     
     if not artifact:
         return {"flashcards": []}
@@ -1346,30 +1411,24 @@ async def generate_social_media(source_id: str, request: Request, platform: str
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="AI returned malformed output. Please try again.")
 
-    artifact = models.Artifact(
+    ArtifactStore.save(
+        db, "social_media", social_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="social_media",
+        variant=platform,
         title=f"{platform.capitalize()} Post for {source.title}",
-        content=social_data
     )
-    db.add(artifact)
     db.commit()
     
     return social_data
 
 
 @router.get("/social-media/{source_id}")
-async def get_social_media(source_id: str, platform: str = "twitter", db: Session = Depends(get_db)):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
+async def get_social_media(source_id: str, platform: str = "twitter", db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Source.id).where(models.Source.id == source_id)):
         raise HTTPException(status_code=404, detail="Source not found")
     
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "social_media",
-        models.Artifact.title.like(f"{platform.capitalize()}%")
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "social_media", source_id=source_id, variant=platform)
     
     if not artifact:
         return {"post": "", "hashtags": [], "hook": ""}
@@ -1393,29 +1452,23 @@ async def generate_diagram(source_id: str, request: Request, concept: str = "",
     except json.JSONDecodeError:
         raise HTTPException(status_code=500, detail="AI returned malformed output. Please try again.")
 
-    artifact = models.Artifact(
+    ArtifactStore.save(
+        db, "diagram", diagram_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="diagram",
         title=f"Diagram for {source.title}",
-        content=diagram_data
     )
-    db.add(artifact)
     db.commit()
     
     return diagram_data
 
 
 @router.get("/diagram/{source_id}")
-async def get_diagram(source_id: str, db: Session = Depends(get_db)):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
+async def get_diagram(source_id: str, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Source.id).where(models.Source.id == source_id)):
         raise HTTPException(status_code=404, detail="Source not found")
     
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "diagram"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "diagram", source_id=source_id)
     
     if not artifact:
         return {"diagram": "", "type": "ascii", "title": "", "description": ""}
@@ -1443,29 +1496,24 @@ async def generate_article(source_id: str, request: Request, style: str = "blog"
     if not article_data.get("content"):
         raise HTTPException(status_code=500, detail="AI returned an empty article. Please try again.")
 
-    artifact = models.Artifact(
+    # One article per source whatever the style, so GET and edits find it without one
+    ArtifactStore.save(
+        db, "article", article_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="article",
         title=f"{style.capitalize()} Article: {article_data.get('title', source.title)}",
-        content=article_data
     )
-    db.add(artifact)
     db.commit()
 
     return article_data
 
 
 @router.get("/article/{source_id}")
-async def get_article(source_id: str, db: Session = Depends(get_db)):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
-    if not source:
+async def get_article(source_id: str, db: AsyncSession = Depends(get_async_db)):
+    if not await db.scalar(select(models.Source.id).where(models.Source.id == source_id)):
         raise HTTPException(status_code=404, detail="Source not found")
     
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "article"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "article", source_id=source_id)
     
     if not artifact:
         return {"title": "", "content": "", "excerpt": "", "readTime": 0}
@@ -1483,10 +1531,7 @@ async def update_article(source_id: str, update: ArticleUpdate, db: Session = De
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
     
-    latest_artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "article"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    latest_artifact = ArtifactStore.latest(db, "article", source_id=source_id)
     
     article_data = {
         "title": f"Article for {source.title}",
@@ -1499,14 +1544,12 @@ async def update_article(source_id: str, update: ArticleUpdate, db: Session = De
         article_data = latest_artifact.content.copy()
         article_data["content"] = update.content
         
-    artifact = models.Artifact(
+    ArtifactStore.save(
+        db, "article", article_data,
         project_id=source.project_id,
         source_id=source.id,
-        type="article",
         title=article_data.get("title", f"Article for {source.title}"),
-        content=article_data
     )
-    db.add(artifact)
     db.commit()
     
     return article_data
@@ -1561,10 +1604,7 @@ async def generate_podcast(source_id: str, request: Request, background_tasks: B
         raise HTTPException(status_code=404, detail="Source content not found")
 
     # Check for existing processing/ready podcast
-    existing = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "podcast"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    existing = ArtifactStore.latest(db, "podcast", source_id=source_id)
     
     if not force and existing and existing.content.get("status") in ["processing", "ready"]:
         return existing
@@ -1579,19 +1619,18 @@ async def generate_podcast(source_id: str, request: Request, background_tasks: B
         raise HTTPException(status_code=500, detail=f"Failed to generate podcast script: {e}")
 
     # Create artifact in 'processing' state
-    artifact = models.Artifact(
-        project_id=source.project_id,
-        source_id=source.id,
-        type="podcast",
-        title=f"Podcast: {script_data.get('title', 'Audio Overview')}",
-        content={
+    artifact = ArtifactStore.save(
+        db, "podcast",
+        {
             "status": "processing",
             "title": script_data.get("title", f"Podcast Overview: {source.title}"),
             "segments": script_data.get("segments", []),
             "audio_url": None
-        }
+        },
+        project_id=source.project_id,
+        source_id=source.id,
+        title=f"Podcast: {script_data.get('title', 'Audio Overview')}",
     )
-    db.add(artifact)
     db.commit()
     db.refresh(artifact)
 
@@ -1607,12 +1646,9 @@ async def generate_podcast(source_id: str, request: Request, background_tasks: B
 
 
 @router.get("/podcast/{source_id}/status")
-async def get_podcast_status(source_id: str, db: Session = Depends(get_db)):
+async def get_podcast_status(source_id: str, db: AsyncSession = Depends(get_async_db)):
     """Check the status of the latest podcast artifact"""
-    artifact = db.query(models.Artifact).filter(
-        models.Artifact.source_id == source_id,
-        models.Artifact.type == "podcast"
-    ).order_by(models.Artifact.created_at.desc()).first()
+    artifact = await ArtifactStore.latest_async(db, "podcast", source_id=source_id)
     
     if not artifact:
         return {"status": "not_found"}
@@ -1648,10 +1684,11 @@ async def get_vanguard_recommendations(source_id: str, db: Session = Depends(get
 async def refresh_vanguard_recommendations(source_id: str, db: Session = Depends(get_db)):
     """Force a new research pass for the Vibe-Vanguard agent"""
     # Delete existing recommendation artifacts to trigger new pass on next fetch
-    db.query(models.Artifact).filter(
+    delete_rows(
+        db, models.Artifact,
         models.Artifact.source_id == source_id,
-        models.Artifact.type == "recommendation"
-    ).delete()
+        models.Artifact.type == "recommendation",
+    )
     db.commit()
     
     # Trigger a new research pass
@@ -1708,8 +1745,6 @@ async def create_mission_curriculum(request_body: VisionRequest, request: Reques
         raise HTTPException(status_code=500, detail="Architect failed to design mission")
     return curriculum
 
-from sqlalchemy.orm import Session, joinedload
-
 @router.get("/curriculum/missions")
 async def list_missions(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """List all global missions architected by the user."""
@@ -1924,13 +1959,13 @@ def _upsert_interview_artifact(db, artifact_filter: dict, data: dict):
 
 
 @router.get("/interview/project/{project_id}")
-async def get_project_interview_questions(project_id: str, db: Session = Depends(get_db)):
+async def get_project_interview_questions(project_id: str, db: AsyncSession = Depends(get_async_db)):
     """Return cached interview questions for a project, or null if not yet generated."""
-    existing = db.query(models.Artifact).filter(
+    existing = await db.scalar(_artifacts().where(
         models.Artifact.project_id == project_id,
         models.Artifact.source_id == None,
         models.Artifact.type == "interview_questions",
-    ).first()
+    ).limit(1))
     if existing and existing.content:
         return existing.content
     return None
@@ -1954,7 +1989,7 @@ async def generate_project_interview_questions(
         if existing and existing.content:
             return existing.content
 
-    ingested = [s for s in project.sources if s.content_text and s.content_text.strip()]
+    ingested = _ingested_sources(db, [project.id])
     combined = "\n\n---\n\n".join(s.content_text[:4000] for s in ingested[:5])
     topic = project.name or "the learning path"
 
@@ -1972,14 +2007,14 @@ async def generate_project_interview_questions(
 
 
 @router.get("/interview/category/{category_id}")
-async def get_category_interview_questions(category_id: str, db: Session = Depends(get_db)):
+async def get_category_interview_questions(category_id: str, db: AsyncSession = Depends(get_async_db)):
     """Return cached interview questions for a category, or null if not yet generated."""
-    existing = db.query(models.Artifact).filter(
+    existing = await db.scalar(_artifacts().where(
         models.Artifact.project_id == None,
         models.Artifact.source_id == None,
         models.Artifact.type == "interview_questions",
         models.Artifact.title == f"interview:cat:{category_id}",
-    ).first()
+    ).limit(1))
     if existing and existing.content:
         return existing.content
     return None
@@ -2006,9 +2041,7 @@ async def generate_category_interview_questions(
             return existing.content
 
     cat_projects = db.query(models.Project).filter(models.Project.category_id == category_id).all()
-    ingested = []
-    for proj in cat_projects:
-        ingested.extend([s for s in proj.sources if s.content_text and s.content_text.strip()])
+    ingested = _ingested_sources(db, [proj.id for proj in cat_projects])
 
     combined = "\n\n---\n\n".join(s.content_text[:3000] for s in ingested[:6])
     topic = category.name or "the learning path"
@@ -2026,14 +2059,14 @@ async def generate_category_interview_questions(
 
 
 @router.get("/interview/mission/{mission_id}")
-async def get_mission_interview_questions(mission_id: str, db: Session = Depends(get_db)):
+async def get_mission_interview_questions(mission_id: str, db: AsyncSession = Depends(get_async_db)):
     """Return cached interview questions for a mission, or null if not yet generated."""
-    existing = db.query(models.Artifact).filter(
+    existing = await db.scalar(_artifacts().where(
         models.Artifact.project_id == None,
         models.Artifact.source_id == None,
         models.Artifact.type == "interview_questions",
         models.Artifact.title == f"interview:mission:{mission_id}",
-    ).first()
+    ).limit(1))
     if existing and existing.content:
         return existing.content
     return None
@@ -5,6 +5,7 @@ from pydantic import BaseModel, EmailStr, Field
 from database import get_db
 from models import User
 from services.auth import AuthService
+from dependencies import invalidate_cached_user
 from datetime import datetime, timedelta
 from config import settings
 from sqlalchemy import text, func
@@ -111,6 +112,7 @@ async def verify_otp(data: OtpVerify, db: Session = Depends(get_db)):
         if data.role and not user.role:
              user.role = data.role
         db.commit()
+        invalidate_cached_user(user.email)
     
     # Delete used OTP
     db.delete(otp)
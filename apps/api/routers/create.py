@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 import models
 from services.social import SocialMediaService
+from services.artifact_store import ArtifactStore
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -33,13 +34,13 @@ async def create_social_post(request: SocialRequest, db: Session = Depends(get_d
         raise HTTPException(status_code=400, detail="Invalid platform")
 
     # Save as artifact
-    artifact = models.Artifact(
+    artifact = ArtifactStore.save(
+        db, f"{request.platform}_post", {"text": content, "style": request.style},
         project_id=source.project_id,
-        type=f"{request.platform}_post",
+        source_id=source.id,
+        variant=request.style,
         title=f"{request.platform.capitalize()} Post ({request.style})",
-        content={"text": content, "style": request.style}
     )
-    db.add(artifact)
     db.commit()
 
     return {"content": content, "artifact_id": artifact.id}
@@ -53,13 +54,14 @@ async def create_diagram(request: DiagramRequest, db: Session = Depends(get_db))
     diagram_code = SocialMediaService.generate_diagram(source.content_text, request.diagram_type)
 
     # Save as artifact
-    artifact = models.Artifact(
+    # The diagram type as variant keeps these apart from /ai/diagram's diagrams of the same source
+    artifact = ArtifactStore.save(
+        db, "diagram", {"mermaid": diagram_code},
         project_id=source.project_id,
-        type="diagram",
+        source_id=source.id,
+        variant=request.diagram_type,
         title=f"{request.diagram_type.capitalize()} Diagram",
-        content={"mermaid": diagram_code}
     )
-    db.add(artifact)
     db.commit()
 
     return {"diagram": diagram_code, "artifact_id": artifact.id}
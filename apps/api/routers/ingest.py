@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Form, UploadFile, File, BackgroundTasks
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from database import get_db
 from dependencies import get_current_user, get_optional_user
 import models
+from content_store import delete_rows
 from pydantic import BaseModel
 from services.processing_agent import ProcessingAgent
 from services.orchestrator import AgentOrchestrator
+from config import settings
 import asyncio
 
 router = APIRouter(
@@ -19,6 +21,12 @@ class UrlRequest(BaseModel):
     project_id: str
     category_id: Optional[str] = None
 
+class BulkUrlRequest(BaseModel):
+    urls: List[str] = []
+    feed_url: Optional[str] = None  # sitemap, RSS/Atom feed or YouTube playlist
+    project_id: str = "default"
+    category_id: Optional[str] = None
+
 def truncate_title(title: str, max_length: int = 30) -> str:
     """Truncate title to max_length characters, adding '...' if truncated"""
     if not title:
@@ -53,7 +61,7 @@ async def ingest_url(request: UrlRequest, background_tasks: BackgroundTasks, db:
             return {
                 "status": "exists", 
                 "source_id": existing_source.id, 
-                "has_content": bool(existing_source.content_text),
+                "has_content": existing_source.content_length > 0,
                 "url_type": existing_source.type,
                 "message": "Source already exists, redirecting...",
                 "project_id": existing_project.id,
@@ -99,7 +107,7 @@ async def ingest_url(request: UrlRequest, background_tasks: BackgroundTasks, db:
              return {
                 "status": "exists", 
                 "source_id": existing_source.id, 
-                "has_content": bool(existing_source.content_text),
+                "has_content": existing_source.content_length > 0,
                 "url_type": existing_source.type,
                 "message": "Source already exists, redirecting...",
                 "project_id": project.id,
@@ -156,20 +164,18 @@ async def ingest_url(request: UrlRequest, background_tasks: BackgroundTasks, db:
             result = await asyncio.to_thread(WebScraperService.scrape_url, request.url)
             
             if result['success'] and result['content']:
-                # Clean up content using LLM
-                print(f"Scraping successful. Cleaning up content using AI...")
-                from services.ai import AIService
-                cleaned_content = await asyncio.to_thread(AIService.cleanup_content, result['content'])
+                from services.cleanup import ContentCleanupService
+                # The user gets the extracted text now; any LLM cleanup happens after the response
+                needs_cleanup = ContentCleanupService.needs_cleanup(result)
                 
-                source.content_text = cleaned_content
+                source.content_text = result['content']
                 source.title = truncate_title(result['title'])
+                meta_data = {"status": "completed", "cleanup": "pending" if needs_cleanup else "skipped"}
+                if result.get('http_validators'):
+                    meta_data["http_validators"] = result['http_validators']
+                source.meta_data = meta_data
                 content_fetched = True
                 print(f"Successfully scraped content ({len(result['content'])} chars)")
-                
-                # Trigger Processing Agent
-                print(f"Dispatching ProcessingAgent for source {source.id}")
-                agent = ProcessingAgent(source.id)
-                AgentOrchestrator.dispatch(agent, None, background_tasks)
             else:
                 error_message = result['content']
                 print(f"Scraping failed: {error_message}")
@@ -197,6 +203,7 @@ For testing purposes, you can still:
 URL Type: {url_type}
 Original URL: {request.url}"""
         source.title = truncate_title(f"{url_type.capitalize()} Content (Extraction unavailable)")
+        models.set_source_status(source, "failed", error_message)
     
     # Update project title with source title if this is a new project
     if request.project_id == "default" and source.title:
@@ -222,8 +229,11 @@ Original URL: {request.url}"""
     
     db.commit()
     
-    # Trigger Processing Agent if content was fetched
-    if content_fetched:
+    # Trigger Processing Agent if content was fetched (after cleanup, so only the final text is embedded)
+    if content_fetched and (source.meta_data or {}).get("cleanup") == "pending":
+        print(f"Queuing background cleanup for ingested source {source.id}")
+        background_tasks.add_task(cleanup_source_background, source.id)
+    elif content_fetched:
         print(f"Dispatching ProcessingAgent for ingested source {source.id}")
         agent = ProcessingAgent(source.id)
         AgentOrchestrator.dispatch(agent, None, background_tasks)
@@ -237,18 +247,79 @@ Original URL: {request.url}"""
         "project_title": project.title
     }
 
-def process_file_background(source_id: str, content_bytes: bytes, filename: str, file_ext: str, content_type: str, force_ocr: bool):
-    from database import SessionLocal
-    import models
-    import traceback
+def _update_source(source_id: str, meta_data: Optional[dict] = None, **fields) -> bool:
+    """Set fields (and replace meta_data) on a source through the writer queue; False if it is gone.
+
+    Background ingestion writes go through the queue so that, on SQLite, they
+    wait their turn instead of contending for the database lock.
+    """
+    from database import run_write
+
+    def update(db):
+        source = db.query(models.Source).filter(models.Source.id == source_id).first()
+        if not source:
+            return False
+        for key, value in fields.items():
+            setattr(source, key, value)
+        if meta_data is not None:
+            source.meta_data = meta_data
+        return True
+
+    return run_write(update)
+
+
+def cleanup_source_background(source_id: str):
+    """Background task: LLM-clean a scraped source in parallel chunks, then embed it"""
+    from database import SessionLocal, run_write
+    from services.cleanup import ContentCleanupService
+
+    try:
+        db = SessionLocal()
+        try:
+            source = db.query(models.Source).filter(models.Source.id == source_id).first()
+            if not source or not source.content_text:
+                return
+            raw_content = source.content_text
+        finally:
+            db.close()  # Don't hold a connection during the LLM calls
+
+        cleaned_content = ContentCleanupService.clean(raw_content)
+
+        def store(db):
+            source = db.query(models.Source).filter(models.Source.id == source_id).first()
+            if not source:
+                return
+            # Skip the write if the source was refreshed or edited meanwhile
+            if source.content_text == raw_content:
+                source.content_text = cleaned_content
+            source.meta_data = {**(source.meta_data or {}), "status": "completed", "cleanup": "done"}
+
+        run_write(store)
+        print(f"Cleanup finished for source {source_id} ({len(raw_content)} -> {len(cleaned_content)} chars)")
+    except Exception as e:
+        print(f"Background cleanup failed for source {source_id}: {e}")
+
+    # Embed the final text (raw text if cleanup failed)
+    try:
+        agent = ProcessingAgent(source_id)
+        asyncio.run(agent.run(None))
+    except Exception as e:
+        print(f"Failed to run ProcessingAgent: {e}")
+
+def process_file_background(source_id: str, file_path: str, filename: str, file_ext: str, content_type: str, force_ocr: bool, content_hash: Optional[str] = None):
+    from database import run_write
+    from services.blobs import BlobService
+    from services.uploads import UploadSpool
     import os
     
     print(f"Background processing started for {filename} (Source ID: {source_id})")
-    db = SessionLocal()
     
     content_text = ""
     source_type = "file"
+    extraction_method = None
     error_message = None
+    failed_chunks = []
+    chunk_total = 0
     
     try:
         # Handle different file types
@@ -258,34 +329,34 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
             print(f"Detected audio/video file, checking for worker...")
             source_type = "audio"
             
-            # Check for WORKER_URL to offload processing
-            worker_url = os.environ.get("WORKER_URL")
-            if worker_url:
-                worker_endpoint = worker_url.replace('/transcribe', '/transcribe-file')
-                print(f"Found WORKER_URL, sending file to: {worker_endpoint}")
+            # Offload to the worker pool when one is configured (WORKER_URLS / WORKER_URL)
+            from services.worker_client import WorkerClient
+            from services.worker_pool import WorkerPool
+
+            if WorkerPool.enabled():
+                print(f"Worker pool configured, submitting file as a worker job")
                 
                 try:
-                    import requests
-                    import io
-                    
-                    # Prepare file for upload
-                    files = {'file': (filename, io.BytesIO(content_bytes), content_type)}
-                    response = requests.post(worker_endpoint, files=files, timeout=600)  # 10 min timeout for large files
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        content_text = data.get("transcript", "")
+                    data = WorkerClient.transcribe_file(file_path, filename, content_type)
+                    content_text = data.get("transcript", "")
+                    if content_text:
                         print(f"Worker transcription successful ({len(content_text)} chars)")
                         # Update source with success
-                        source = db.query(models.Source).filter(models.Source.id == source_id).first()
-                        if source:
-                            source.content_text = content_text
-                            source.type = source_type
-                            source.meta_data = {"status": "completed", "method": "worker"}
-                            db.commit()
+                        _update_source(
+                            source_id,
+                            content_text=content_text,
+                            type=source_type,
+                            meta_data={"status": "completed", "method": "worker", "content_hash": content_hash},
+                        )
+                        run_write(
+                            BlobService.save_extraction, content_hash,
+                            BlobService.extraction_variant(file_ext, content_type, force_ocr),
+                            source_type, content_text, "worker"
+                        )
+                        UploadSpool.remove(file_path)
                         return  # Exit early on success
                     else:
-                        print(f"Worker failed with status {response.status_code}: {response.text}")
+                        print("Worker returned an empty transcript")
                         print("Falling back to local Whisper processing...")
                 except Exception as e:
                     print(f"Worker request failed: {str(e)}")
@@ -293,121 +364,43 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
             
             # Fallback: Local Whisper transcription (OpenAI or Groq)
             import tempfile
-            import os
-            import httpx
-            from openai import OpenAI
-            from config import settings
-            from pydub import AudioSegment
-
-            if settings.OPENAI_API_KEY:
-                print("Using OpenAI Whisper for transcription (will fall back to Groq on quota error)")
-                client = OpenAI(api_key=settings.OPENAI_API_KEY, http_client=httpx.Client())
-                whisper_model = "whisper-1"
-            elif settings.GROQ_API_KEY:
-                print("No OpenAI key — using Groq Whisper for transcription")
-                client = OpenAI(api_key=settings.GROQ_API_KEY, base_url="https://api.groq.com/openai/v1", http_client=httpx.Client())
-                whisper_model = "whisper-large-v3-turbo"
-            else:
-                source.content = "Audio transcription requires an OpenAI or Groq API key."
-                source.status = "failed"
-                db.commit()
-                return
+            import shutil
+            from services.audio import AudioChunker
+            from services.transcription import TranscriptionService
 
-            def switch_to_groq():
-                nonlocal client, whisper_model
-                if settings.GROQ_API_KEY and whisper_model != "whisper-large-v3-turbo":
-                    print("OpenAI quota exceeded, switching to Groq...")
-                    client = OpenAI(api_key=settings.GROQ_API_KEY, base_url="https://api.groq.com/openai/v1", http_client=httpx.Client())
-                    whisper_model = "whisper-large-v3-turbo"
-                    return True
-                return False
+            try:
+                transcriber = TranscriptionService()
+            except ValueError as e:
+                raise Exception(str(e))
 
             print(f"Using local Whisper transcription")
 
-            # Create a temp file for the original upload
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_ext}') as tmp_file:
-                tmp_file.write(content_bytes)
-                tmp_path = tmp_file.name
-
+            chunk_dir = tempfile.mkdtemp(prefix="vk_chunks_")
             try:
-                file_size = os.path.getsize(tmp_path)
-                limit_bytes = 25 * 1024 * 1024  # 25 MB
-                
-                if file_size > limit_bytes:
-                    print(f"File size {file_size/1024/1024:.2f} MB exceeds Whisper limit (25 MB). Chunking...")
-                    
-                    # Load audio
-                    audio = AudioSegment.from_file(tmp_path)
-                    
-                    # Split into 10-minute chunks (10 * 60 * 1000 ms)
-                    chunk_length_ms = 10 * 60 * 1000
-                    chunks = [audio[i:i + chunk_length_ms] for i in range(0, len(audio), chunk_length_ms)]
-                    
-                    print(f"Split into {len(chunks)} chunks")
-                    
-                    full_transcript = []
-                    
-                    for i, chunk in enumerate(chunks):
-                        # Export chunk to temp file
-                        chunk_name = f"{tmp_path}_chunk_{i}.mp3"
-                        chunk.export(chunk_name, format="mp3")
-                        
-                        try:
-                            print(f"Transcribing chunk {i+1}/{len(chunks)}...")
-                            with open(chunk_name, 'rb') as audio_chunk:
-                                transcript_chunk = client.audio.transcriptions.create(
-                                    model=whisper_model,
-                                    file=audio_chunk,
-                                    response_format="text"
-                                )
-                            full_transcript.append(transcript_chunk)
-                        except Exception as chunk_err:
-                            if ("429" in str(chunk_err) or "insufficient_quota" in str(chunk_err)) and switch_to_groq():
-                                with open(chunk_name, 'rb') as audio_chunk:
-                                    transcript_chunk = client.audio.transcriptions.create(
-                                        model=whisper_model,
-                                        file=audio_chunk,
-                                        response_format="text"
-                                    )
-                                full_transcript.append(transcript_chunk)
-                            else:
-                                raise
-                        finally:
-                            # Clean up chunk file
-                            if os.path.exists(chunk_name):
-                                os.unlink(chunk_name)
-                    
-                    content_text = " ".join(full_transcript)
-                    print(f"Chunked transcription successful ({len(content_text)} chars)")
-                    
-                else:
-                    # File is small enough, transcribe directly
-                    try:
-                        with open(tmp_path, 'rb') as audio_file:
-                            transcript = client.audio.transcriptions.create(
-                                model=whisper_model,
-                                file=audio_file,
-                                response_format="text"
-                            )
-                    except Exception as e:
-                        if ("429" in str(e) or "insufficient_quota" in str(e)) and switch_to_groq():
-                            with open(tmp_path, 'rb') as audio_file:
-                                transcript = client.audio.transcriptions.create(
-                                    model=whisper_model,
-                                    file=audio_file,
-                                    response_format="text"
-                                )
-                        else:
-                            raise
-                    content_text = transcript
-                    print(f"Whisper transcription successful ({len(content_text)} chars)")
+                # Small files come back unchanged; larger ones are re-encoded to
+                # 16 kHz mono and segmented under the 25 MB Whisper limit in one pass
+                chunk_paths = AudioChunker.split_for_whisper(file_path, output_dir=chunk_dir)
+                print(f"Split into {len(chunk_paths)} chunks")
+
+                # Chunks are transcribed concurrently and reassembled in order
+                transcripts = transcriber.transcribe_chunks(chunk_paths)
+                failed_chunks = [i + 1 for i, t in enumerate(transcripts) if t is None]
+                chunk_total = len(transcripts)
+                if len(failed_chunks) == chunk_total:
+                    raise Exception("Failed to transcribe any audio chunks")
+                if failed_chunks:
+                    # Kept, but recorded as a partial transcript below
+                    print(f"Chunks {failed_chunks} failed to transcribe; continuing with partial transcript")
+
+                content_text = " ".join(t for t in transcripts if t)
+                extraction_method = "whisper"
+                print(f"Whisper transcription successful ({len(content_text)} chars)")
                     
             except Exception as e:
                 error_message = f"Whisper transcription failed: {str(e)}"
                 print(error_message)
             finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                shutil.rmtree(chunk_dir, ignore_errors=True)
                 
         elif file_ext == 'pdf' or (content_type and 'pdf' in content_type):
             # PDF file - extract text
@@ -416,14 +409,12 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
             
             try:
                 import PyPDF2
-                import io
                 
                 # If force_ocr is True, skip PyPDF2 and go straight to OCR
                 text_parts = []
                 if not force_ocr:
                     try:
-                        pdf_file = io.BytesIO(content_bytes)
-                        pdf_reader = PyPDF2.PdfReader(pdf_file)
+                        pdf_reader = PyPDF2.PdfReader(file_path)
                         
                         # Check if PDF is encrypted
                         if pdf_reader.is_encrypted:
@@ -491,6 +482,7 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
                     # Final cleanup: remove multiple spaces
                     content_text = re.sub(r' {2,}', ' ', content_text)
                     
+                    extraction_method = "pypdf"
                     print(f"PDF extraction successful ({len(content_text)} chars from {len(text_parts)} pages)")
                 else:
                     # No text extracted OR force_ocr is True - try OCR
@@ -499,29 +491,43 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
                     else:
                         print("No text found with PyPDF2, attempting OCR...")
                     try:
-                        from pdf2image import convert_from_bytes
                         import pytesseract
-                        from PIL import Image
-                        
-                        # Convert PDF pages to images
-                        images = convert_from_bytes(content_bytes)
-                        print(f"Converted PDF to {len(images)} images for OCR")
-                        
-                        ocr_text_parts = []
-                        for i, image in enumerate(images):
-                            try:
-                                # Perform OCR on each page
-                                page_text = pytesseract.image_to_string(image)
-                                if page_text and page_text.strip():
-                                    ocr_text_parts.append(page_text)
-                                    print(f"OCR page {i+1}: extracted {len(page_text)} chars")
-                            except Exception as ocr_error:
-                                print(f"OCR failed for page {i+1}: {ocr_error}")
-                                continue
-                        
+                        from services.ocr import OcrService
+
+                        # Stream completed pages into the source so the user sees text
+                        # arrive while a long scan is still being OCR'd.
+                        page_texts = {}
+                        next_page = 1
+                        total_pages = OcrService.page_count(file_path)
+
+                        def stream_page(page_number: int, page_text: str):
+                            nonlocal next_page
+                            page_texts[page_number] = page_text
+                            if page_text and page_text.strip():
+                                print(f"OCR page {page_number}: extracted {len(page_text)} chars")
+                            if page_number != next_page:
+                                return
+                            # Publish the contiguous prefix of finished pages
+                            while next_page in page_texts:
+                                next_page += 1
+                            ready = [page_texts[p] for p in range(1, next_page) if page_texts[p].strip()]
+                            _update_source(
+                                source_id,
+                                content_text='\n\n'.join(ready),
+                                meta_data={
+                                    "status": "processing",
+                                    "ocr_pages_done": len(page_texts),
+                                    "ocr_pages_total": total_pages
+                                },
+                            )
+
+                        pages = OcrService.ocr_pdf(file_path, on_page=stream_page)
+                        ocr_text_parts = [page_text for page_text in pages if page_text and page_text.strip()]
+
                         if ocr_text_parts:
                             content_text = '\n\n'.join(ocr_text_parts)
-                            print(f"OCR extraction successful ({len(content_text)} chars from {len(ocr_text_parts)}/{len(images)} pages)")
+                            extraction_method = "ocr"
+                            print(f"OCR extraction successful ({len(content_text)} chars from {len(ocr_text_parts)}/{len(pages)} pages)")
                         else:
                             error_message = "No text could be extracted from PDF even with OCR (might be empty or corrupted)"
                             print(error_message)
@@ -548,10 +554,8 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
             
             try:
                 import docx
-                import io
                 
-                doc_file = io.BytesIO(content_bytes)
-                doc = docx.Document(doc_file)
+                doc = docx.Document(file_path)
                 
                 text_parts = []
                 for para in doc.paragraphs:
@@ -559,6 +563,7 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
                         text_parts.append(para.text)
                 
                 content_text = '\n\n'.join(text_parts)
+                extraction_method = "docx"
                 print(f"Word extraction successful ({len(content_text)} chars)")
                 
             except ImportError:
@@ -574,12 +579,16 @@ def process_file_background(source_id: str, content_bytes: bytes, filename: str,
             print(f"Detected text file, decoding content")
             source_type = "text"
             
+            with open(file_path, 'rb') as text_file:
+                content_bytes = text_file.read()
             try:
                 content_text = content_bytes.decode('utf-8')
+                extraction_method = "text"
                 print(f"Text file decoded successfully ({len(content_text)} chars)")
             except UnicodeDecodeError:
                 try:
                     content_text = content_bytes.decode('latin-1')
+                    extraction_method = "text"
                     print(f"Text file decoded with latin-1 ({len(content_text)} chars)")
                 except Exception as e:
                     error_message = f"Text decoding failed: {str(e)}"
@@ -609,17 +618,29 @@ Supported formats:
 
     # Update source in DB
     try:
-        source = db.query(models.Source).filter(models.Source.id == source_id).first()
-        if source:
-            source.content_text = content_text
-            source.type = source_type
-            # Update status to completed or failed
-            source.meta_data = {"status": "completed" if not (error_message and not content_text) else "failed"}
-            if error_message:
-                source.meta_data["error"] = error_message
-                
-            db.commit()
+        # Update status to completed or failed
+        meta_data = {
+            "status": "completed" if not (error_message and not content_text) else "failed",
+            "content_hash": content_hash
+        }
+        if error_message:
+            meta_data["error"] = error_message
+        elif failed_chunks:
+            # The transcript has gaps; say which chunks are missing
+            meta_data["status"] = "partial"
+            meta_data["failed_chunks"] = failed_chunks
+            meta_data["chunk_total"] = chunk_total
+        if _update_source(source_id, content_text=content_text, type=source_type, meta_data=meta_data):
             print(f"Background processing completed for source {source_id}")
+
+            # Future uploads of the same bytes reuse this extraction
+            if extraction_method and content_text and not error_message and not failed_chunks:
+                run_write(
+                    BlobService.save_extraction, content_hash,
+                    BlobService.extraction_variant(file_ext, content_type, force_ocr),
+                    source_type, content_text, extraction_method,
+                    os.path.getsize(file_path) if os.path.exists(file_path) else None
+                )
             
             # Trigger Processing Agent (Synchronous wrapper for async agent)
             if content_text and not error_message:
@@ -634,43 +655,52 @@ Supported formats:
     except Exception as e:
         print(f"Error updating source {source_id}: {e}")
     finally:
-        db.close()
+        UploadSpool.remove(file_path)
 
 
-def process_youtube_background(source_id: str, url: str, project_id: str):
+def process_youtube_background(source_id: str, url: str, project_id: str, rename_project: bool = True):
     """Background task to process YouTube URLs"""
-    from database import SessionLocal
+    from database import SessionLocal, run_write
     import models
     import traceback
     
     print(f"Background processing started for YouTube URL: {url} (Source ID: {source_id})")
-    db = SessionLocal()
     
     try:
         from services.ytdlp import YtDlpService
+        from services.transcript_cache import TranscriptCacheService
         
         # Extract video ID
         video_id = YtDlpService.extract_video_id(url)
         
         if video_id:
-            print(f"Attempting to fetch transcript for video ID: {video_id}")
-            result = YtDlpService.process_video(url)
+            # Another user may already have ingested this video
+            db = SessionLocal()
+            try:
+                result = TranscriptCacheService.get(db, url)
+            finally:
+                db.close()
+            if not result:
+                print(f"Attempting to fetch transcript for video ID: {video_id}")
+                result = YtDlpService.process_video(url)
+                run_write(TranscriptCacheService.put, url, result)
             
             # Update source with result
-            source = db.query(models.Source).filter(models.Source.id == source_id).first()
-            if source:
+            def apply_result(db):
+                source = db.query(models.Source).filter(models.Source.id == source_id).first()
+                if not source:
+                    return False
                 if result.get('success'):
                     source.content_text = result['content']
                     fallback_prefix = "Video"
                     if "youtube" in result.get('method', ''):
                         fallback_prefix = "YouTube"
-                    source.title = result.get('title', f"{fallback_prefix}: {video_id}")[:255]
+                    source.title = (result.get('title') or f"{fallback_prefix}: {video_id}")[:255]
                     source.meta_data = {"status": "completed", "method": result.get('method', 'unknown')}
                     print(f"Successfully fetched transcript via {result.get('method')} ({len(source.content_text)} chars)")
                     
                     # Update project title if this was a new project
-                    # Update project title if this was a new project
-                    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+                    project = db.query(models.Project).filter(models.Project.id == project_id).first() if rename_project else None
                     if project and source.title:
                         base_title = source.title[:200]
                         
@@ -695,9 +725,9 @@ def process_youtube_background(source_id: str, url: str, project_id: str):
                     source.title = f"YouTube: {video_id} (Failed)"
                     source.meta_data = {"status": "failed", "error": error_message}
                     print(f"Transcript fetch failed: {error_message}")
-                
-                db.commit()
+                return True
 
+            if run_write(apply_result):
                 # Trigger Processing Agent (Synchronous wrapper for async agent)
                 try:
                     print(f"Triggering ProcessingAgent for YouTube source {source_id}")
@@ -707,25 +737,23 @@ def process_youtube_background(source_id: str, url: str, project_id: str):
                     print(f"Failed to run ProcessingAgent: {e}")
         else:
             # Update source with error
-            source = db.query(models.Source).filter(models.Source.id == source_id).first()
-            if source:
-                source.content_text = "[Could not extract video ID from URL]"
-                source.title = "YouTube (Invalid URL)"
-                source.meta_data = {"status": "failed", "error": "Invalid video ID"}
-                db.commit()
+            _update_source(
+                source_id,
+                content_text="[Could not extract video ID from URL]",
+                title="YouTube (Invalid URL)",
+                meta_data={"status": "failed", "error": "Invalid video ID"},
+            )
                 
     except Exception as e:
         print(f"Error processing YouTube URL: {str(e)}")
         traceback.print_exc()
         
         # Update source with error
-        source = db.query(models.Source).filter(models.Source.id == source_id).first()
-        if source:
-            source.content_text = f"[Processing error: {str(e)}]"
-            source.meta_data = {"status": "failed", "error": str(e)}
-            db.commit()
-    finally:
-        db.close()
+        _update_source(
+            source_id,
+            content_text=f"[Processing error: {str(e)}]",
+            meta_data={"status": "failed", "error": str(e)},
+        )
 
 @router.post("/file")
 async def ingest_file(
@@ -789,30 +817,65 @@ async def ingest_file(
     
     print(f"Queuing uploaded file for processing: {filename} (type: {file.content_type})")
     
+    # Stream the upload to disk; memory use per upload stays at one chunk
+    from services.uploads import UploadSpool
+    from services.blobs import BlobService
+    file_path, content_hash, file_size = await UploadSpool.spool(file, file_ext)
+    print(f"Spooled {filename} to {file_path} ({file_size} bytes, sha256 {content_hash[:12]})")
+    
+    # Identical bytes were already extracted (by anyone): link to that text instantly
+    variant = BlobService.extraction_variant(file_ext, file.content_type, force_ocr)
+    extraction = BlobService.find_extraction(db, content_hash, variant)
+    if extraction:
+        UploadSpool.remove(file_path)
+        print(f"Duplicate upload {content_hash[:12]}, reusing {extraction.method} extraction")
+        source = models.Source(
+            project_id=project_id,
+            type=extraction.source_type or "file",
+            title=filename,
+            content_text=extraction.content_text,
+            meta_data={"status": "completed", "method": f"dedup_{extraction.method}", "content_hash": content_hash}
+        )
+        db.add(source)
+        db.commit()
+        db.refresh(source)
+
+        agent = ProcessingAgent(source.id)
+        AgentOrchestrator.dispatch(agent, None, background_tasks)
+
+        return {
+            "status": "ready",
+            "source_id": source.id,
+            "has_content": True,
+            "file_type": source.type,
+            "project_id": project.id,
+            "project_title": project.title
+        }
+
+    await asyncio.to_thread(BlobService.store, content_hash, file_path)
+    
     # Create source immediately with 'processing' status
     source = models.Source(
         project_id=project_id,
         type="file", # Placeholder
         title=filename,
         content_text=None,
-        meta_data={"status": "processing"}
+        meta_data={"status": "processing", "content_hash": content_hash}
     )
     db.add(source)
     db.commit()
     db.refresh(source)
     
-    # Read file content
-    content_bytes = await file.read()
-    
     # Add background task
     background_tasks.add_task(
         process_file_background,
         source.id,
-        content_bytes,
+        file_path,
         filename,
         file_ext,
         file.content_type,
-        force_ocr
+        force_ocr,
+        content_hash
     )
 
     return {
@@ -866,6 +929,21 @@ async def ingest_extension(request: ExtensionRequest, background_tasks: Backgrou
 
     return {"status": "captured", "source_id": source.id}
 
+@router.post("/worker-callback")
+async def worker_callback(request: Request):
+    """Completion callback from the transcription worker (see WORKER_CALLBACK_URL)"""
+    from services.worker_client import WorkerClient
+
+    if settings.WORKER_CALLBACK_TOKEN and request.headers.get("X-Worker-Token") != settings.WORKER_CALLBACK_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid worker token")
+    payload = await request.json()
+    job_id = payload.get("job_id")
+    if not job_id:
+        raise HTTPException(status_code=400, detail="job_id is required")
+    # Only wakes the waiting poller; the result itself is always read back from the worker
+    WorkerClient.notify(job_id)
+    return {"status": "ok"}
+
 @router.post("/refresh/{source_id}")
 async def refresh_source(source_id: str, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Re-ingest a source by re-scraping the original URL and updating the database"""
@@ -885,11 +963,25 @@ async def refresh_source(source_id: str, background_tasks: BackgroundTasks, db:
     print(f"Refreshing source {source_id}: {url}")
     
     # Re-fetch content based on URL type
+    previous_hash = source.content_hash
     content_fetched = False
+    not_modified = False
     error_message = None
     
     try:
-        if url_type == 'youtube':
+        from database import run_write
+        from services.transcript_cache import TranscriptCacheService
+        cached = None
+        if url_type in ['video', 'youtube']:
+            # A transcript fetched recently (by anyone) is as fresh as a refetch
+            cached = TranscriptCacheService.get(db, url, max_age_hours=settings.TRANSCRIPT_CACHE_REFRESH_TTL_HOURS)
+
+        if cached:
+            source.content_text = cached['content']
+            source.title = truncate_title(cached['title'] or source.title)
+            content_fetched = True
+            print(f"Refreshed transcript from cache ({len(cached['content'])} chars)")
+        elif url_type == 'youtube':
             from services.transcript import TranscriptService
             video_id = TranscriptService.extract_video_id(url)
             
@@ -902,19 +994,48 @@ async def refresh_source(source_id: str, background_tasks: BackgroundTasks, db:
                     source.title = truncate_title(f"YouTube: {video_id}")
                     content_fetched = True
                     print(f"Successfully re-fetched transcript ({len(transcript_text)} chars)")
+                    # Own transaction: the refreshed source is committed below, with its chunks
+                    await asyncio.to_thread(run_write, TranscriptCacheService.put, url, {
+                        "success": True,
+                        "method": "youtube_transcript",
+                        "content": transcript_text,
+                        "title": None  # Placeholder title; keep any real title already cached
+                    })
                 else:
                     error_message = "Transcript returned empty"
             else:
                 error_message = "Could not extract video ID from URL"
+        elif url_type == 'video':
+            from services.ytdlp import YtDlpService
+            print(f"Re-processing video URL: {url}")
+            result = await asyncio.to_thread(YtDlpService.process_video, url)
+
+            if result.get('success') and result.get('content'):
+                source.content_text = result['content']
+                source.title = truncate_title(result.get('title') or source.title)
+                content_fetched = True
+                print(f"Successfully re-processed video via {result.get('method')} ({len(result['content'])} chars)")
+                await asyncio.to_thread(run_write, TranscriptCacheService.put, url, result)
+            else:
+                error_message = result.get('error') or "Video processing failed"
         else:
             # Use web scraper for all other URLs
             from services.scraper import WebScraperService
             print(f"Re-scraping {url_type} URL: {url}")
-            result = WebScraperService.scrape_url(url)
+            # Conditional GET with the validators from the last fetch
+            validators = (source.meta_data or {}).get('http_validators')
+            result = await asyncio.to_thread(WebScraperService.scrape_url, url, validators)
             
-            if result['success'] and result['content']:
+            if result.get('not_modified'):
+                content_fetched = True
+                not_modified = True
+            elif result['success'] and result['content']:
                 source.content_text = result['content']
                 source.title = truncate_title(result['title'])
+                source.meta_data = {
+                    **{k: v for k, v in (source.meta_data or {}).items() if k != 'http_validators'},
+                    **({"http_validators": result['http_validators']} if result.get('http_validators') else {})
+                }
                 content_fetched = True
                 print(f"Successfully re-scraped content ({len(result['content'])} chars)")
             else:
@@ -939,17 +1060,215 @@ This URL could not be processed automatically. This may be due to:
 URL Type: {url_type}
 Original URL: {url}"""
         source.title = truncate_title(f"{url_type.capitalize()} Content (Extraction unavailable)")
+        models.set_source_status(source, "failed", error_message)
+    else:
+        models.set_source_status(source, "completed")
     
-    # Clear the summary so it can be regenerated with new content
-    source.summary = None
-    
-    db.commit()
+    if content_fetched and not not_modified and models.source_content_hash(source.content_text) == previous_hash:
+        not_modified = True
+
+    if not_modified:
+        # Unchanged upstream: keep the summary and the existing chunk embeddings
+        print(f"Source {source_id} unchanged; skipping re-extraction and re-embedding")
+        db.commit()
+    else:
+        # Clear the summary so it can be regenerated with new content
+        source.summary = None
+        delete_rows(db, models.SourceChunk, models.SourceChunk.source_id == source.id)
+        source.chunk_count = 0
+        db.commit()
+
+        if content_fetched:
+            # Re-embed the new content
+            agent = ProcessingAgent(source.id)
+            AgentOrchestrator.dispatch(agent, None, background_tasks)
+
     db.refresh(source)
     
     return {
         "status": "refreshed", 
         "source_id": source.id, 
         "has_content": content_fetched,
-        "content_length": len(source.content_text) if source.content_text else 0,
+        "not_modified": not_modified,
+        "content_length": source.content_length,
         "title": source.title
     }
+
+
+@router.post("/bulk")
+async def ingest_bulk(request: BulkUrlRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """Queue many URLs (or a sitemap/feed/playlist) for ingestion; poll /ingest/bulk/{job_id} for progress."""
+    from services.bulk_ingest import BulkIngestService
+    from services.scraper import WebScraperService
+
+    urls = list(request.urls)
+    if request.feed_url:
+        try:
+            urls += await asyncio.to_thread(BulkIngestService.expand_feed, request.feed_url)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not read {request.feed_url}: {e}")
+    urls = BulkIngestService.normalize_urls(urls, settings.BULK_INGEST_MAX_ITEMS)
+    if not urls:
+        raise HTTPException(status_code=400, detail="No URLs to ingest")
+
+    if request.project_id == "default":
+        from datetime import datetime
+        project = models.Project(
+            title=f"Import ({datetime.now().strftime('%b %d, %H:%M')})",
+            description=f"Imported from {request.feed_url}" if request.feed_url else "Imported URL list",
+            owner_id=current_user.id,
+            category_id=request.category_id
+        )
+        db.add(project)
+        db.commit()
+        db.refresh(project)
+    else:
+        project = db.query(models.Project).filter(
+            models.Project.id == request.project_id,
+            models.Project.owner_id == current_user.id
+        ).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+    # Same dedup as ingest_url: a URL already in any of the user's projects is not re-ingested
+    existing = dict(db.query(models.Source.url, models.Source.id).join(models.Project).filter(
+        models.Project.owner_id == current_user.id,
+        models.Source.url.in_(urls)
+    ).all())
+
+    job = BulkIngestService.create_job(current_user.id, project.id, urls)
+    new_sources = []
+    for item in job.items:
+        item["url_type"] = WebScraperService.detect_url_type(item["url"])
+        if item["url"] in existing:
+            item["status"] = "exists"
+            item["source_id"] = existing[item["url"]]
+            continue
+        source = models.Source(
+            project_id=project.id,
+            type=item["url_type"],
+            url=item["url"],
+            title="Processing...",
+            content_text="",
+            meta_data={"status": "queued", "bulk_job_id": job.id}
+        )
+        db.add(source)
+        new_sources.append((item, source))
+    db.commit()
+    for item, source in new_sources:
+        item["source_id"] = source.id
+
+    print(f"Bulk ingest job {job.id}: {len(new_sources)} new of {len(urls)} URLs into project {project.id}")
+    background_tasks.add_task(run_bulk_ingest_job, job.id)
+
+    return {**job.to_dict(), "project_title": project.title}
+
+
+@router.get("/bulk/{job_id}")
+async def get_bulk_ingest_job(job_id: str, current_user: models.User = Depends(get_current_user)):
+    from services.bulk_ingest import BulkIngestService
+
+    job = BulkIngestService.get_job(job_id)
+    if not job or job.owner_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Bulk ingest job not found")
+    return job.to_dict()
+
+
+def _set_source_status(source_id: str, **fields):
+    """Update a bulk item's source (blocking; run in a thread). Goes through the writer queue."""
+    from database import run_write
+
+    def update(db):
+        source = db.query(models.Source).filter(models.Source.id == source_id).first()
+        if not source:
+            return
+        meta = dict(source.meta_data or {})
+        for key in ("status", "error", "http_validators"):
+            if key in fields:
+                meta[key] = fields.pop(key)
+        source.meta_data = meta
+        for key, value in fields.items():
+            setattr(source, key, value)
+
+    run_write(update)
+
+
+def _get_source_meta(source_id: str) -> dict:
+    from database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        source = db.query(models.Source).filter(models.Source.id == source_id).first()
+        return dict(source.meta_data or {}) if source else {}
+    finally:
+        db.close()
+
+
+async def _ingest_bulk_item(job, item):
+    from services.bulk_ingest import BulkIngestService
+    from services.scraper import WebScraperService
+    from services.cleanup import ContentCleanupService
+
+    url, source_id = item["url"], item["source_id"]
+    async with BulkIngestService.global_slot():
+        try:
+            if item["url_type"] in ('video', 'youtube', 'instagram', 'ted'):
+                # Fetch + transcription are one yt-dlp step; it also runs chunking/embedding
+                item["status"] = "fetching"
+                async with BulkIngestService.domain_slot(url):
+                    await asyncio.to_thread(process_youtube_background, source_id, url, job.project_id, False)
+                meta = await asyncio.to_thread(_get_source_meta, source_id)
+                item["status"] = "completed" if meta.get("status") == "completed" else "failed"
+                item["error"] = meta.get("error")
+                return
+
+            item["status"] = "fetching"
+            async with BulkIngestService.domain_slot(url):
+                result = await asyncio.to_thread(WebScraperService.scrape_url, url)
+            if not (result['success'] and result['content']):
+                raise RuntimeError(result['content'])
+
+            cleaned_content = result['content']
+            if ContentCleanupService.needs_cleanup(result):
+                item["status"] = "cleaning"
+                cleaned_content = await asyncio.to_thread(ContentCleanupService.clean, result['content'])
+            await asyncio.to_thread(
+                _set_source_status, source_id,
+                status="completed",
+                http_validators=result.get('http_validators'),
+                content_text=cleaned_content,
+                title=truncate_title(result['title'])
+            )
+
+            item["status"] = "embedding"
+            agent = ProcessingAgent(source_id)
+            await asyncio.to_thread(asyncio.run, agent.run(None))
+            item["status"] = "completed"
+        except Exception as e:
+            print(f"Bulk ingest failed for {url}: {e}")
+            item["status"] = "failed"
+            item["error"] = str(e)
+            await asyncio.to_thread(
+                _set_source_status, source_id,
+                status="failed",
+                error=str(e),
+                content_text=f"[Content extraction failed: {e}]\n\nOriginal URL: {url}",
+                title=truncate_title(f"{(item['url_type'] or 'web').capitalize()} Content (Extraction unavailable)")
+            )
+
+
+async def run_bulk_ingest_job(job_id: str):
+    """Run every queued item of a bulk job concurrently, within the global and per-domain limits."""
+    import time
+    from services.bulk_ingest import BulkIngestService
+
+    job = BulkIngestService.get_job(job_id)
+    if not job:
+        return
+    job.status = "running"
+    await asyncio.gather(*[
+        _ingest_bulk_item(job, item) for item in job.items if item["status"] == "queued"
+    ])
+    job.status = "completed"
+    job.finished_at = time.time()
+    print(f"Bulk ingest job {job_id} finished: {job.to_dict()['counts']}")
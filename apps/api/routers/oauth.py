@@ -8,6 +8,7 @@ from database import get_db
 from config import settings
 import models
 from services.auth import AuthService
+from dependencies import invalidate_cached_user
 from datetime import timedelta
 import logging
 
@@ -158,6 +159,7 @@ async def auth(provider: str, request: Request, db: Session = Depends(get_db)):
             user.avatar_url = user_info.get('picture') or user_info.get('avatar_url')
             
         db.commit()
+        invalidate_cached_user(user.email)
 
     # Create JWT
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
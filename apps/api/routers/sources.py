@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
+from typing import Optional
+from database import get_async_db, get_db
 from dependencies import get_current_user
 import dependencies
 import models
+from content_store import load_content
 from pydantic import BaseModel
 
 router = APIRouter(
@@ -14,19 +18,91 @@ router = APIRouter(
 class TranscriptUpdate(BaseModel):
     transcript: str
 
+# Source columns the listings need; content_text/summary bodies are never loaded
+SOURCE_LIST_COLUMNS = (models.Source.id, models.Source.project_id, models.Source.title,
+                       models.Source.type, models.Source.url, models.Source.created_at,
+                       models.Source.status, models.Source.content_length,
+                       models.Source.chunk_count, models.Source.has_summary)
+MAX_PAGE_SIZE = 500
+
+
+def _source_projection(*extra_columns):
+    return (load_only(*SOURCE_LIST_COLUMNS, *extra_columns),)
+
+
+def _after_cursor(model, sort_key, cursor: str, descending: bool):
+    """Filter for rows after the cursor row in (sort_key, id) order; the cursor is the last id of the previous page."""
+    # The anchor's sort key is compared inside the database, so stored timestamp formats always match
+    anchor = select(sort_key).where(model.id == cursor).scalar_subquery()
+    if descending:
+        return or_(sort_key < anchor, and_(sort_key == anchor, model.id < cursor))
+    return or_(sort_key > anchor, and_(sort_key == anchor, model.id > cursor))
+
+
+def _keyset_after(query, model, sort_key, cursor: str, descending: bool):
+    if not query.session.query(model.id).filter(model.id == cursor).first():
+        raise HTTPException(status_code=400, detail="Invalid or stale cursor")
+    return query.filter(_after_cursor(model, sort_key, cursor, descending))
+
+
+async def _keyset_after_async(db: AsyncSession, statement, model, sort_key, cursor: str, descending: bool):
+    if not await db.scalar(select(model.id).where(model.id == cursor)):
+        raise HTTPException(status_code=400, detail="Invalid or stale cursor")
+    return statement.where(_after_cursor(model, sort_key, cursor, descending))
+
+
+def _trim_page(rows: list, limit: Optional[int], response: Response) -> list:
+    """Rows were fetched with limit + 1; expose the next page's cursor as X-Next-Cursor."""
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = rows[-1].id
+    return rows
+
+
+def _page(query, limit: Optional[int], response: Response) -> list:
+    """Apply limit, exposing the next page's cursor as X-Next-Cursor."""
+    if not limit:
+        return query.all()
+    return _trim_page(query.limit(limit + 1).all(), limit, response)
+
+
+async def _page_async(db: AsyncSession, statement, limit: Optional[int], response: Response) -> list:
+    if limit:
+        statement = statement.limit(limit + 1)
+    rows = (await db.execute(statement)).scalars().all()
+    return _trim_page(list(rows), limit, response)
+
+
 @router.get("/projects")
 async def list_projects(
+    response: Response,
     category_id: str = None,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User = Depends(dependencies.get_current_user_async)
 ):
-    """List all projects, optionally filtered by category."""
-    query = db.query(models.Project).filter(models.Project.owner_id == current_user.id)
+    """
+    List projects, most recently updated first, optionally filtered by category.
+
+    Pass limit to page through them; the next page's cursor comes back in
+    the X-Next-Cursor header. Sources are loaded in one extra query with
+    only their listing columns.
+    """
+    sort_key = func.coalesce(models.Project.updated_at, models.Project.created_at)
+    statement = select(models.Project).where(models.Project.owner_id == current_user.id)
     
     if category_id:
-        query = query.filter(models.Project.category_id == category_id)
-    
-    projects = query.order_by(models.Project.updated_at.desc()).all()
+        statement = statement.where(models.Project.category_id == category_id)
+    if cursor:
+        statement = await _keyset_after_async(db, statement, models.Project, sort_key, cursor, descending=True)
+
+    statement = statement.options(
+        load_only(models.Project.id, models.Project.title, models.Project.description,
+                  models.Project.category_id, models.Project.created_at, models.Project.updated_at),
+        selectinload(models.Project.sources).options(*_source_projection()),
+    ).order_by(sort_key.desc(), models.Project.id.desc())
+    projects = await _page_async(db, statement, limit, response)
     
     return [{
         "id": p.id,
@@ -41,7 +117,10 @@ async def list_projects(
             "title": s.title,
             "type": s.type,
             "created_at": s.created_at,
-            "has_content": bool(s.content_text and s.content_text.strip()),
+            "status": s.status,
+            "content_length": s.content_length,
+            "has_content": s.content_length > 0,
+            "has_summary": s.has_summary,
         } for s in p.sources],
         "first_source_id": p.sources[0].id if p.sources else None,
         "first_source_url": p.sources[0].url if p.sources else None,
@@ -51,17 +130,31 @@ async def list_projects(
 @router.get("/projects/{project_id}/details")
 async def get_project_details(
     project_id: str,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Get project details including all sources."""
-    project = db.query(models.Project).filter(
+    """Get project details including its sources (oldest first; pass limit to page them)."""
+    project = db.query(models.Project).options(
+        load_only(models.Project.id, models.Project.title, models.Project.description,
+                  models.Project.category_id, models.Project.created_at, models.Project.updated_at)
+    ).filter(
         models.Project.id == project_id,
         models.Project.owner_id == current_user.id
     ).first()
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
+
+    sources_query = db.query(models.Source).options(
+        *_source_projection(models.Source._summary, models.Source.summary_ref),
+        selectinload(models.Source.summary_stored),
+    ).filter(models.Source.project_id == project.id)
+    if cursor:
+        sources_query = _keyset_after(sources_query, models.Source, models.Source.created_at, cursor, descending=False)
+    sources = _page(sources_query.order_by(models.Source.created_at, models.Source.id), limit, response)
         
     return {
         "id": project.id,
@@ -76,8 +169,11 @@ async def get_project_details(
             "type": s.type,
             "url": s.url,
             "summary": s.summary,
-            "created_at": s.created_at
-        } for s in project.sources]
+            "created_at": s.created_at,
+            "status": s.status,
+            "content_length": s.content_length,
+            "chunk_count": s.chunk_count,
+        } for s in sources]
     }
 
 
@@ -118,10 +214,13 @@ async def create_project(
 @router.get("/{source_id}")
 async def get_source(
     source_id: str, 
-    db: Session = Depends(get_db),
-    current_user: models.User | None = Depends(dependencies.get_optional_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User | None = Depends(dependencies.get_optional_user_async)
 ):
-    source = db.query(models.Source).filter(models.Source.id == source_id).first()
+    source = await db.scalar(select(models.Source).options(
+        *load_content(models.Source, "content_text", "summary"),
+        selectinload(models.Source.project).load_only(models.Project.id, models.Project.title, models.Project.owner_id),
+    ).where(models.Source.id == source_id))
     if not source:
         raise HTTPException(status_code=404, detail="Source not found")
     
@@ -143,7 +242,39 @@ async def get_source(
             "id": source.project.id,
             "title": source.project.title
         } if source.project else None,
-        "created_at": source.created_at
+        "created_at": source.created_at,
+        "status": source.status,
+        "content_length": source.content_length,
+        "chunk_count": source.chunk_count,
+        "has_summary": source.has_summary,
+    }
+
+@router.get("/{source_id}/status")
+async def get_source_status(
+    source_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: models.User | None = Depends(dependencies.get_optional_user_async)
+):
+    """Processing state of a source for polling; reads no text columns."""
+    row = (await db.execute(select(
+        models.Source.id, models.Source.title, models.Source.status, models.Source.content_length,
+        models.Source.chunk_count, models.Source.has_summary, models.Project.owner_id
+    ).outerjoin(models.Project, models.Source.project_id == models.Project.id).where(
+        models.Source.id == source_id
+    ))).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Source not found")
+    if row.owner_id and (not current_user or row.owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not authorized to access this source")
+
+    return {
+        "id": row.id,
+        "title": row.title,
+        "status": row.status,
+        "content_length": row.content_length,
+        "has_content": row.content_length > 0,
+        "chunk_count": row.chunk_count,
+        "has_summary": row.has_summary,
     }
 
 @router.put("/{source_id}/transcript")
@@ -164,6 +295,7 @@ async def update_transcript(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     source.content_text = data.transcript
+    models.set_source_status(source, "completed")
     if source.title == "Processing..." or "Transcript unavailable" in source.title:
         source.title = f"YouTube Video (Manual Transcript)"
     
@@ -173,7 +305,7 @@ async def update_transcript(
 
 @router.get("/")
 async def list_sources(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    sources = db.query(models.Source).join(models.Project).filter(
+    sources = db.query(models.Source).options(*_source_projection()).join(models.Project).filter(
         models.Project.owner_id == current_user.id
     ).order_by(models.Source.created_at.desc()).limit(10).all()
     
@@ -183,7 +315,7 @@ async def list_sources(db: Session = Depends(get_db), current_user: models.User
         "url": s.url,
         "title": s.title,
         "created_at": s.created_at,
-        "status": "Ready" if s.content_text else "Processing"
+        "status": "Ready" if s.content_length else "Processing"
     } for s in sources]
 
 @router.delete("/{source_id}")
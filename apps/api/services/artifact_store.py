@@ -0,0 +1,197 @@
+"""Versioned generated artifacts with a latest-version pointer and retention compaction.
+
+Summaries, quizzes, flashcards, social posts, diagrams, articles and
+podcasts are keyed by (scope, type, variant): scope is "source:<id>" or
+"project:<id>", variant the style/platform the artifact was generated for
+("" when the type has none). Every save adds the next version of the key and
+moves its artifact_heads row to it, so the GET endpoints read the latest
+version with a unique-key lookup instead of ORDER BY created_at over every
+version ever generated.
+
+Old versions are trimmed by a background compaction thread: per key the
+newest ARTIFACT_KEEP_VERSIONS are kept, and versions older than
+ARTIFACT_KEEP_DAYS are dropped as well. A key's latest version is never
+deleted. The same thread also sweeps stored_contents rows that nothing
+points at any more (see content_store.sweep_orphans).
+
+Single-row caches that are updated in place (tutorials, interview
+questions, Vanguard recommendations) are not versioned.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+import models
+from config import settings
+from content_store import load_content, sweep_orphans
+from database import run_write
+
+_lock = threading.Lock()
+_compactor: Optional[threading.Thread] = None
+
+
+def scope_for(source_id: Optional[str] = None, project_id: Optional[str] = None) -> str:
+    if source_id:
+        return f"source:{source_id}"
+    if project_id:
+        return f"project:{project_id}"
+    raise ValueError("An artifact needs a source_id or project_id to be versioned")
+
+
+def _key(scope: str, type: str, variant: Optional[str]) -> list:
+    head = models.ArtifactHead
+    return [head.scope == scope, head.type == type, head.variant == (variant or "").lower()]
+
+
+def _latest_statement(type: str, variant: Optional[str], source_id: Optional[str], project_id: Optional[str]):
+    return (
+        select(models.Artifact)
+        .join(models.ArtifactHead, models.ArtifactHead.artifact_id == models.Artifact.id)
+        .where(*_key(scope_for(source_id, project_id), type, variant))
+        .options(*load_content(models.Artifact, "content"))
+    )
+
+
+class ArtifactStore:
+    @staticmethod
+    def save(db: Session, type: str, content, *, project_id: Optional[str], source_id: Optional[str] = None,
+             variant: Optional[str] = "", title: Optional[str] = None) -> models.Artifact:
+        """Add the next version of the (scope, type, variant) artifact and point the key at it.
+
+        Scoped to the source when source_id is given, else to the project. The
+        caller commits.
+        """
+        scope = scope_for(source_id, project_id)
+        variant = (variant or "").lower()
+        key = _key(scope, type, variant)
+        # Row lock on Postgres so concurrent saves of one key get distinct versions
+        head = db.scalar(select(models.ArtifactHead).where(*key).with_for_update())
+
+        artifact = models.Artifact(
+            project_id=project_id,
+            source_id=source_id,
+            type=type,
+            title=title,
+            content=content,
+            scope=scope,
+            variant=variant,
+            version=head.version + 1 if head else 1,
+        )
+        db.add(artifact)
+        db.flush()
+
+        if head is None:
+            try:
+                with db.begin_nested():
+                    db.add(models.ArtifactHead(scope=scope, type=type, variant=variant,
+                                               artifact_id=artifact.id, version=artifact.version))
+                return artifact
+            except IntegrityError:
+                # Another request created the key first; become the version after it
+                head = db.scalar(select(models.ArtifactHead).where(*key).with_for_update())
+                artifact.version = head.version + 1
+        head.artifact_id = artifact.id
+        head.version = artifact.version
+        return artifact
+
+    @staticmethod
+    def latest(db: Session, type: str, *, source_id: Optional[str] = None, project_id: Optional[str] = None,
+               variant: Optional[str] = "") -> Optional[models.Artifact]:
+        """Latest version of a key, content loaded."""
+        return db.scalar(_latest_statement(type, variant, source_id, project_id))
+
+    @staticmethod
+    async def latest_async(db: AsyncSession, type: str, *, source_id: Optional[str] = None,
+                           project_id: Optional[str] = None, variant: Optional[str] = "") -> Optional[models.Artifact]:
+        return await db.scalar(_latest_statement(type, variant, source_id, project_id))
+
+    @staticmethod
+    def _expired_ids(db: Session, limit: int) -> List[str]:
+        """Versions outside the retention policy, never a key's latest."""
+        artifact = models.Artifact
+        rank = func.row_number().over(
+            partition_by=(artifact.scope, artifact.type, artifact.variant),
+            order_by=artifact.version.desc(),
+        ).label("rank")
+        ranked = select(artifact.id, artifact.created_at, rank).where(artifact.scope.isnot(None)).subquery()
+
+        expired = ranked.c.rank > max(settings.ARTIFACT_KEEP_VERSIONS, 1)
+        if settings.ARTIFACT_KEEP_DAYS > 0:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=settings.ARTIFACT_KEEP_DAYS)
+            expired = or_(expired, and_(ranked.c.rank > 1, ranked.c.created_at < cutoff))
+        return db.scalars(
+            select(ranked.c.id)
+            .where(expired, ranked.c.id.not_in(select(models.ArtifactHead.artifact_id)))
+            .limit(limit)
+        ).all()
+
+    @staticmethod
+    def _delete_batch(db: Session) -> int:
+        ids = ArtifactStore._expired_ids(db, settings.ARTIFACT_COMPACTION_BATCH)
+        if not ids:
+            return 0
+        # Through the ORM so out-of-row content goes with its artifact
+        artifacts = db.scalars(
+            select(models.Artifact).where(models.Artifact.id.in_(ids))
+            .options(selectinload(models.Artifact.content_stored))
+        ).all()
+        for artifact in artifacts:
+            db.delete(artifact)
+        return len(artifacts)
+
+    @staticmethod
+    def compact() -> int:
+        """Delete old artifact versions per the retention settings; returns how many were removed."""
+        removed = 0
+        while True:
+            # One short write transaction per batch (queued behind other writes on SQLite)
+            deleted = run_write(ArtifactStore._delete_batch)
+            removed += deleted
+            if deleted < settings.ARTIFACT_COMPACTION_BATCH:
+                return removed
+
+    @staticmethod
+    def _sweep_batch(db: Session) -> int:
+        return sweep_orphans(db, models.StoredContent, settings.ARTIFACT_COMPACTION_BATCH)
+
+    @staticmethod
+    def sweep_stored_content() -> int:
+        """Delete orphaned stored_contents rows; returns how many were removed."""
+        removed = 0
+        while True:
+            swept = run_write(ArtifactStore._sweep_batch)
+            removed += swept
+            if swept < settings.ARTIFACT_COMPACTION_BATCH:
+                return removed
+
+    @staticmethod
+    def start_compaction():
+        """Start the background compaction thread (no-op if disabled or already running)."""
+        global _compactor
+        if settings.ARTIFACT_COMPACTION_INTERVAL <= 0:
+            return
+        with _lock:
+            if _compactor is None:
+                _compactor = threading.Thread(target=ArtifactStore._compaction_loop, name="artifact-compaction", daemon=True)
+                _compactor.start()
+
+    @staticmethod
+    def _compaction_loop():
+        while True:
+            try:
+                removed = ArtifactStore.compact()
+                if removed:
+                    print(f"Artifact compaction removed {removed} old version(s)")
+                swept = ArtifactStore.sweep_stored_content()
+                if swept:
+                    print(f"Removed {swept} orphaned stored content row(s)")
+            except Exception as e:
+                print(f"Artifact compaction failed: {e}")
+            time.sleep(settings.ARTIFACT_COMPACTION_INTERVAL)
@@ -0,0 +1,281 @@
+"""Audio chunking for Whisper, shared by the API and the transcription worker.
+
+One ffmpeg pass decodes the input once and writes every chunk through the
+segment muxer as 16 kHz mono constant-bitrate MP3. Because the output
+bitrate is fixed, chunk size follows directly from chunk duration, so the
+chunk length is chosen from the bitrate rather than guessed from the input
+file size, and every chunk lands under the Whisper upload limit.
+
+Before encoding, a silencedetect pass finds quiet stretches. Long ones are
+cut out (Whisper bills per audio second and tends to hallucinate on
+silence), and chunk boundaries are placed inside the remaining pauses so
+words are not split across chunks.
+
+This module must stay free of API-only imports (config, database) so the
+worker can import it from the repository checkout.
+"""
+
+import glob
+import math
+import os
+import re
+import subprocess
+import tempfile
+from typing import List, Optional, Tuple
+
+WHISPER_MAX_BYTES = 25 * 1024 * 1024  # Hard upload limit for OpenAI/Groq Whisper
+CHUNK_SAFETY_BYTES = 1 * 1024 * 1024  # Headroom for container/ID3 overhead
+OUTPUT_SAMPLE_RATE = 16000  # Whisper resamples to 16 kHz internally
+OUTPUT_BITRATE_KBPS = 32  # Plenty for mono speech at 16 kHz
+DEFAULT_CHUNK_SECONDS = 600  # Short enough that long recordings fan out across workers
+
+SILENCE_NOISE_DB = -35  # Anything quieter counts as silence
+SILENCE_MIN_SECONDS = 0.4  # Shortest pause usable as a chunk boundary
+SILENCE_DROP_SECONDS = 2.0  # Pauses longer than this are cut out
+SILENCE_PAD_SECONDS = 0.3  # Silence kept on each side of a cut
+MIN_TRIM_SAVINGS_SECONDS = 10.0  # Below this, small files are sent untouched
+
+Interval = Tuple[float, float]
+
+
+class AudioChunker:
+    @staticmethod
+    def ffmpeg_available() -> bool:
+        try:
+            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+            return True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return False
+
+    @staticmethod
+    def probe_duration(audio_file: str) -> Optional[float]:
+        """Duration in seconds via ffprobe, or None if it can't be determined."""
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of',
+             'default=noprint_wrappers=1:nokey=1', audio_file],
+            capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            print(f"Error getting duration: {result.stderr}")
+            return None
+        try:
+            return float(result.stdout.strip())
+        except ValueError:
+            print(f"Could not parse duration: {result.stdout}")
+            return None
+
+    @staticmethod
+    def max_chunk_seconds(max_bytes: int = WHISPER_MAX_BYTES, bitrate_kbps: int = OUTPUT_BITRATE_KBPS) -> int:
+        """Longest chunk that is guaranteed to encode under max_bytes at bitrate_kbps."""
+        bytes_per_second = bitrate_kbps * 1000 / 8
+        return max(1, math.floor((max_bytes - CHUNK_SAFETY_BYTES) / bytes_per_second))
+
+    @staticmethod
+    def detect_silences(
+        audio_file: str,
+        noise_db: int = SILENCE_NOISE_DB,
+        min_seconds: float = SILENCE_MIN_SECONDS,
+        duration: Optional[float] = None,
+        timeout: int = 900,
+    ) -> Optional[List[Interval]]:
+        """Silent (start, end) intervals from ffmpeg silencedetect, or None on failure."""
+        cmd = [
+            'ffmpeg', '-hide_banner', '-nostats', '-vn', '-sn', '-dn',
+            '-i', audio_file,
+            '-af', f'silencedetect=noise={noise_db}dB:d={min_seconds}',
+            '-f', 'null', '-'
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print("Silence detection timed out")
+            return None
+        if result.returncode != 0:
+            print(f"Silence detection failed: {result.stderr.strip()[-300:]}")
+            return None
+
+        silences = []
+        start = None
+        for line in result.stderr.splitlines():
+            start_match = re.search(r'silence_start: (-?[\d.]+)', line)
+            if start_match:
+                start = max(0.0, float(start_match.group(1)))
+                continue
+            end_match = re.search(r'silence_end: ([\d.]+)', line)
+            if end_match and start is not None:
+                silences.append((start, float(end_match.group(1))))
+                start = None
+        if start is not None and duration:
+            # Trailing silence runs to the end of the file
+            silences.append((start, duration))
+        return silences
+
+    @staticmethod
+    def plan_segments(
+        duration: float,
+        silences: List[Interval],
+        chunk_seconds: int,
+        max_seconds: int,
+        drop_seconds: float = SILENCE_DROP_SECONDS,
+        pad_seconds: float = SILENCE_PAD_SECONDS,
+    ) -> Tuple[List[Interval], List[float]]:
+        """
+        Plan which audio to keep and where to cut it.
+
+        Returns (keep, cut_points): keep is the list of original-timeline
+        intervals that survive silence trimming; cut_points are chunk
+        boundaries on the trimmed timeline, each placed in a pause where
+        one exists within reach of the target chunk length.
+        """
+        keep: List[Interval] = []
+        candidates: List[float] = []  # Boundary candidates on the trimmed timeline
+        cursor = 0.0
+        trimmed = 0.0
+        for start, end in silences:
+            if end - start > drop_seconds:
+                cut_start, cut_end = start + pad_seconds, end - pad_seconds
+                if cut_start > cursor:
+                    keep.append((cursor, cut_start))
+                    trimmed += cut_start - cursor
+                candidates.append(trimmed)
+                cursor = max(cursor, cut_end)
+            elif start >= cursor:
+                candidates.append(trimmed + (start + end) / 2 - cursor)
+        if duration > cursor:
+            keep.append((cursor, duration))
+            trimmed += duration - cursor
+
+        cut_points: List[float] = []
+        position = 0.0
+        min_seconds = chunk_seconds * 0.5
+        while trimmed - position > max_seconds or trimmed - position > chunk_seconds * 1.25:
+            target = position + chunk_seconds
+            in_reach = [c for c in candidates if position + min_seconds <= c <= position + max_seconds]
+            cut = min(in_reach, key=lambda c: abs(c - target)) if in_reach else position + min(chunk_seconds, max_seconds)
+            cut_points.append(round(cut, 3))
+            position = cut
+        return keep, cut_points
+
+    @staticmethod
+    def _keep_filter(keep: List[Interval], duration: float) -> Optional[str]:
+        """aselect expression retaining only the keep intervals, or None if nothing is cut."""
+        if len(keep) == 1 and keep[0][0] <= 0 and keep[0][1] >= duration:
+            return None
+        ranges = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in keep)
+        return f"aselect='{ranges}',asetpts=N/SR/TB"
+
+    @staticmethod
+    def segment(
+        input_file: str,
+        output_dir: str,
+        segment_seconds: int,
+        bitrate_kbps: int = OUTPUT_BITRATE_KBPS,
+        prefix: str = "chunk",
+        timeout: int = 900,
+        segment_times: Optional[List[float]] = None,
+        audio_filter: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Decode input_file once and write MP3 segments into output_dir.
+
+        Segments are segment_seconds long unless explicit segment_times (on
+        the filtered timeline) are given. audio_filter is applied before
+        encoding, e.g. to drop silent stretches.
+        """
+        pattern = os.path.join(output_dir, f"{prefix}_%03d.mp3")
+        cmd = [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-i', input_file,
+            '-vn',  # Drop any video stream
+        ]
+        if audio_filter:
+            cmd.extend(['-af', audio_filter])
+        cmd.extend([
+            '-ac', '1',
+            '-ar', str(OUTPUT_SAMPLE_RATE),
+            '-c:a', 'libmp3lame',
+            '-b:a', f'{bitrate_kbps}k',
+            '-f', 'segment',
+        ])
+        if segment_times:
+            cmd.extend(['-segment_times', ",".join(str(t) for t in segment_times)])
+        else:
+            cmd.extend(['-segment_time', str(segment_seconds)])
+        cmd.extend(['-reset_timestamps', '1', pattern])
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg segmentation failed: {result.stderr.strip()[-500:]}")
+        return sorted(glob.glob(os.path.join(output_dir, f"{glob.escape(prefix)}_*.mp3")))
+
+    @staticmethod
+    def split_for_whisper(
+        audio_file: str,
+        output_dir: Optional[str] = None,
+        chunk_seconds: int = DEFAULT_CHUNK_SECONDS,
+        max_bytes: int = WHISPER_MAX_BYTES,
+        always_transcode: bool = False,
+        trim_silence: bool = True,
+    ) -> List[str]:
+        """
+        Split an audio or video file into Whisper-sized chunks in one ffmpeg pass.
+
+        With trim_silence, long pauses are cut out and chunk boundaries fall
+        in pauses. Files that are already small and short (and would not
+        lose much to trimming) are returned as-is unless always_transcode is
+        set (e.g. for video containers Whisper can't read). Otherwise the chunks are written to output_dir (a new temp dir by default) and
+        the caller owns cleaning them up.
+        """
+        if not AudioChunker.ffmpeg_available():
+            print("ffmpeg not available, returning original file")
+            return [audio_file]
+
+        duration = AudioChunker.probe_duration(audio_file)
+        max_seconds = AudioChunker.max_chunk_seconds(max_bytes)
+        segment_seconds = min(chunk_seconds, max_seconds)
+
+        keep, cut_points = None, None
+        if trim_silence and duration:
+            silences = AudioChunker.detect_silences(audio_file, duration=duration)
+            if silences is not None:
+                keep, cut_points = AudioChunker.plan_segments(duration, silences, segment_seconds, max_seconds)
+        kept_seconds = sum(end - start for start, end in keep) if keep else duration
+
+        if (not always_transcode and os.path.getsize(audio_file) <= max_bytes
+                and duration is not None and duration <= chunk_seconds
+                and (duration - kept_seconds) < MIN_TRIM_SAVINGS_SECONDS):
+            return [audio_file]
+
+        output_dir = output_dir or tempfile.mkdtemp(prefix="vk_chunks_")
+        # Source names (e.g. yt-dlp titles) may contain % or glob characters
+        stem = re.sub(r'[^A-Za-z0-9_-]', '_', os.path.splitext(os.path.basename(audio_file))[0])[:40]
+        prefix = f"{stem}_chunk"
+
+        chunk_paths = []
+        if keep:
+            try:
+                # With no cut points the trimmed audio already fits in one chunk
+                chunk_paths = AudioChunker.segment(
+                    audio_file, output_dir, segment_seconds if cut_points else max_seconds, prefix=prefix,
+                    segment_times=cut_points, audio_filter=AudioChunker._keep_filter(keep, duration)
+                )
+                print(f"Silence trimming: {duration:.0f}s -> {kept_seconds:.0f}s of audio, "
+                      f"{len(chunk_paths)} chunks cut at pauses")
+            except Exception as e:
+                print(f"Silence-aware segmentation failed, using fixed-length chunks: {e}")
+                for path in glob.glob(os.path.join(output_dir, f"{glob.escape(prefix)}_*.mp3")):
+                    os.remove(path)
+                chunk_paths = []
+
+        if not chunk_paths:
+            chunk_paths = AudioChunker.segment(audio_file, output_dir, segment_seconds, prefix=prefix)
+            print(f"Split {audio_file} ({duration or 0:.0f}s) into {len(chunk_paths)} chunks of {segment_seconds}s")
+
+        oversized = [path for path in chunk_paths if os.path.getsize(path) > max_bytes]
+        if oversized:
+            # Only possible if the encoder overshoots its bitrate; halve and redo once
+            print(f"{len(oversized)} chunks exceeded {max_bytes} bytes, re-segmenting at half length")
+            for path in chunk_paths:
+                os.remove(path)
+            chunk_paths = AudioChunker.segment(audio_file, output_dir, max(1, segment_seconds // 2), prefix=prefix)
+
+        return chunk_paths if chunk_paths else [audio_file]
@@ -0,0 +1,147 @@
+"""Content-addressed storage for uploaded files.
+
+Uploads are stored once per sha256, either on local disk or in an
+S3-compatible bucket (MinIO works as a local stand-in). Extracted text is
+cached per (sha256, variant) in the blob_extractions table, so re-uploading
+the same PDF or recording - by the same user into another project or by a
+different user - links to the existing extraction instead of re-parsing,
+re-OCRing or re-transcribing it.
+"""
+
+import os
+import shutil
+import uuid
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from config import settings
+
+# Optional boto3 import for the S3-compatible backend
+try:
+    import boto3
+except ImportError:
+    boto3 = None  # Only needed when BLOB_STORE_BACKEND=s3
+
+
+class LocalBlobBackend:
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def exists(self, content_hash: str) -> bool:
+        return os.path.exists(self._path(content_hash))
+
+    def put_file(self, content_hash: str, file_path: str):
+        target = self._path(content_hash)
+        if os.path.exists(target):
+            return
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Unique per call: concurrent uploads of the same hash never share a temp file
+        tmp_target = f"{target}.{uuid.uuid4().hex}.tmp"
+        try:
+            try:
+                # Hard link when the spool is on the same filesystem, copy otherwise
+                os.link(file_path, tmp_target)
+            except OSError:
+                shutil.copyfile(file_path, tmp_target)
+            os.replace(tmp_target, target)
+        except OSError:
+            # Another upload of the same content got there first
+            if not os.path.exists(target):
+                raise
+        finally:
+            if os.path.exists(tmp_target):
+                os.remove(tmp_target)
+
+
+class S3BlobBackend:
+    def __init__(self):
+        if boto3 is None:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 requires boto3 (pip install boto3)")
+        self.bucket = settings.BLOB_S3_BUCKET
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.BLOB_S3_ENDPOINT_URL or None,
+            aws_access_key_id=settings.BLOB_S3_ACCESS_KEY or None,
+            aws_secret_access_key=settings.BLOB_S3_SECRET_KEY or None,
+            region_name=settings.BLOB_S3_REGION or None,
+        )
+
+    def _key(self, content_hash: str) -> str:
+        return f"blobs/{content_hash[:2]}/{content_hash}"
+
+    def exists(self, content_hash: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(content_hash))
+            return True
+        except Exception:
+            return False
+
+    def put_file(self, content_hash: str, file_path: str):
+        if self.exists(content_hash):
+            return
+        # upload_file streams multipart uploads from disk
+        self.client.upload_file(file_path, self.bucket, self._key(content_hash))
+
+
+_backend = None
+
+
+def get_blob_backend():
+    global _backend
+    if _backend is None:
+        if settings.BLOB_STORE_BACKEND == "s3":
+            _backend = S3BlobBackend()
+        else:
+            _backend = LocalBlobBackend(settings.BLOB_STORE_DIR)
+    return _backend
+
+
+class BlobService:
+    @staticmethod
+    def extraction_variant(file_ext: str, content_type: Optional[str], force_ocr: bool) -> str:
+        """Force-OCR'd PDFs get their own extraction; everything else shares 'default'."""
+        is_pdf = file_ext == 'pdf' or bool(content_type and 'pdf' in content_type)
+        return "ocr" if force_ocr and is_pdf else "default"
+
+    @staticmethod
+    def store(content_hash: str, file_path: str):
+        """Persist the spooled upload under its hash (no-op if already stored)."""
+        try:
+            get_blob_backend().put_file(content_hash, file_path)
+        except Exception as e:
+            # The blob is only needed for future re-processing; extraction can proceed
+            print(f"Blob store write failed for {content_hash[:12]}: {e}")
+
+    @staticmethod
+    def find_extraction(db: Session, content_hash: str, variant: str) -> Optional[models.BlobExtraction]:
+        return db.query(models.BlobExtraction).filter(
+            models.BlobExtraction.content_hash == content_hash,
+            models.BlobExtraction.variant == variant
+        ).first()
+
+    @staticmethod
+    def save_extraction(db: Session, content_hash: str, variant: str, source_type: str,
+                        content_text: str, method: Optional[str] = None, size_bytes: Optional[int] = None):
+        if not content_hash or not content_text:
+            return
+        if BlobService.find_extraction(db, content_hash, variant):
+            return
+        db.add(models.BlobExtraction(
+            content_hash=content_hash,
+            variant=variant,
+            source_type=source_type,
+            content_text=content_text,
+            method=method,
+            size_bytes=size_bytes
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent upload of the same file saved it first
+            db.rollback()
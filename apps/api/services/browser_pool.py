@@ -0,0 +1,155 @@
+"""Warm Playwright browser pool for JS-rendered pages.
+
+Playwright's sync API binds its objects to the thread that created them, so
+the pool owns a fixed set of render threads. Each one keeps a running
+Chromium and one reusable browser context for the life of the process.
+Callers on any thread (e.g. the asyncio.to_thread path in ingest_url) submit
+URLs with render() and block on the result, without paying for a browser
+launch per page.
+
+Images, fonts and media are blocked at the context level. A page is
+considered ready once the network goes idle or, on pages that keep
+polling, once the DOM stops changing - instead of a fixed sleep.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from config import settings
+
+# Optional Playwright import for JS-rendered pages
+try:
+    from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+except ImportError:
+    sync_playwright = None  # Playwright not installed
+    PlaywrightTimeoutError = Exception
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36'
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+
+_local = threading.local()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BrowserPool:
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        global _executor
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.BROWSER_POOL_SIZE,
+                    thread_name_prefix="playwright"
+                )
+            return _executor
+
+    @staticmethod
+    def _block_heavy_resources(route):
+        if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    @staticmethod
+    def _close_thread_browser():
+        for name in ("context", "browser"):
+            obj = getattr(_local, name, None)
+            if obj is not None:
+                try:
+                    obj.close()
+                except Exception:
+                    pass
+                setattr(_local, name, None)
+
+    @staticmethod
+    def _thread_context():
+        """This render thread's browser context, (re)launching Chromium if needed."""
+        if getattr(_local, "playwright", None) is None:
+            _local.playwright = sync_playwright().start()
+
+        browser = getattr(_local, "browser", None)
+        if browser is None or not browser.is_connected():
+            BrowserPool._close_thread_browser()
+            print(f"Launching pooled Chromium on {threading.current_thread().name}")
+            _local.browser = _local.playwright.chromium.launch(
+                headless=True,
+                args=['--disable-blink-features=AutomationControlled']
+            )
+
+        # Recycle the context periodically to bound per-context memory growth
+        if getattr(_local, "context", None) is not None and _local.pages_served >= settings.BROWSER_CONTEXT_MAX_PAGES:
+            try:
+                _local.context.close()
+            except Exception:
+                pass
+            _local.context = None
+
+        if getattr(_local, "context", None) is None:
+            context = _local.browser.new_context(
+                user_agent=USER_AGENT,
+                viewport={'width': 1920, 'height': 1080},
+                extra_http_headers={
+                    'Accept-Language': 'en-US,en;q=0.9',
+                    'Upgrade-Insecure-Requests': '1'
+                }
+            )
+            context.route("**/*", BrowserPool._block_heavy_resources)
+            _local.context = context
+            _local.pages_served = 0
+
+        return _local.context
+
+    @staticmethod
+    def _wait_until_ready(page):
+        """Network idle, or failing that a DOM whose size has stopped changing."""
+        try:
+            page.wait_for_load_state("networkidle", timeout=settings.BROWSER_NETWORK_IDLE_MS)
+            return
+        except PlaywrightTimeoutError:
+            pass
+
+        # Pages with long-polling/analytics never go idle; wait for the DOM to settle
+        deadline = time.monotonic() + settings.BROWSER_READY_TIMEOUT_MS / 1000
+        last_size = -1
+        stable_checks = 0
+        while time.monotonic() < deadline:
+            size = page.evaluate("document.body ? document.body.innerHTML.length : 0")
+            if size == last_size and size > 0:
+                stable_checks += 1
+                if stable_checks >= 2:
+                    return
+            else:
+                stable_checks = 0
+            last_size = size
+            page.wait_for_timeout(250)
+
+    @staticmethod
+    def _render_in_thread(url: str) -> str:
+        context = BrowserPool._thread_context()
+        page = context.new_page()
+        try:
+            page.goto(url, wait_until="domcontentloaded", timeout=settings.BROWSER_NAVIGATION_TIMEOUT_MS)
+            BrowserPool._wait_until_ready(page)
+            return page.content()
+        except Exception:
+            # A crashed or wedged browser is relaunched on the next render
+            if _local.browser is None or not _local.browser.is_connected():
+                BrowserPool._close_thread_browser()
+            raise
+        finally:
+            _local.pages_served = getattr(_local, "pages_served", 0) + 1
+            try:
+                page.close()
+                context.clear_cookies()
+            except Exception:
+                pass
+
+    @staticmethod
+    def render(url: str) -> str:
+        """Render url on a pooled browser and return the page HTML (blocking)."""
+        if sync_playwright is None:
+            raise RuntimeError("Playwright is not installed")
+        future = BrowserPool._get_executor().submit(BrowserPool._render_in_thread, url)
+        return future.result(timeout=settings.BROWSER_RENDER_TIMEOUT_MS / 1000)
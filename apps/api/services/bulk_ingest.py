@@ -0,0 +1,234 @@
+"""Bulk URL ingestion: feed expansion, politeness limits and job tracking.
+
+A bulk job takes a list of URLs, or one sitemap, RSS/Atom feed or YouTube
+playlist that expands to many, and runs each item through the normal
+fetch -> extract -> cleanup -> chunk/embed pipeline. Items run
+concurrently under a process-wide cap. Fetches to the same domain are
+further limited and spaced out, so one big sitemap never hammers a single
+host; the domain slot is held only for the fetch, so cleanup and embedding
+of one item overlap with fetching the next.
+
+Jobs are tracked in memory (like AgentOrchestrator); each item's source also
+carries its own status in meta_data, so progress survives a restart even if
+the job record does not.
+"""
+
+import asyncio
+import time
+import uuid
+import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from config import settings
+from .http_fetch import HttpFetcher
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from an element tag."""
+    return tag.rsplit('}', 1)[-1].lower()
+
+
+class DomainLimiter:
+    """Per-domain concurrency limit plus a minimum delay between request starts."""
+
+    def __init__(self, per_domain: int, delay_seconds: float):
+        self.per_domain = per_domain
+        self.delay_seconds = delay_seconds
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_start: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        domain = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(domain, asyncio.Semaphore(self.per_domain))
+        async with semaphore:
+            async with self._locks.setdefault(domain, asyncio.Lock()):
+                wait = self._last_start.get(domain, 0) + self.delay_seconds - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[domain] = time.monotonic()
+            yield
+
+
+class BulkIngestJob:
+    def __init__(self, owner_id: str, project_id: str, urls: List[str]):
+        self.id = str(uuid.uuid4())
+        self.owner_id = owner_id
+        self.project_id = project_id
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.items: List[Dict] = [
+            {"url": url, "url_type": None, "source_id": None, "status": "queued", "error": None}
+            for url in urls
+        ]
+
+    def to_dict(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        done = sum(counts.get(s, 0) for s in ("completed", "failed", "exists"))
+        return {
+            "job_id": self.id,
+            "project_id": self.project_id,
+            "status": self.status,
+            "total": len(self.items),
+            "done": done,
+            "counts": counts,
+            "items": self.items,
+        }
+
+
+class BulkIngestService:
+    _jobs: Dict[str, BulkIngestJob] = {}
+    # Shared by all jobs so concurrent imports don't multiply the load
+    _global_slots: Optional[asyncio.Semaphore] = None
+    _domain_limiter: Optional[DomainLimiter] = None
+
+    @classmethod
+    def global_slot(cls) -> asyncio.Semaphore:
+        if cls._global_slots is None:
+            cls._global_slots = asyncio.Semaphore(settings.BULK_INGEST_CONCURRENCY)
+        return cls._global_slots
+
+    @classmethod
+    def domain_slot(cls, url: str):
+        if cls._domain_limiter is None:
+            cls._domain_limiter = DomainLimiter(settings.BULK_INGEST_PER_DOMAIN, settings.BULK_INGEST_DOMAIN_DELAY)
+        return cls._domain_limiter.slot(url)
+
+    @classmethod
+    def create_job(cls, owner_id: str, project_id: str, urls: List[str]) -> BulkIngestJob:
+        cls._prune_jobs()
+        job = BulkIngestJob(owner_id, project_id, urls)
+        cls._jobs[job.id] = job
+        return job
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[BulkIngestJob]:
+        return cls._jobs.get(job_id)
+
+    @classmethod
+    def _prune_jobs(cls):
+        """Forget finished jobs after BULK_INGEST_JOB_TTL_SECONDS."""
+        cutoff = time.time() - settings.BULK_INGEST_JOB_TTL_SECONDS
+        for job_id in [jid for jid, job in cls._jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del cls._jobs[job_id]
+
+    @staticmethod
+    def normalize_urls(urls: List[str], limit: int) -> List[str]:
+        """Strip, drop blanks and duplicates (keeping order) and cap at limit."""
+        seen = set()
+        result = []
+        for url in urls:
+            url = (url or "").strip()
+            if not url or url in seen:
+                continue
+            seen.add(url)
+            result.append(url)
+            if len(result) >= limit:
+                break
+        return result
+
+    @staticmethod
+    def is_youtube_playlist(url: str) -> bool:
+        parsed = urlparse(url if url.startswith(('http://', 'https://')) else 'https://' + url)
+        return 'youtube.com' in parsed.netloc.lower() and 'list' in parse_qs(parsed.query)
+
+    @staticmethod
+    def _expand_playlist(url: str, limit: int) -> List[str]:
+        import yt_dlp
+
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'extract_flat': 'in_playlist',
+            'playlistend': limit,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+        urls = []
+        for entry in (info or {}).get('entries') or []:
+            if entry and entry.get('id'):
+                urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+        return urls
+
+    @staticmethod
+    def _parse_feed(content: bytes) -> Tuple[List[str], List[str]]:
+        """Return (page URLs, child sitemap URLs) from a sitemap or RSS/Atom document."""
+        try:
+            root = ET.fromstring(content)
+        except ET.ParseError as e:
+            raise ValueError(f"Not a valid sitemap or feed: {e}")
+
+        kind = _local_name(root.tag)
+        urls: List[str] = []
+        children: List[str] = []
+
+        if kind in ('urlset', 'sitemapindex'):
+            target = urls if kind == 'urlset' else children
+            for element in root.iter():
+                if _local_name(element.tag) == 'loc' and element.text:
+                    target.append(element.text.strip())
+        elif kind in ('rss', 'rdf'):
+            for element in root.iter():
+                if _local_name(element.tag) != 'item':
+                    continue
+                for child in element:
+                    if _local_name(child.tag) == 'link' and child.text:
+                        urls.append(child.text.strip())
+                        break
+        elif kind == 'feed':
+            for element in root.iter():
+                if _local_name(element.tag) != 'entry':
+                    continue
+                links = [c for c in element if _local_name(c.tag) == 'link' and c.get('href')]
+                preferred = [c for c in links if c.get('rel', 'alternate') == 'alternate']
+                if preferred or links:
+                    urls.append((preferred or links)[0].get('href').strip())
+        else:
+            raise ValueError("URL is not a sitemap, RSS/Atom feed or YouTube playlist")
+
+        return urls, children
+
+    @staticmethod
+    def _fetch_capped(url: str) -> bytes:
+        """Fetch a feed/sitemap body, streamed and capped at SCRAPER_MAX_HTML_BYTES."""
+        response = HttpFetcher.get(url, timeout=20, stream=True)
+        try:
+            response.raise_for_status()
+            head, chunks = HttpFetcher.open_stream(response)
+            body, truncated = HttpFetcher.read_capped(head, chunks)
+            if truncated:
+                raise ValueError(f"Feed is larger than {settings.SCRAPER_MAX_HTML_BYTES} bytes")
+            return body
+        finally:
+            response.close()
+
+    @staticmethod
+    def expand_feed(url: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Expand a sitemap (including one level of sitemap index), RSS/Atom feed
+        or YouTube playlist into the item URLs it lists. Blocking; call from a
+        thread.
+        """
+        limit = limit or settings.BULK_INGEST_MAX_ITEMS
+        if BulkIngestService.is_youtube_playlist(url):
+            return BulkIngestService._expand_playlist(url, limit)[:limit]
+
+        urls, children = BulkIngestService._parse_feed(BulkIngestService._fetch_capped(url))
+
+        for child_url in children:
+            if len(urls) >= limit:
+                break
+            try:
+                child_urls, _ = BulkIngestService._parse_feed(BulkIngestService._fetch_capped(child_url))
+                urls.extend(child_urls)
+            except Exception as e:
+                print(f"Skipping child sitemap {child_url}: {e}")
+
+        return urls[:limit]
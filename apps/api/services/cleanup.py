@@ -0,0 +1,129 @@
+"""Quality-gated, chunked LLM cleanup of scraped text.
+
+The LLM cleanup pass re-types the whole document, so it is the slowest and
+most expensive step of web ingestion. Before calling it we score the
+extracted text: the share of lines that look like boilerplate (cookie
+notices, share/subscribe prompts, copyright lines, menu-like fragments) and
+the share of repeated lines. If the extractor was confident, or the text
+already scores clean, the LLM is skipped.
+
+When cleanup is needed, the text is split on paragraph boundaries into
+chunks that are cleaned in parallel and reassembled in order. That removes
+the old 50,000-character truncation and bounds the latency by one chunk
+rather than the whole article. A chunk whose cleanup fails keeps its
+original text.
+"""
+
+import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from config import settings
+from .ai import AIService
+
+BOILERPLATE_LINE = re.compile(
+    r'cookie|privacy policy|terms of (use|service)|all rights reserved|©|&copy;|'
+    r'subscribe|sign (in|up)|log ?in|newsletter|share (on|this)|follow us|'
+    r'read more|related (posts|articles)|advertisement|skip to (main )?content|'
+    r'you might also like|back to top|loading\.\.\.', re.I)
+
+# Texts scoring below all of these are considered clean enough
+MAX_BOILERPLATE_RATIO = 0.1
+MAX_REPEATED_LINE_RATIO = 0.05
+MAX_SHORT_LINE_RATIO = 0.5
+
+
+class ContentCleanupService:
+    @staticmethod
+    def assess(text: str) -> Dict:
+        """Text-level quality signals for an extraction."""
+        lines = [line.strip() for line in (text or '').splitlines() if line.strip()]
+        if not lines:
+            return {"lines": 0, "boilerplate_ratio": 0.0, "repeated_line_ratio": 0.0, "short_line_ratio": 0.0}
+
+        normalized = [re.sub(r'\s+', ' ', line.lower()) for line in lines]
+        counts = Counter(normalized)
+        repeated = sum(count for line, count in counts.items() if count > 1 and len(line) > 3)
+        boilerplate = sum(1 for line in lines if len(line) < 200 and BOILERPLATE_LINE.search(line))
+        # One-to-three word fragments are typically menu items, buttons and labels
+        short = sum(1 for line in lines if len(line.split()) <= 3)
+
+        return {
+            "lines": len(lines),
+            "boilerplate_ratio": round(boilerplate / len(lines), 3),
+            "repeated_line_ratio": round(repeated / len(lines), 3),
+            "short_line_ratio": round(short / len(lines), 3),
+        }
+
+    @staticmethod
+    def needs_cleanup(result: Dict) -> bool:
+        """Whether a scrape result should go through the LLM (see SCRAPER_LLM_CLEANUP)."""
+        if settings.SCRAPER_LLM_CLEANUP == "always":
+            return True
+        if settings.SCRAPER_LLM_CLEANUP == "never":
+            return False
+        # The lxml extractor already judged its output clean
+        if not result.get('needs_cleanup', True):
+            return False
+
+        quality = ContentCleanupService.assess(result.get('content', ''))
+        needed = (
+            quality["boilerplate_ratio"] > MAX_BOILERPLATE_RATIO
+            or quality["repeated_line_ratio"] > MAX_REPEATED_LINE_RATIO
+            or quality["short_line_ratio"] > MAX_SHORT_LINE_RATIO
+        )
+        print(f"Extraction quality {quality}: cleanup {'needed' if needed else 'skipped'}")
+        return needed
+
+    @staticmethod
+    def split_chunks(text: str, chunk_chars: int) -> List[str]:
+        """Split on paragraph (then line) boundaries into chunks of at most ~chunk_chars."""
+        chunks: List[str] = []
+        current: List[str] = []
+        size = 0
+        for block in re.split(r'(\n\s*\n)', text):
+            # Hard-split single blocks that are larger than a chunk
+            pieces = [block] if len(block) <= chunk_chars else re.split(r'(?<=\n)', block)
+            for piece in pieces:
+                while len(piece) > chunk_chars:
+                    chunks.append(piece[:chunk_chars])
+                    piece = piece[chunk_chars:]
+                if size + len(piece) > chunk_chars and current:
+                    chunks.append(''.join(current))
+                    current, size = [], 0
+                current.append(piece)
+                size += len(piece)
+        if current:
+            chunks.append(''.join(current))
+        return [chunk for chunk in chunks if chunk.strip()]
+
+    @staticmethod
+    def clean(text: str) -> str:
+        """LLM-clean text in parallel chunks, keeping the original wording and order."""
+        budget = settings.CLEANUP_MAX_CHARS
+        to_clean, remainder = text[:budget], text[budget:]
+        chunks = ContentCleanupService.split_chunks(to_clean, settings.CLEANUP_CHUNK_CHARS)
+        if not chunks:
+            return text
+        print(f"Cleaning {len(to_clean)} chars in {len(chunks)} chunk(s)"
+              + (f"; {len(remainder)} chars beyond CLEANUP_MAX_CHARS kept as-is" if remainder else ""))
+
+        def clean_chunk(chunk: str) -> str:
+            try:
+                cleaned = AIService.cleanup_content(chunk)
+                return cleaned.strip() or chunk.strip()
+            except Exception as e:
+                print(f"Chunk cleanup failed, keeping original text: {e}")
+                return chunk.strip()
+
+        if len(chunks) == 1:
+            cleaned_chunks = [clean_chunk(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(settings.CLEANUP_MAX_WORKERS, len(chunks))) as executor:
+                cleaned_chunks = list(executor.map(clean_chunk, chunks))
+
+        cleaned = '\n\n'.join(cleaned_chunks)
+        if remainder.strip():
+            cleaned += '\n\n' + remainder.strip()
+        return cleaned
@@ -0,0 +1,300 @@
+"""Fast main-content extraction for HTML pages.
+
+An lxml-based, readability-style extractor. Boilerplate containers (nav,
+footers, sidebars, share bars, cookie banners) are dropped. Paragraph-like
+blocks then score their parent and grandparent by text length and comma
+count. Candidates are weighted by class/id hints and penalised by link
+density, and the best candidate is merged with its qualifying siblings.
+
+The result carries quality signals (link density, paragraph count, share of
+the page's text). A confident extraction is clean enough to skip the LLM
+cleanup pass. The original BeautifulSoup heuristics stay available as the
+fallback and as the benchmark baseline. Deliberately free of config/DB
+imports so bench_extraction.py can run it standalone.
+"""
+
+import re
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlparse
+
+# Optional lxml import; the scraper falls back to BeautifulSoup without it
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+STRIP_TAGS = ('script', 'style', 'noscript', 'iframe', 'svg', 'form', 'button',
+              'nav', 'footer', 'aside', 'template', 'canvas', 'select', 'input')
+BLOCK_TAGS = {'p', 'div', 'section', 'article', 'main', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+              'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'pre', 'blockquote', 'table', 'tr', 'td', 'th',
+              'figure', 'figcaption', 'header', 'hr', 'address'}
+PARAGRAPH_TAGS = ('p', 'pre', 'td', 'blockquote')
+KEEP_ALWAYS = {'html', 'body', 'article', 'main'}
+
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|page|post|text|blog|story|prose|hentry', re.I)
+NEGATIVE_HINTS = re.compile(
+    r'comment|footer|footnote|\bnav|menu|sidebar|widget|share|social|related|promo|sponsor|'
+    r'advert|\bads?\b|cookie|consent|subscribe|newsletter|popup|modal|breadcrumb|masthead|'
+    r'signup|login|pagination|toolbar|skip-link|disqus', re.I)
+
+MIN_PARAGRAPH_CHARS = 25
+# Shorter lxml results fall back to the BeautifulSoup heuristics
+MIN_EXTRACTED_CHARS = 200
+# Thresholds for a "confident" extraction that does not need LLM cleanup
+CONFIDENT_MIN_CHARS = 400
+CONFIDENT_MAX_LINK_DENSITY = 0.2
+CONFIDENT_MIN_PARAGRAPHS = 3
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def _class_weight(element) -> int:
+    weight = 0
+    for hint in (element.get('class'), element.get('id')):
+        if not hint:
+            continue
+        if NEGATIVE_HINTS.search(hint):
+            weight -= 25
+        if POSITIVE_HINTS.search(hint):
+            weight += 25
+    return weight
+
+
+def _link_density(element, text_length: Optional[int] = None) -> float:
+    if text_length is None:
+        text_length = len(_normalize(element.text_content()))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(_normalize(a.text_content())) for a in element.iter('a'))
+    return min(link_length / text_length, 1.0)
+
+
+def _tag_weight(tag: str) -> int:
+    if tag in ('div', 'article', 'main', 'section'):
+        return 5
+    if tag in ('pre', 'td', 'blockquote'):
+        return 3
+    if tag in ('address', 'ol', 'ul', 'dl', 'dd', 'dt', 'li'):
+        return -3
+    if tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'th'):
+        return -5
+    return 0
+
+
+def _to_text(element) -> str:
+    """Visible text with paragraph breaks at block boundaries."""
+    parts: List[str] = []
+
+    def walk(node):
+        tag = node.tag if isinstance(node.tag, str) else None
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+        if tag == 'br':
+            parts.append('\n')
+        if tag and node.text:
+            parts.append(node.text)
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    try:
+        walk(element)
+        text = ''.join(parts)
+    except RecursionError:
+        text = element.text_content()
+    lines = (_normalize(line) for line in text.split('\n'))
+    return '\n\n'.join(line for line in lines if line)
+
+
+class ContentExtractor:
+    @staticmethod
+    def available() -> bool:
+        return lxml is not None
+
+    @staticmethod
+    def _title(doc) -> str:
+        og_title = doc.xpath('//meta[@property="og:title"]/@content')
+        if og_title and og_title[0].strip():
+            return og_title[0].strip()
+        title = doc.findtext('.//title')
+        return _normalize(title) if title else ''
+
+    @staticmethod
+    def _meta_description(doc) -> str:
+        for xpath in ('//meta[@property="og:description"]/@content', '//meta[@name="description"]/@content'):
+            values = doc.xpath(xpath)
+            if values and values[0].strip():
+                return values[0].strip()
+        return ''
+
+    @staticmethod
+    def _clean(doc):
+        for element in list(doc.iter(*STRIP_TAGS)):
+            element.drop_tree()
+        for element in list(doc.iter()):
+            if not isinstance(element.tag, str) or element.tag in KEEP_ALWAYS:
+                continue
+            if element.getparent() is None:
+                continue
+            hints = f"{element.get('class', '')} {element.get('id', '')}"
+            if hints.strip() and NEGATIVE_HINTS.search(hints) and not POSITIVE_HINTS.search(hints):
+                element.drop_tree()
+
+    @staticmethod
+    def _score_candidates(doc) -> Dict:
+        scores: Dict = {}
+
+        def initial(element):
+            if element not in scores:
+                scores[element] = _tag_weight(element.tag) + _class_weight(element)
+            return element
+
+        paragraphs = list(doc.iter(*PARAGRAPH_TAGS))
+        # Divs that only hold inline content behave like paragraphs (common in SPA markup)
+        for div in doc.iter('div'):
+            if not any(isinstance(child.tag, str) and child.tag in BLOCK_TAGS for child in div):
+                paragraphs.append(div)
+
+        for paragraph in paragraphs:
+            parent = paragraph.getparent()
+            if parent is None or not isinstance(parent.tag, str):
+                continue
+            text = _normalize(paragraph.text_content())
+            if len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+            score = 1 + text.count(',') + text.count('，') + min(len(text) // 100, 3)
+            scores[initial(parent)] += score
+            grandparent = parent.getparent()
+            if grandparent is not None and isinstance(grandparent.tag, str):
+                scores[initial(grandparent)] += score / 2
+
+        return {element: score * (1 - _link_density(element)) for element, score in scores.items()}
+
+    @staticmethod
+    def _merge_siblings(top, scores: Dict) -> List:
+        parent = top.getparent()
+        if parent is None:
+            return [top]
+        threshold = max(10, scores[top] * 0.2)
+        selected = []
+        for sibling in parent:
+            if not isinstance(sibling.tag, str):
+                continue
+            if sibling is top or scores.get(sibling, 0) >= threshold:
+                selected.append(sibling)
+            elif sibling.tag == 'p':
+                text = _normalize(sibling.text_content())
+                density = _link_density(sibling, len(text))
+                if len(text) > 80 and density < 0.25:
+                    selected.append(sibling)
+                elif text and density == 0 and re.search(r'\.( |$)', text):
+                    selected.append(sibling)
+        return selected
+
+    @staticmethod
+    def extract(html: Union[str, bytes], url: Optional[str] = None) -> Dict:
+        """
+        Extract the main content of an HTML document.
+
+        Returns title, content, method ('lxml'), the quality signals
+        link_density, paragraphs and text_ratio, and confident=True when
+        the output is clean enough to skip LLM cleanup.
+        """
+        if lxml is None:
+            raise RuntimeError("lxml is not installed")
+
+        doc = lxml.html.document_fromstring(html)
+        title = ContentExtractor._title(doc)
+        description = ContentExtractor._meta_description(doc)
+        body = doc.find('body')
+        page_chars = len(_normalize((body if body is not None else doc).text_content()))
+
+        ContentExtractor._clean(doc)
+        scores = ContentExtractor._score_candidates(doc)
+
+        content = ''
+        nodes = []
+        if scores:
+            top = max(scores, key=scores.get)
+            nodes = ContentExtractor._merge_siblings(top, scores)
+            content = '\n\n'.join(filter(None, (_to_text(node) for node in nodes)))
+
+        if not content:
+            body = doc.find('body')
+            if body is not None:
+                nodes = [body]
+                content = _to_text(body)
+        if not content:
+            content = description
+
+        content_chars = len(_normalize(content))
+        link_chars = sum(len(_normalize(a.text_content())) for node in nodes for a in node.iter('a'))
+        link_density = min(link_chars / content_chars, 1.0) if content_chars else 0.0
+        paragraph_count = content.count('\n\n') + 1 if content else 0
+        text_ratio = content_chars / page_chars if page_chars else 0.0
+
+        confident = (
+            content_chars >= CONFIDENT_MIN_CHARS
+            and link_density <= CONFIDENT_MAX_LINK_DENSITY
+            and paragraph_count >= CONFIDENT_MIN_PARAGRAPHS
+        )
+
+        return {
+            'title': title,
+            'content': content,
+            'method': 'lxml',
+            'link_density': round(link_density, 3),
+            'paragraphs': paragraph_count,
+            'text_ratio': round(text_ratio, 3),
+            'confident': confident,
+        }
+
+    @staticmethod
+    def extract_with_soup(html: Union[str, bytes], url: Optional[str] = None) -> Dict:
+        """The original BeautifulSoup heuristics; fallback engine and benchmark baseline."""
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, 'html.parser')
+
+        # Title extraction
+        title_tag = soup.find('title')
+        title = title_tag.get_text(strip=True) if title_tag else (urlparse(url).netloc if url else '')
+
+        # Strip out noisy tags
+        for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'noscript', 'iframe', 'svg']):
+            tag.decompose()
+
+        # Primary content search
+        main_content = (
+            soup.find('main') or
+            soup.find('article') or
+            soup.find('div', class_=re.compile('content|article|post|formatted', re.I)) or
+            soup.find('section', class_=re.compile('content|article|post|body', re.I)) or
+            soup.find('div', id=re.compile('content|article|post|body', re.I))
+        )
+
+        if main_content:
+            # Get all visible text within the main content container
+            content = main_content.get_text(separator='\n', strip=True)
+        else:
+            paragraphs = soup.find_all('p')
+            content = '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+
+        # Meta description fallback
+        if not content:
+            meta = soup.find('meta', property='og:description') or soup.find('meta', attrs={'name': 'description'})
+            if meta:
+                content = meta.get('content', '').strip()
+
+        # Full body fallback
+        if not content:
+            body = soup.body
+            if body:
+                content = body.get_text(separator='\n', strip=True)
+
+        return {'title': title, 'content': content, 'method': 'bs4', 'confident': False}
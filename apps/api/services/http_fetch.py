@@ -0,0 +1,148 @@
+"""Pooled HTTP fetching for the scrapers.
+
+Each worker thread keeps one requests.Session whose adapter pools
+keep-alive connections per host, so repeated fetches (bulk ingest,
+refreshes, fallbacks to the same site) skip the TCP/TLS handshake.
+Transient failures are retried with exponential backoff by urllib3.
+
+Bodies can be streamed (stream=True) and read with a byte cap, so a huge or
+hostile URL never has to fit in memory; large binaries are spooled to disk.
+
+Responses expose their ETag/Last-Modified validators, which callers store
+with the source and send back on refresh; a 304 Not Modified then lets the
+refresh skip re-extraction and re-embedding entirely.
+"""
+
+import itertools
+import threading
+from typing import Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36',
+}
+
+TEXTUAL_CONTENT_TYPES = ('html', 'xml', 'text/', 'json')
+CHUNK_SIZE = 64 * 1024
+
+_local = threading.local()
+
+
+class ResponseTooLarge(Exception):
+    pass
+
+
+class HttpFetcher:
+    @staticmethod
+    def session() -> requests.Session:
+        """The calling thread's pooled session (created on first use)."""
+        session = getattr(_local, "session", None)
+        if session is None:
+            retry = Retry(
+                total=settings.HTTP_RETRIES,
+                backoff_factor=settings.HTTP_RETRY_BACKOFF,
+                # 403/429 are not retried: the scraper falls back to Playwright instead
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(["GET", "HEAD"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=settings.HTTP_POOL_HOSTS,
+                pool_maxsize=settings.HTTP_POOL_PER_HOST,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _local.session = session
+        return session
+
+    @staticmethod
+    def get(url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 20,
+            validators: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """
+        GET url on the pooled session.
+
+        validators is a dict previously returned by cache_validators(); when
+        given, the request is conditional and may return 304 Not Modified.
+        """
+        request_headers = dict(headers or {})
+        if validators:
+            if validators.get("etag"):
+                request_headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                request_headers["If-Modified-Since"] = validators["last_modified"]
+        return HttpFetcher.session().get(url, headers=request_headers, timeout=timeout, **kwargs)
+
+    @staticmethod
+    def cache_validators(response: requests.Response) -> Optional[Dict[str, str]]:
+        """ETag/Last-Modified of a response, or None if the server sent neither."""
+        validators = {}
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag:
+            validators["etag"] = etag
+        if last_modified:
+            validators["last_modified"] = last_modified
+        return validators or None
+
+    @staticmethod
+    def is_textual(content_type: str) -> bool:
+        """True for HTML/XML/text/JSON, and when the server sent no Content-Type."""
+        content_type = (content_type or '').lower()
+        return not content_type or any(t in content_type for t in TEXTUAL_CONTENT_TYPES)
+
+    @staticmethod
+    def open_stream(response: requests.Response) -> Tuple[bytes, Iterator[bytes]]:
+        """Start reading a stream=True response: (first chunk for sniffing, remaining chunks)."""
+        chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+        return next(chunks, b''), chunks
+
+    @staticmethod
+    def declared_length(response: requests.Response) -> Optional[int]:
+        try:
+            return int(response.headers.get('Content-Length', ''))
+        except ValueError:
+            return None
+
+    @staticmethod
+    def read_capped(head: bytes, chunks: Iterator[bytes], max_bytes: Optional[int] = None) -> Tuple[bytes, bool]:
+        """Read a streamed body into memory up to max_bytes: (body, truncated)."""
+        max_bytes = max_bytes or settings.SCRAPER_MAX_HTML_BYTES
+        body = bytearray()
+        for chunk in itertools.chain([head], chunks):
+            room = max_bytes - len(body)
+            if len(chunk) > room:
+                body.extend(chunk[:room])
+                return bytes(body), True
+            body.extend(chunk)
+        return bytes(body), False
+
+    @staticmethod
+    def get_capped(url: str, max_bytes: Optional[int] = None, **kwargs) -> Tuple[bytes, bool]:
+        """GET url streamed and read up to max_bytes (default SCRAPER_MAX_HTML_BYTES): (body, truncated)."""
+        response = HttpFetcher.get(url, stream=True, **kwargs)
+        try:
+            head, chunks = HttpFetcher.open_stream(response)
+            return HttpFetcher.read_capped(head, chunks, max_bytes)
+        finally:
+            response.close()
+
+    @staticmethod
+    def spool_capped(head: bytes, chunks: Iterator[bytes], path: str, max_bytes: int) -> int:
+        """Write a streamed body to path; raises ResponseTooLarge past max_bytes."""
+        size = 0
+        with open(path, 'wb') as out:
+            for chunk in itertools.chain([head], chunks):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResponseTooLarge(f"Response exceeds {max_bytes // (1024 * 1024)}MB limit")
+                out.write(chunk)
+        return size
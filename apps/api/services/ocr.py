@@ -0,0 +1,126 @@
+"""OCR pipeline for scanned PDFs.
+
+Pages are rendered lazily in small ranges (pdf2image first_page/last_page) so
+memory stays bounded by the batch size instead of the page count, and each
+rendered page is OCR'd on a thread pool (tesseract runs as a subprocess, so
+threads give real parallelism). OCR output is cached on disk by page-image
+hash, which makes force_ocr re-runs of the same document near-instant.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from config import settings
+
+
+class OcrService:
+    @staticmethod
+    def _cache_path(image_hash: str) -> str:
+        return os.path.join(settings.OCR_CACHE_DIR, image_hash[:2], f"{image_hash}.txt")
+
+    @staticmethod
+    def _image_hash(image) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"{image.mode}:{image.size}".encode())
+        digest.update(image.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_cache(image_hash: str) -> Optional[str]:
+        path = OcrService._cache_path(image_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_cache(image_hash: str, text: str):
+        path = OcrService._cache_path(image_hash)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"OCR cache write failed: {e}")
+
+    @staticmethod
+    def ocr_page(image) -> str:
+        """OCR a single rendered page, consulting the page-image cache first."""
+        import pytesseract
+
+        image_hash = OcrService._image_hash(image)
+        cached = OcrService._read_cache(image_hash)
+        if cached is not None:
+            return cached
+
+        text = pytesseract.image_to_string(image)
+        OcrService._write_cache(image_hash, text)
+        return text
+
+    @staticmethod
+    def page_count(pdf_path: str) -> int:
+        from pdf2image import pdfinfo_from_path
+
+        info = pdfinfo_from_path(pdf_path)
+        return int(info.get("Pages", 0))
+
+    @staticmethod
+    def ocr_pdf(
+        pdf_path: str,
+        on_page: Optional[Callable[[int, str], None]] = None,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> List[str]:
+        """
+        OCR every page of a PDF and return the page texts in page order.
+
+        Pages are rendered batch_size at a time and OCR'd in parallel.
+        on_page(page_number, text) is called from the calling thread as each
+        page finishes (page numbers are 1-based; completion order is not
+        page order).
+        """
+        from pdf2image import convert_from_path
+
+        workers = workers or settings.OCR_WORKERS or os.cpu_count() or 1
+        batch_size = batch_size or settings.OCR_PAGE_BATCH
+        total_pages = OcrService.page_count(pdf_path)
+        print(f"OCR: {total_pages} pages, {workers} workers, batch size {batch_size}")
+
+        results: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for first_page in range(1, total_pages + 1, batch_size):
+                last_page = min(first_page + batch_size - 1, total_pages)
+                images = convert_from_path(
+                    pdf_path,
+                    dpi=settings.OCR_DPI,
+                    first_page=first_page,
+                    last_page=last_page,
+                    thread_count=min(workers, last_page - first_page + 1),
+                )
+
+                futures = {
+                    executor.submit(OcrService.ocr_page, image): first_page + offset
+                    for offset, image in enumerate(images)
+                }
+                for future in as_completed(futures):
+                    page_number = futures[future]
+                    try:
+                        text = future.result()
+                    except Exception as ocr_error:
+                        print(f"OCR failed for page {page_number}: {ocr_error}")
+                        text = ""
+                    results[page_number] = text
+                    if on_page:
+                        on_page(page_number, text)
+
+                # Drop rendered pages before the next batch is rendered
+                del images, futures
+
+        return [results.get(page, "") for page in range(1, total_pages + 1)]
@@ -2,7 +2,7 @@ import json
 import asyncio
 from typing import Any
 from .agent_base import AgentBase
-from database import SessionLocal
+from database import SessionLocal, run_write
 from models import Source, Artifact
 from .ai import AIService
 from config import settings
@@ -33,19 +33,22 @@ class ProcessingAgent(AgentBase):
                 self.add_memory("system", "Source has no content text. Aborting.")
                 # We return gracefully here because it might be an audio file still transcribing
                 return "No content"
+            project_id, content_text = source.project_id, source.content_text
 
             # EAGER GENERATION DISABLED FOR TOKEN SAVINGS
             # The frontend will trigger these generations on-demand.
             
             # 1. RAG CHUNKING PIPELINE (Multi-Source Vector Generation)
             from models import SourceChunk
-            existing_chunks = db.query(SourceChunk).filter(SourceChunk.source_id == self.source_id).first()
+            existing_chunks = db.query(SourceChunk.id).filter(SourceChunk.source_id == self.source_id).first()
+            # Hand the connection back to the pool while the embeddings are generated
+            db.close()
             if not existing_chunks:
                 self.add_memory("system", "Generating RAG vector embeddings...")
                 import re
                 
                 # Split roughly by double newlines or single newlines
-                chunks_raw = [c.strip() for c in re.split(r'\n+', source.content_text) if len(c.strip()) > 50]
+                chunks_raw = [c.strip() for c in re.split(r'\n+', content_text) if len(c.strip()) > 50]
                 
                 # Group them to roughly ~1000-1500 characters per chunk
                 chunk_groups = []
@@ -74,23 +77,27 @@ class ProcessingAgent(AgentBase):
                     embed_key = ""
 
                 # Generate Math Vectors
-                chunks_created = 0
+                embedded = []
                 for chunk_text in chunk_groups:
                     # Safety check: ensure chunk isn't somehow still too long for embedding models
                     # 15,000 chars is roughly 3,500 - 4,000 tokens, well under the 8,192 limit.
                     safe_chunk = chunk_text[:15000]
                     emb = AIService.generate_embedding(safe_chunk, provider=embed_provider, api_key=embed_key)
-                    new_chunk = SourceChunk(
+                    embedded.append((chunk_text, emb if emb else [])) # Persist as JSON
 
-                        source_id=source.id,
-                        project_id=source.project_id,
-                        content_text=chunk_text,
-                        embedding=emb if emb else [] # Persist as JSON
+                def store_chunks(write_db):
+                    source = write_db.query(Source).filter(Source.id == self.source_id).first()
+                    if not source:
+                        return 0
+                    write_db.add_all(
+                        SourceChunk(source_id=self.source_id, project_id=project_id, content_text=text, embedding=emb)
+                        for text, emb in embedded
                     )
-                    db.add(new_chunk)
-                    chunks_created += 1
-                
-                db.commit()
+                    source.chunk_count = len(embedded)
+                    return len(embedded)
+
+                # One transaction for all chunks, queued behind other writes on SQLite
+                chunks_created = await asyncio.to_thread(run_write, store_chunks)
                 self.add_memory("system", f"Generated {chunks_created} vector chunks for multi-document RAG.")
             else:
                 self.add_memory("system", "Vector embeddings already exist.")
@@ -107,7 +114,6 @@ class ProcessingAgent(AgentBase):
             return "Processing completed successfully"
 
         except Exception as e:
-            db.rollback()
             self.add_memory("error", str(e))
             raise e
         finally:
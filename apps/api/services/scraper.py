@@ -3,8 +3,12 @@
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-import re
-import time
+from typing import Dict, Optional
+from config import settings
+from .http_fetch import HttpFetcher, ResponseTooLarge
+from .uploads import UploadSpool
+from .browser_pool import BrowserPool
+from .extractor import ContentExtractor, MIN_EXTRACTED_CHARS
 # Optional Playwright import for JS-rendered pages
 try:
     from playwright.sync_api import sync_playwright
@@ -81,8 +85,8 @@ class WebScraperService:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html, _ = HttpFetcher.get_capped(url, headers=headers, timeout=10)
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Try to extract post caption/description
             meta_description = soup.find('meta', property='og:description')
@@ -115,8 +119,8 @@ class WebScraperService:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html, _ = HttpFetcher.get_capped(url, headers=headers, timeout=10)
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Extract meta tags
             meta_description = soup.find('meta', property='og:description')
@@ -176,8 +180,8 @@ class WebScraperService:
                 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
+            html, _ = HttpFetcher.get_capped(url, headers=headers, timeout=10)
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Extract title
             title_tag = soup.find('meta', property='og:title')
@@ -201,8 +205,14 @@ class WebScraperService:
             }
     
     @staticmethod
-    def scrape_generic_webpage(url: str) -> dict:
-        """Extract main content from any webpage with robust fallbacks."""
+    def scrape_generic_webpage(url: str, validators: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Extract main content from any webpage with robust fallbacks.
+
+        validators are the 'http_validators' of an earlier result; when the
+        server answers 304 Not Modified the result has not_modified=True and
+        no content, and the caller keeps what it already has.
+        """
         try:
             # Revert to simpler headers as complex ones might trigger stricter anti-bot protections
             headers = {
@@ -210,36 +220,64 @@ class WebScraperService:
                 'Referer': 'https://www.google.com/'
             }
 
-            # Simple retry loop
+            # Pooled keep-alive session; 5xx and connection errors are retried with backoff.
+            # The body is streamed so its size and type can be checked before it is read.
             response = None
-            for attempt in range(3):
-                try:
-                    response = requests.get(url, headers=headers, timeout=20)
-                    
-                    # If blocked (403 Forbidden or 429 Too Many Requests), switch to Playwright immediately
-                    if response.status_code in [403, 429]:
-                        print(f"Request blocked (status {response.status_code}). Attempting Playwright fallback for {url}")
-                        break # Break loop to trigger fallback
-                        
-                    if response.status_code == 200:
-                        break
-                except requests.RequestException:
-                    pass
-                time.sleep(1) # Faster retry
+            try:
+                response = HttpFetcher.get(url, headers=headers, timeout=20, validators=validators, stream=True)
+            except requests.RequestException as e:
+                print(f"Request failed for {url}: {e}")
+
+            if response is not None and response.status_code != 200:
+                response.close()
+
+            if response is not None and response.status_code == 304:
+                print(f"Not modified since last fetch: {url}")
+                return {
+                    'title': urlparse(url).netloc,
+                    'content': '',
+                    'success': True,
+                    'not_modified': True,
+                    'http_validators': validators
+                }
+
+            # If blocked (403 Forbidden or 429 Too Many Requests), switch to Playwright immediately
+            if response is not None and response.status_code in [403, 429]:
+                print(f"Request blocked (status {response.status_code}). Attempting Playwright fallback for {url}")
             
+            html = None
+            http_validators = None
+            if response is not None and response.status_code == 200:
+                # Sent back as If-None-Match/If-Modified-Since on refresh (none for Playwright renders)
+                http_validators = HttpFetcher.cache_validators(response)
+                content_type = response.headers.get('Content-Type', '').lower()
+                try:
+                    head, chunks = HttpFetcher.open_stream(response)
+
+                    # PDF handling – sniffed from the header or the %PDF magic bytes
+                    if 'application/pdf' in content_type or head.startswith(b'%PDF'):
+                        return WebScraperService._scrape_remote_pdf(url, response, head, chunks, http_validators)
+
+                    if not HttpFetcher.is_textual(content_type):
+                        return {
+                            'title': urlparse(url).netloc,
+                            'content': f'Unsupported content type: {content_type}',
+                            'success': False
+                        }
+
+                    html, truncated = HttpFetcher.read_capped(head, chunks, settings.SCRAPER_MAX_HTML_BYTES)
+                    if truncated:
+                        print(f"Page exceeds {settings.SCRAPER_MAX_HTML_BYTES} bytes; parsing the first part only: {url}")
+                finally:
+                    response.close()
+
             # Fallback to Playwright if requests failed or was blocked
-            if (response is None or response.status_code != 200) and sync_playwright:
+            rendered = False
+            if html is None and sync_playwright:
                 try:
                     print(f"Falling back to Playwright for {url}")
-                    rendered_html = WebScraperService._render_page(url)
-                    # If we got here, Playwright success
-                    soup = BeautifulSoup(rendered_html, 'html.parser')
-                    # Mock a response object for common logic below
-                    class MockResponse:
-                        content = rendered_html.encode('utf-8')
-                        headers = {}
-                        status_code = 200 # Mark as success since we got content
-                    response = MockResponse()
+                    html = WebScraperService._render_page(url)
+                    rendered = True
                 except Exception as pw_error:
                     print(f"Playwright fallback failed: {pw_error}")
                     # Return the specific browser error instead of the generic 403
@@ -249,106 +287,37 @@ class WebScraperService:
                         'success': False
                     }
             
-            if response is None or (hasattr(response, 'status_code') and response.status_code != 200):
+            if html is None:
                 return {
                     'title': urlparse(url).netloc,
                     'content': f'Failed to fetch page (status {getattr(response, "status_code", "unknown")})',
                     'success': False
                 }
 
-            # PDF handling – if the URL points to a PDF or the response is a PDF, extract text
-            content_type = response.headers.get('Content-Type', '')
-            if url.lower().endswith('.pdf') or 'application/pdf' in content_type:
+            # If the fetched HTML is very short, it likely needs JavaScript rendering.
+            if len(html) < 500 and sync_playwright and not rendered:
                 try:
-                    from io import BytesIO
-                    # Attempt to import PyPDF2 locally to avoid global dependency issues
-                    from PyPDF2 import PdfReader
-                    pdf_stream = BytesIO(response.content)
-                    reader = PdfReader(pdf_stream)
-                    pdf_text = []
-                    for page in reader.pages:
-                        pdf_text.append(page.extract_text() or '')
-                    content = '\n\n'.join(pdf_text).strip()
-                    title = urlparse(url).netloc
-                    return {
-                        'title': title,
-                        'content': content or 'PDF content could not be extracted',
-                        'success': bool(content)
-                    }
-                except ImportError:
-                    return {
-                        'title': urlparse(url).netloc,
-                        'content': 'PDF extraction requires PyPDF2 library (pip install PyPDF2)',
-                        'success': False
-                    }
+                    print(f"Content too short ({len(html)} bytes). Retrying with Playwright...")
+                    html = WebScraperService._render_page(url)
                 except Exception as e:
-                    return {
-                        'title': urlparse(url).netloc,
-                        'content': f'Failed to extract PDF: {str(e)}',
-                        'success': False
-                    }
-
-            # If not already parsed by Playwright block
-            if not isinstance(response, BeautifulSoup): 
-                # If the fetched HTML is very short, it likely needs JavaScript rendering.
-                if len(response.content) < 500 and sync_playwright:
-                    try:
-                        print(f"Content too short ({len(response.content)} bytes). Retrying with Playwright...")
-                        rendered_html = WebScraperService._render_page(url)
-                        soup = BeautifulSoup(rendered_html, 'html.parser')
-                    except Exception as e:
-                        # Fallback to raw content if Playwright fails
-                        print(f"Playwright short-content fallback failed: {e}")
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                else:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # remainder of logic...
-            
-            # Title extraction
-            title_tag = soup.find('title')
-            title = title_tag.get_text(strip=True) if title_tag else urlparse(url).netloc
-
-            # Strip out noisy tags
-            for tag in soup(['script', 'style', 'nav', 'footer', 'header', 'noscript', 'iframe', 'svg']):
-                tag.decompose()
+                    # Fallback to raw content if Playwright fails
+                    print(f"Playwright short-content fallback failed: {e}")
 
-            # Primary content search
-            main_content = (
-                soup.find('main') or
-                soup.find('article') or
-                soup.find('div', class_=re.compile('content|article|post|formatted', re.I)) or
-                soup.find('section', class_=re.compile('content|article|post|body', re.I)) or
-                soup.find('div', id=re.compile('content|article|post|body', re.I))
-            )
-
-            if main_content:
-                # Get all visible text within the main content container
-                content = main_content.get_text(separator='\n', strip=True)
-            else:
-                paragraphs = soup.find_all('p')
-                content = '\n\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-
-            # Meta description fallback
-            if not content:
-                meta = soup.find('meta', property='og:description') or soup.find('meta', attrs={'name': 'description'})
-                if meta:
-                    content = meta.get('content', '').strip()
-
-            # Full body fallback
-            if not content:
-                body = soup.body
-                if body:
-                    content = body.get_text(separator='\n', strip=True)
+            extraction = WebScraperService.extract_content(html, url)
+            title = extraction['title'] or urlparse(url).netloc
+            content = extraction['content']
 
             # Length guard - increased for long articles
-            if len(content) > 100000:
-                content = content[:100000] + "\n\n[Content truncated...]"
+            if len(content) > settings.SCRAPER_MAX_TEXT_CHARS:
+                content = content[:settings.SCRAPER_MAX_TEXT_CHARS] + "\n\n[Content truncated...]"
 
             return {
                 'title': title,
                 'content': content or "Could not extract meaningful content from webpage",
-                'success': bool(content)
+                'success': bool(content),
+                'http_validators': http_validators,
+                # Confident lxml extractions are already clean; LLM cleanup is optional for them
+                'needs_cleanup': not extraction.get('confident', False)
             }
         except Exception as e:
             return {
@@ -357,64 +326,101 @@ class WebScraperService:
                 'success': False
             }
 
+    @staticmethod
+    def _scrape_remote_pdf(url: str, response, head: bytes, chunks, http_validators: Optional[Dict[str, str]]) -> dict:
+        """Spool a streamed PDF to disk and extract it page by page up to the text budget."""
+        title = urlparse(url).netloc
+        declared = HttpFetcher.declared_length(response)
+        if declared and declared > settings.SCRAPER_MAX_PDF_BYTES:
+            return {
+                'title': title,
+                'content': f'PDF is too large ({declared // (1024 * 1024)}MB, limit {settings.SCRAPER_MAX_PDF_BYTES // (1024 * 1024)}MB)',
+                'success': False
+            }
+
+        path = UploadSpool.spool_path('pdf')
+        try:
+            HttpFetcher.spool_capped(head, chunks, path, settings.SCRAPER_MAX_PDF_BYTES)
+
+            # Attempt to import PyPDF2 locally to avoid global dependency issues
+            from PyPDF2 import PdfReader
+            reader = PdfReader(path)
+            pdf_text = []
+            text_chars = 0
+            for page_number, page in enumerate(reader.pages, start=1):
+                page_text = page.extract_text() or ''
+                pdf_text.append(page_text)
+                text_chars += len(page_text)
+                if text_chars >= settings.SCRAPER_MAX_TEXT_CHARS:
+                    print(f"PDF text budget reached after page {page_number}/{len(reader.pages)}; stopping early")
+                    break
+            content = '\n\n'.join(pdf_text).strip()
+            return {
+                'title': title,
+                'content': content or 'PDF content could not be extracted',
+                'success': bool(content),
+                'http_validators': http_validators
+            }
+        except ImportError:
+            return {
+                'title': title,
+                'content': 'PDF extraction requires PyPDF2 library (pip install PyPDF2)',
+                'success': False
+            }
+        except ResponseTooLarge as e:
+            return {
+                'title': title,
+                'content': f'PDF is too large: {str(e)}',
+                'success': False
+            }
+        except Exception as e:
+            return {
+                'title': title,
+                'content': f'Failed to extract PDF: {str(e)}',
+                'success': False
+            }
+        finally:
+            UploadSpool.remove(path)
+
+    @staticmethod
+    def extract_content(html, url: str) -> dict:
+        """Main-content extraction: lxml density scoring first, BeautifulSoup as the fallback."""
+        if ContentExtractor.available():
+            try:
+                extraction = ContentExtractor.extract(html, url)
+                if len(extraction['content']) >= MIN_EXTRACTED_CHARS:
+                    return extraction
+                print(f"lxml extraction too short ({len(extraction['content'])} chars); falling back to BeautifulSoup")
+            except Exception as e:
+                print(f"lxml extraction failed for {url}: {e}")
+        return ContentExtractor.extract_with_soup(html, url)
+
     @staticmethod
     def _render_page(url: str) -> str:
         """
-        Render a page using Playwright to get fully loaded HTML.
+        Render a page on the warm Playwright browser pool to get fully loaded HTML.
         Returns the page content as a string.
         """
         if sync_playwright is None:
             raise RuntimeError("Playwright is not installed")
-            
-        print(f"Launching Playwright for {url}")
-        with sync_playwright() as p:
-            # Use improved stealth args
-            browser = p.chromium.launch(
-                headless=True,
-                args=['--disable-blink-features=AutomationControlled']
-            )
-            
-            context = browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080}
-            )
-            
-            page = context.new_page()
-            
-            # Add extra headers
-            page.set_extra_http_headers({
-                'Accept-Language': 'en-US,en;q=0.9',
-                'Upgrade-Insecure-Requests': '1'
-            })
-            
-            try:
-                # Use domcontentloaded for faster/safer loading, then wait a bit
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
-                # Small wait for dynamic content hydration (common in SPA like Claude)
-                page.wait_for_timeout(5000) 
-                content = page.content()
-            except Exception as e:
-                print(f"Playwright navigation failed: {e}")
-                raise e
-            finally:
-                browser.close()
-                
-            return content
+
+        print(f"Rendering {url} with pooled Playwright browser")
+        return BrowserPool.render(url)
 
     @staticmethod
-    def scrape_url(url: str) -> dict:
-        """Main method to scrape any URL"""
+    def scrape_url(url: str, validators: Optional[Dict[str, str]] = None) -> dict:
+        """Main method to scrape any URL (validators make web fetches conditional)"""
         url_type = WebScraperService.detect_url_type(url)
         
         if url_type == 'instagram':
             return WebScraperService.scrape_instagram(url)
         elif url_type == 'linkedin':
             # Use generic scraper for LinkedIn as it needs the same robust handling (Playwright/Headers)
-            return WebScraperService.scrape_generic_webpage(url)
+            return WebScraperService.scrape_generic_webpage(url, validators)
         elif url_type == 'ted':
             return WebScraperService.scrape_ted(url)
         elif url_type == 'web':
-            return WebScraperService.scrape_generic_webpage(url)
+            return WebScraperService.scrape_generic_webpage(url, validators)
         else:
             # YouTube is handled separately
             return {
@@ -0,0 +1,123 @@
+"""Cross-user transcript cache keyed by platform + canonical video ID.
+
+The same video reached through different URL shapes (watch?v=, youtu.be,
+shorts, embed, tracking query strings) maps to one cache entry, so a
+popular video is downloaded and transcribed once per deployment rather
+than once per user.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from config import settings
+
+
+class TranscriptCacheService:
+    @staticmethod
+    def canonical_video_key(url: str) -> Optional[Tuple[str, str]]:
+        """Return (platform, video_id) for a supported video URL, else None."""
+        url = url.strip()
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        parsed = urlparse(url)
+        host = parsed.netloc.lower().split(':')[0]
+        if host.startswith('www.') or host.startswith('m.'):
+            host = host.split('.', 1)[1]
+        path = parsed.path
+
+        if host in ('youtube.com', 'music.youtube.com', 'youtube-nocookie.com', 'youtu.be'):
+            video_id = None
+            if host == 'youtu.be':
+                video_id = path.strip('/').split('/')[0]
+            elif path == '/watch':
+                video_id = parse_qs(parsed.query).get('v', [None])[0]
+            else:
+                match = re.match(r'^/(?:embed|shorts|live|v)/([^/?#]+)', path)
+                video_id = match.group(1) if match else None
+            if video_id and re.fullmatch(r'[0-9A-Za-z_-]{11}', video_id):
+                return ('youtube', video_id)
+            return None
+
+        if host == 'ted.com':
+            match = re.match(r'^/talks/([^/?#]+)', path)
+            return ('ted', match.group(1).lower()) if match else None
+
+        if host == 'instagram.com':
+            match = re.match(r'^/(?:[^/]+/)?(?:reel|reels|p|tv)/([^/?#]+)', path)
+            return ('instagram', match.group(1)) if match else None
+
+        if host == 'tiktok.com':
+            match = re.search(r'/video/(\d+)', path)
+            return ('tiktok', match.group(1)) if match else None
+
+        if host in ('vimeo.com', 'player.vimeo.com'):
+            match = re.search(r'/(?:video/)?(\d+)(?:/|$)', path)
+            return ('vimeo', match.group(1)) if match else None
+
+        return None
+
+    @staticmethod
+    def get(db: Session, url: str, max_age_hours: Optional[int] = None) -> Optional[Dict]:
+        """Cached transcript for url if one exists and is younger than max_age_hours."""
+        key = TranscriptCacheService.canonical_video_key(url)
+        if not key:
+            return None
+        if max_age_hours is None:
+            max_age_hours = settings.TRANSCRIPT_CACHE_TTL_HOURS
+
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=max_age_hours)
+        entry = db.query(models.TranscriptCache).filter(
+            models.TranscriptCache.platform == key[0],
+            models.TranscriptCache.video_id == key[1],
+            models.TranscriptCache.fetched_at >= cutoff
+        ).first()
+        if not entry:
+            return None
+
+        print(f"Transcript cache hit for {key[0]}:{key[1]} (method: {entry.method})")
+        return {
+            "success": True,
+            "method": f"cache_{entry.method}" if entry.method else "cache",
+            "content": entry.transcript,
+            "title": entry.title,
+        }
+
+    @staticmethod
+    def put(db: Session, url: str, result: Dict):
+        """Store a successful process_video-style result; failures are never cached.
+
+        Runs in a savepoint and leaves committing to the caller, so a losing
+        race with another ingest of the same video never rolls back the
+        caller's own changes.
+        """
+        key = TranscriptCacheService.canonical_video_key(url)
+        content = result.get("content") if result.get("success") else None
+        if not key or not content or not content.strip():
+            return
+
+        method = result.get("method")
+        if method and method.startswith("cache"):
+            return
+
+        try:
+            with db.begin_nested():
+                entry = db.query(models.TranscriptCache).filter(
+                    models.TranscriptCache.platform == key[0],
+                    models.TranscriptCache.video_id == key[1]
+                ).first()
+                if not entry:
+                    entry = models.TranscriptCache(platform=key[0], video_id=key[1])
+                    db.add(entry)
+                entry.transcript = content
+                entry.title = result.get("title") or entry.title
+                entry.method = method
+                entry.fetched_at = datetime.now(timezone.utc)
+        except IntegrityError:
+            # Another ingest of the same video stored it first
+            pass
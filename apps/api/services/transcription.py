@@ -0,0 +1,132 @@
+"""Whisper transcription of audio chunks (OpenAI with Groq fallback).
+
+Chunks are transcribed concurrently on a thread pool and reassembled in
+order. Each provider has its own concurrency limiter so a burst of chunks
+from one long recording cannot exceed the provider's request budget.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import httpx
+from openai import OpenAI
+
+from config import settings
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+OPENAI_WHISPER_MODEL = "whisper-1"
+GROQ_WHISPER_MODEL = "whisper-large-v3-turbo"
+
+_limiters: Dict[str, threading.BoundedSemaphore] = {}
+_limiters_lock = threading.Lock()
+
+
+def _provider_limiter(provider: str) -> threading.BoundedSemaphore:
+    """Process-wide limiter shared by every transcription job for a provider."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = threading.BoundedSemaphore(max(1, settings.WHISPER_MAX_CONCURRENCY))
+        return _limiters[provider]
+
+
+def is_quota_error(error: Exception) -> bool:
+    return "429" in str(error) or "insufficient_quota" in str(error)
+
+
+class TranscriptionService:
+    """
+    Transcribes one recording split into chunk files.
+
+    The OpenAI -> Groq switch is sticky per job: once OpenAI reports a quota
+    error, remaining chunks go straight to Groq instead of each paying for a
+    failed OpenAI round trip first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers: Dict[str, OpenAI] = {}
+        if settings.OPENAI_API_KEY:
+            self._providers["openai"] = OpenAI(api_key=settings.OPENAI_API_KEY, http_client=httpx.Client())
+        if settings.GROQ_API_KEY:
+            self._providers["groq"] = OpenAI(api_key=settings.GROQ_API_KEY, base_url=GROQ_BASE_URL, http_client=httpx.Client())
+        if not self._providers:
+            raise ValueError("Audio transcription requires an OpenAI or Groq API key.")
+        self._active = "openai" if "openai" in self._providers else "groq"
+        print(f"Using {self._active} Whisper for transcription" +
+              (" (will fall back to Groq on quota error)" if self._active == "openai" and "groq" in self._providers else ""))
+
+    @staticmethod
+    def _model_for(provider: str) -> str:
+        return OPENAI_WHISPER_MODEL if provider == "openai" else GROQ_WHISPER_MODEL
+
+    @staticmethod
+    def transcribe_with_retry(client: OpenAI, audio_file_path: str, max_retries: int = 3, model: str = OPENAI_WHISPER_MODEL) -> str:
+        """Transcribe audio file with retry logic"""
+        for attempt in range(max_retries):
+            try:
+                with open(audio_file_path, "rb") as audio_file:
+                    transcript = client.audio.transcriptions.create(
+                        model=model,
+                        file=audio_file,
+                        response_format="text"
+                    )
+                    return transcript
+            except Exception as e:
+                # Quota errors won't resolve with retries — fail fast so caller can switch provider
+                if is_quota_error(e):
+                    raise e
+                print(f"Transcription attempt {attempt + 1} failed: {str(e)}")
+                if attempt < max_retries - 1:
+                    time.sleep(2 ** attempt)  # Exponential backoff
+                else:
+                    raise e
+
+        # This should never be reached, but just in case
+        raise RuntimeError("All transcription attempts failed")
+
+    def _switch_to_groq(self, failed_provider: str) -> bool:
+        with self._lock:
+            if self._active == "groq":
+                return True
+            if failed_provider == "openai" and "groq" in self._providers:
+                print("OpenAI quota exceeded, switching to Groq for remaining chunks...")
+                self._active = "groq"
+                return True
+            return False
+
+    def transcribe_file(self, audio_file_path: str) -> str:
+        """Transcribe a single chunk under the provider limiter, with per-chunk fallback."""
+        provider = self._active
+        try:
+            with _provider_limiter(provider):
+                return self.transcribe_with_retry(self._providers[provider], audio_file_path, model=self._model_for(provider))
+        except Exception as e:
+            if not (is_quota_error(e) and provider != "groq" and self._switch_to_groq(provider)):
+                raise
+        with _provider_limiter("groq"):
+            return self.transcribe_with_retry(self._providers["groq"], audio_file_path, model=GROQ_WHISPER_MODEL)
+
+    def transcribe_chunks(self, chunk_paths: List[str]) -> List[Optional[str]]:
+        """
+        Transcribe chunk files concurrently.
+
+        Returns one entry per chunk in input order; a chunk that failed after
+        retries and fallback is None so callers can decide whether a partial
+        transcript is acceptable.
+        """
+        def run(index: int, chunk_path: str) -> Optional[str]:
+            print(f"Transcribing chunk {index + 1}/{len(chunk_paths)}: {chunk_path}")
+            try:
+                return self.transcribe_file(chunk_path)
+            except Exception as e:
+                print(f"Failed to transcribe chunk {index + 1}: {str(e)}")
+                return None
+
+        if len(chunk_paths) == 1:
+            return [run(0, chunk_paths[0])]
+
+        workers = max(1, min(len(chunk_paths), settings.WHISPER_MAX_CONCURRENCY))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run, range(len(chunk_paths)), chunk_paths))
@@ -0,0 +1,59 @@
+"""Spooling of uploaded files to disk.
+
+Uploads are copied to the spool directory in fixed-size chunks while their
+sha256 is computed, so the API holds at most one chunk of any upload in
+memory regardless of file size. Background processing then works from the
+spooled path.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Tuple
+
+from fastapi import UploadFile
+
+from config import settings
+
+
+class UploadSpool:
+    @staticmethod
+    def spool_path(file_ext: str = "") -> str:
+        os.makedirs(settings.UPLOAD_SPOOL_DIR, exist_ok=True)
+        suffix = f".{file_ext}" if file_ext else ""
+        return os.path.join(settings.UPLOAD_SPOOL_DIR, f"{uuid.uuid4().hex}{suffix}")
+
+    @staticmethod
+    async def spool(upload: UploadFile, file_ext: str = "") -> Tuple[str, str, int]:
+        """
+        Stream an UploadFile to the spool directory.
+
+        Returns (path, sha256 hex digest, size in bytes). The caller owns the
+        file and must remove it when processing is done.
+        """
+        path = UploadSpool.spool_path(file_ext)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(path, "wb") as out:
+                while True:
+                    chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    # Disk writes happen off the event loop
+                    await asyncio.to_thread(out.write, chunk)
+        except Exception:
+            UploadSpool.remove(path)
+            raise
+        return path, digest.hexdigest(), size
+
+    @staticmethod
+    def remove(path: str):
+        try:
+            if path and os.path.exists(path):
+                os.unlink(path)
+        except OSError as e:
+            print(f"Failed to remove spooled upload {path}: {e}")
@@ -2,7 +2,7 @@ from typing import List, Dict, Any, Optional
 import json
 import asyncio
 from config import settings
-from database import SessionLocal
+from database import SessionLocal, submit_write
 from models import Source, Artifact, Project
 from .ai import AIService
 import logging
@@ -215,31 +215,31 @@ Candidate Resources:
         finally:
             db.close()
 
+    @staticmethod
+    def _upsert_artifact(db, source_id: str, project_id: Optional[str], content: dict):
+        existing = db.query(Artifact).filter(
+            Artifact.source_id == source_id,
+            Artifact.type == "recommendation"
+        ).order_by(Artifact.created_at.desc()).first()
+        if existing:
+            existing.content = content
+        else:
+            db.add(Artifact(
+                project_id=project_id,
+                source_id=source_id,
+                type="recommendation",
+                title="Vanguard Mastery Briefing",
+                content=content,
+            ))
+
     @staticmethod
     def _save_artifact(source_id: str, project_id: Optional[str], content: dict):
-        """Upsert a recommendation artifact for source_id."""
-        db = SessionLocal()
-        try:
-            existing = db.query(Artifact).filter(
-                Artifact.source_id == source_id,
-                Artifact.type == "recommendation"
-            ).order_by(Artifact.created_at.desc()).first()
-            if existing:
-                existing.content = content
-            else:
-                db.add(Artifact(
-                    project_id=project_id,
-                    source_id=source_id,
-                    type="recommendation",
-                    title="Vanguard Mastery Briefing",
-                    content=content,
-                ))
-            db.commit()
-        except Exception as e:
-            logger.error(f"Vanguard: Failed to save artifact for {source_id}: {e}")
-            db.rollback()
-        finally:
-            db.close()
+        """Upsert a recommendation artifact for source_id (through the writer queue, without waiting)."""
+        def log_failure(future):
+            if future.exception() is not None:
+                logger.error(f"Vanguard: Failed to save artifact for {source_id}: {future.exception()}")
+
+        submit_write(VanguardService._upsert_artifact, source_id, project_id, content).add_done_callback(log_failure)
 
     @staticmethod
     async def research_and_recommend(source_id: str):
@@ -0,0 +1,215 @@
+"""Submit/poll client for the transcription worker (apps/worker).
+
+Transcriptions are submitted as jobs: the worker answers immediately with a
+job id and the caller polls GET /jobs/{job_id} with short requests until the
+job finishes. A dropped connection costs one poll rather than the whole
+transcription, and no socket is held open for minutes.
+
+When WORKER_CALLBACK_URL is set, the worker also POSTs the finished job to
+/ingest/worker-callback, which wakes the waiting poller immediately instead
+of at its next poll tick. Workers that predate the job API (404 on submit)
+are called through the old synchronous endpoints.
+
+Which worker gets a job is decided by WorkerPool (services/worker_pool.py).
+A submission a worker cannot take (busy, unreachable) moves on to the next
+one. Connection failures count towards that worker's circuit breaker.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from config import settings
+from .http_fetch import HttpFetcher
+from .worker_pool import WorkerPool, WorkerState
+
+# ngrok-skip-browser-warning lets requests through ngrok-tunnelled workers
+WORKER_HEADERS = {
+    "ngrok-skip-browser-warning": "69420",
+    "User-Agent": "vibeknowing-backend",
+}
+# Consecutive failed status polls before the job is given up on
+MAX_POLL_FAILURES = 5
+
+_waiters: Dict[str, threading.Event] = {}
+_waiters_lock = threading.Lock()
+
+
+class WorkerError(Exception):
+    pass
+
+
+class WorkerUnavailable(WorkerError):
+    """The worker itself failed (unreachable, 5xx, lost the job), not the transcription."""
+
+
+class WorkerBusy(WorkerError):
+    """The worker's job queue is full."""
+
+
+def _describe(response) -> str:
+    """Status plus the page title or body start (tunnels return HTML error pages)."""
+    text = response.text or ''
+    match = re.search(r'<title>(.*?)</title>', text, re.IGNORECASE)
+    return f"status {response.status_code}: {match.group(1) if match else text[:300]}"
+
+
+def _check_submission(response) -> Optional[str]:
+    if response.status_code in (404, 405):
+        return None
+    if response.status_code == 503 and response.headers.get("Retry-After"):
+        raise WorkerBusy(f"Worker queue is full, {_describe(response)}")
+    if response.status_code >= 500:
+        raise WorkerUnavailable(f"Job submission failed, {_describe(response)}")
+    if response.status_code != 202:
+        raise WorkerError(f"Job submission failed, {_describe(response)}")
+    return response.json()["job_id"]
+
+
+class WorkerClient:
+    @staticmethod
+    def _callback_url() -> Optional[str]:
+        return settings.WORKER_CALLBACK_URL or None
+
+    @staticmethod
+    def submit_url(base_url: str, url: str) -> Optional[str]:
+        """Queue a video URL; returns the job id, or None if the worker has no job API."""
+        try:
+            response = HttpFetcher.session().post(
+                f"{base_url}/jobs/transcribe",
+                json={"url": url, "callback_url": WorkerClient._callback_url()},
+                headers=WORKER_HEADERS, timeout=30,
+            )
+        except OSError as e:
+            raise WorkerUnavailable(f"Worker unreachable: {e}")
+        return _check_submission(response)
+
+    @staticmethod
+    def submit_file(base_url: str, file_path: str, filename: str, content_type: str) -> Optional[str]:
+        """Upload a media file as a job; returns the job id, or None if the worker has no job API."""
+        import httpx
+
+        data = {"callback_url": WorkerClient._callback_url()} if WorkerClient._callback_url() else None
+        # httpx streams the multipart body from the open file in small blocks
+        try:
+            with open(file_path, 'rb') as upload:
+                files = {'file': (filename, upload, content_type)}
+                response = httpx.post(f"{base_url}/jobs/transcribe-file",
+                                      files=files, data=data, headers=WORKER_HEADERS, timeout=600)
+        except httpx.TransportError as e:
+            raise WorkerUnavailable(f"Worker unreachable: {e}")
+        return _check_submission(response)
+
+    @staticmethod
+    def notify(job_id: str):
+        """Called from the worker callback: wake the thread waiting on job_id, if it is ours."""
+        with _waiters_lock:
+            event = _waiters.get(job_id)
+        if event:
+            event.set()
+
+    @staticmethod
+    def wait(base_url: str, job_id: str, timeout: Optional[float] = None) -> Dict:
+        """Poll a job until it finishes; returns its result or raises WorkerError."""
+        timeout = timeout or settings.WORKER_JOB_TIMEOUT
+        deadline = time.monotonic() + timeout
+        status_url = f"{base_url}/jobs/{job_id}"
+        event = threading.Event()
+        with _waiters_lock:
+            _waiters[job_id] = event
+
+        failures = 0
+        try:
+            while True:
+                try:
+                    response = HttpFetcher.get(status_url, headers=WORKER_HEADERS, timeout=30)
+                    if response.status_code == 404:
+                        raise WorkerUnavailable(f"Worker lost job {job_id} (restarted?)")
+                    if response.status_code != 200:
+                        raise ConnectionError(_describe(response))
+                    job = response.json()
+                    failures = 0
+                    if job["status"] == "completed":
+                        return job["result"]
+                    if job["status"] == "failed":
+                        raise WorkerError(f"Worker job failed: {job.get('error')}")
+                except (ConnectionError, OSError, ValueError) as e:
+                    # Includes requests' connection errors; a blip costs one poll, not the job
+                    failures += 1
+                    print(f"Polling worker job {job_id} failed ({failures}/{MAX_POLL_FAILURES}): {e}")
+                    if failures >= MAX_POLL_FAILURES:
+                        raise WorkerUnavailable(f"Worker unreachable while polling job {job_id}")
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise WorkerError(f"Worker job {job_id} did not finish within {timeout:.0f}s")
+                event.wait(min(settings.WORKER_POLL_INTERVAL, remaining))
+                event.clear()
+        finally:
+            with _waiters_lock:
+                _waiters.pop(job_id, None)
+
+    @staticmethod
+    def _run(submit, run_sync) -> Dict:
+        """Submit to the best available worker, moving on while workers refuse the job."""
+        tried = set()
+        while True:
+            worker: Optional[WorkerState] = WorkerPool.acquire(exclude=tried)
+            if worker is None:
+                raise WorkerUnavailable("No transcription worker available")
+            tried.add(worker.base_url)
+            try:
+                try:
+                    job_id = submit(worker.base_url)
+                except WorkerBusy as e:
+                    print(f"{worker.base_url}: {e}")
+                    continue
+                except WorkerUnavailable as e:
+                    print(f"{worker.base_url}: {e}")
+                    WorkerPool.record_failure(worker)
+                    continue
+
+                if job_id:
+                    print(f"Worker job {job_id} queued on {worker.base_url}")
+                    result = WorkerClient.wait(worker.base_url, job_id)
+                else:
+                    print(f"{worker.base_url} has no job API, using its synchronous endpoint")
+                    result = run_sync(worker.base_url)
+                WorkerPool.record_success(worker)
+                return result
+            except WorkerUnavailable:
+                # The job was accepted but the worker went away; it is not resubmitted
+                WorkerPool.record_failure(worker)
+                raise
+            finally:
+                WorkerPool.release(worker)
+
+    @staticmethod
+    def transcribe_url(url: str) -> Dict:
+        """Transcribe a video URL on a worker: {"method", "transcript", "title"}."""
+        def run_sync(base_url: str) -> Dict:
+            response = HttpFetcher.session().post(f"{base_url}/transcribe", json={"url": url},
+                                                  headers=WORKER_HEADERS, timeout=300)
+            if response.status_code != 200:
+                raise WorkerError(f"Worker failed, {_describe(response)}")
+            return response.json()
+
+        return WorkerClient._run(lambda base_url: WorkerClient.submit_url(base_url, url), run_sync)
+
+    @staticmethod
+    def transcribe_file(file_path: str, filename: str, content_type: str) -> Dict:
+        """Transcribe an audio/video file on a worker: {"method", "transcript", "title"}."""
+        def run_sync(base_url: str) -> Dict:
+            import httpx
+
+            with open(file_path, 'rb') as upload:
+                files = {'file': (filename, upload, content_type)}
+                response = httpx.post(f"{base_url}/transcribe-file", files=files,
+                                      headers=WORKER_HEADERS, timeout=600)
+            if response.status_code != 200:
+                raise WorkerError(f"Worker failed, {_describe(response)}")
+            return response.json()
+
+        return WorkerClient._run(
+            lambda base_url: WorkerClient.submit_file(base_url, file_path, filename, content_type), run_sync)
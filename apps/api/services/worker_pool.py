@@ -0,0 +1,185 @@
+"""Pool of transcription workers with health probing and circuit breaking.
+
+Workers come from WORKER_URLS (comma-separated), or from the single legacy
+WORKER_URL when that is set in the environment. A daemon thread probes each
+worker's /health every WORKER_HEALTH_INTERVAL seconds, recording whether it
+is up and how many jobs it reports. Jobs go to the reachable worker with the
+least outstanding work. That is the larger of its last reported load and
+the jobs this process currently has on it.
+
+Failures from probes, submissions or polls count against a worker. After
+WORKER_CIRCUIT_FAILURES in a row its circuit opens and it gets no traffic
+for WORKER_CIRCUIT_COOLDOWN seconds. After that it is half-open. One
+success closes the circuit, while one more failure opens it again.
+
+When no worker is available, callers fall back to local Whisper at once
+instead of waiting on a dead endpoint's timeout.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import settings
+from .http_fetch import HttpFetcher
+
+_lock = threading.Lock()
+_workers: Dict[str, "WorkerState"] = {}
+_prober: Optional[threading.Thread] = None
+_first_probe = threading.Event()
+
+
+class WorkerState:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.healthy = False
+        self.probed = False
+        self.reported_jobs = 0
+        self.capacity = 1
+        self.outstanding = 0
+        self.failures = 0
+        self.open_until = 0.0
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self.open_until
+
+    @property
+    def load(self) -> float:
+        return max(self.reported_jobs, self.outstanding) / max(self.capacity, 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            "url": self.base_url,
+            "healthy": self.healthy,
+            "circuit_open": self.circuit_open,
+            "reported_jobs": self.reported_jobs,
+            "capacity": self.capacity,
+            "outstanding": self.outstanding,
+            "failures": self.failures,
+        }
+
+
+def _base_url(worker_url: str) -> str:
+    """Worker URLs may point at the legacy /transcribe endpoint; the pool uses the host root."""
+    worker_url = worker_url.strip().rstrip('/')
+    if worker_url.endswith('/transcribe'):
+        worker_url = worker_url[:-len('/transcribe')]
+    return worker_url
+
+
+class WorkerPool:
+    @staticmethod
+    def configured_urls() -> List[str]:
+        urls = settings.WORKER_URLS or os.environ.get("WORKER_URL", "")
+        return [_base_url(url) for url in urls.split(',') if url.strip()]
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(WorkerPool.configured_urls())
+
+    @staticmethod
+    def _ensure_started():
+        global _prober
+        first_run = False
+        with _lock:
+            for url in WorkerPool.configured_urls():
+                if url not in _workers:
+                    _workers[url] = WorkerState(url)
+            if _prober is None:
+                _prober = threading.Thread(target=WorkerPool._probe_loop, name="worker-health", daemon=True)
+                _prober.start()
+                first_run = True
+        if first_run:
+            # Route the very first jobs with fresh health data rather than blindly
+            WorkerPool.probe_all()
+            _first_probe.set()
+        else:
+            _first_probe.wait(settings.WORKER_HEALTH_TIMEOUT + 1)
+
+    @staticmethod
+    def _probe_loop():
+        while True:
+            time.sleep(settings.WORKER_HEALTH_INTERVAL)
+            try:
+                WorkerPool.probe_all()
+            except Exception as e:
+                print(f"Worker health probing failed: {e}")
+
+    @staticmethod
+    def probe(worker: WorkerState):
+        try:
+            response = HttpFetcher.get(f"{worker.base_url}/health", timeout=settings.WORKER_HEALTH_TIMEOUT)
+            if response.status_code != 200:
+                raise ConnectionError(f"/health returned {response.status_code}")
+            health = response.json()
+        except Exception as e:
+            was_healthy = worker.healthy or not worker.probed
+            worker.probed = True
+            worker.healthy = False
+            WorkerPool.record_failure(worker)
+            if was_healthy:
+                print(f"Worker {worker.base_url} is down: {e}")
+            return
+
+        if not worker.healthy:
+            print(f"Worker {worker.base_url} is up")
+        worker.probed = True
+        worker.healthy = True
+        # Older workers report no load; they are then balanced on our own outstanding count
+        worker.reported_jobs = int(health.get("active_jobs", 0))
+        worker.capacity = int(health.get("max_jobs", 1))
+        WorkerPool.record_success(worker)
+
+    @staticmethod
+    def probe_all():
+        with _lock:
+            workers = list(_workers.values())
+        if not workers:
+            return
+        with ThreadPoolExecutor(max_workers=len(workers)) as executor:
+            list(executor.map(WorkerPool.probe, workers))
+
+    @staticmethod
+    def acquire(exclude: Optional[set] = None) -> Optional[WorkerState]:
+        """Reserve the least-loaded available worker, or None if there is none."""
+        WorkerPool._ensure_started()
+        with _lock:
+            candidates = [
+                w for w in _workers.values()
+                if w.healthy and not w.circuit_open and w.base_url not in (exclude or ())
+            ]
+            if not candidates:
+                return None
+            worker = min(candidates, key=lambda w: (w.load, w.failures))
+            worker.outstanding += 1
+            return worker
+
+    @staticmethod
+    def release(worker: WorkerState):
+        with _lock:
+            worker.outstanding = max(0, worker.outstanding - 1)
+
+    @staticmethod
+    def record_success(worker: WorkerState):
+        with _lock:
+            # An open circuit stays open for the whole cooldown
+            if worker.circuit_open:
+                return
+            worker.failures = 0
+            worker.open_until = 0.0
+
+    @staticmethod
+    def record_failure(worker: WorkerState):
+        with _lock:
+            worker.failures += 1
+            if worker.failures >= settings.WORKER_CIRCUIT_FAILURES and not worker.circuit_open:
+                worker.open_until = time.monotonic() + settings.WORKER_CIRCUIT_COOLDOWN
+                print(f"Circuit opened for worker {worker.base_url} after {worker.failures} failures")
+
+    @staticmethod
+    def status() -> List[Dict]:
+        with _lock:
+            return [w.to_dict() for w in _workers.values()]
@@ -2,16 +2,13 @@ import subprocess
 import tempfile
 import glob
 import os
-import math
-import time
-import httpx
-from typing import List, Dict, Optional
-from openai import OpenAI
+from typing import Dict, Optional
 from youtube_transcript_api import YouTubeTranscriptApi
 import re
-from config import settings
-
-import requests
+from services.audio import AudioChunker
+from services.transcription import TranscriptionService
+from services.worker_client import WorkerClient
+from services.worker_pool import WorkerPool
 
 class YtDlpService:
     @staticmethod
@@ -29,150 +26,34 @@ class YtDlpService:
                 return match.group(1)
         return None
 
-    @staticmethod
-    def split_audio_ffmpeg(audio_file: str, max_size: int = 20*1024*1024) -> List[str]:
-        """Split audio file into chunks smaller than max_size bytes"""
-        file_size = os.path.getsize(audio_file)
-        if file_size <= max_size:
-            return [audio_file]
-        
-        # Check if ffmpeg is available
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            print("ffmpeg not available, returning original file")
-            return [audio_file]
-        
-        # Get duration in seconds
-        result = subprocess.run(
-            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of',
-             'default=noprint_wrappers=1:nokey=1', audio_file],
-            capture_output=True, text=True
-        )
-        
-        if result.returncode != 0:
-            print(f"Error getting duration: {result.stderr}")
-            return [audio_file]
-        
-        try:
-            duration = float(result.stdout.strip())
-        except ValueError:
-            print(f"Could not parse duration: {result.stdout}")
-            return [audio_file]
-        
-        # Calculate number of chunks needed
-        num_chunks = math.ceil(file_size / max_size)
-        chunk_duration = duration / num_chunks
-        
-        chunk_paths = []
-        base_name = os.path.splitext(audio_file)[0]
-        
-        for i in range(num_chunks):
-            start_time = i * chunk_duration
-            end_time = min((i + 1) * chunk_duration, duration)
-            chunk_path = f"{base_name}_chunk_{i:03d}.mp3"
-            
-            cmd = [
-                'ffmpeg', '-y', '-i', audio_file,
-                '-ss', str(start_time),
-                '-t', str(end_time - start_time),
-                '-acodec', 'libmp3lame',
-                '-ar', '16000',
-                '-ac', '1',
-                '-b:a', '128k',
-                chunk_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-            if result.returncode == 0 and os.path.exists(chunk_path):
-                chunk_paths.append(chunk_path)
-            else:
-                print(f"Error creating chunk {i}: {result.stderr}")
-        
-        return chunk_paths if chunk_paths else [audio_file]
-
-    @staticmethod
-    def transcribe_with_retry(client: OpenAI, audio_file_path: str, max_retries: int = 3, model: str = "whisper-1") -> str:
-        """Transcribe audio file with retry logic"""
-        for attempt in range(max_retries):
-            try:
-                with open(audio_file_path, "rb") as audio_file:
-                    transcript = client.audio.transcriptions.create(
-                        model=model,
-                        file=audio_file,
-                        response_format="text"
-                    )
-                    return transcript
-            except Exception as e:
-                # Quota errors won't resolve with retries — fail fast so caller can switch provider
-                if "429" in str(e) or "insufficient_quota" in str(e):
-                    raise e
-                print(f"Transcription attempt {attempt + 1} failed: {str(e)}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    raise e
-
-        # This should never be reached, but just in case
-        raise RuntimeError("All transcription attempts failed")
-
     @staticmethod
     def process_video(url: str) -> Dict[str, any]:
         """Process video URL using yt-dlp to get transcript or audio"""
         print(f"Starting yt-dlp processing for URL: {url}")
         
-        # DEBUG: Check env var
-        worker_url = os.environ.get("WORKER_URL")
-        print(f"DEBUG: WORKER_URL env var = '{worker_url}'")
-
-        # Check for WORKER_URL to offload processing
-        if worker_url:
+        # Offload to the worker pool when one is configured (WORKER_URLS / WORKER_URL)
+        if WorkerPool.enabled():
             print(f"Attempting to offload processing to worker...")
             try:
-                # Add headers to bypass ngrok warning
-                # Try a standard value for the skip header
-                headers = {
-                    "ngrok-skip-browser-warning": "69420",
-                    "User-Agent": "vibeknowing-backend",
-                    "Content-Type": "application/json"
+                # Submitted as a worker job and polled, so no connection is held for the whole transcription
+                data = WorkerClient.transcribe_url(url)
+                print("Worker processing successful!")
+
+                # Determine default title based on URL type
+                default_title = "Video"
+                if 'youtube.com' in url or 'youtu.be' in url:
+                    default_title = "YouTube Video"
+                elif 'instagram.com' in url:
+                    default_title = "Instagram Reel"
+                elif 'ted.com' in url:
+                    default_title = "TED Talk"
+
+                return {
+                    "success": True,
+                    "method": f"worker_{data.get('method', 'unknown')}",
+                    "content": data.get("transcript", ""),
+                    "title": data.get("title", default_title)
                 }
-                response = requests.post(worker_url, json={"url": url}, headers=headers, timeout=300)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    print("Worker processing successful!")
-                    
-                    # Determine default title based on URL type
-                    default_title = "Video"
-                    if 'youtube.com' in url or 'youtu.be' in url:
-                        default_title = "YouTube Video"
-                    elif 'instagram.com' in url:
-                        default_title = "Instagram Reel"
-                    elif 'ted.com' in url:
-                        default_title = "TED Talk"
-                    
-                    return {
-                        "success": True,
-                        "method": f"worker_{data.get('method', 'unknown')}",
-                        "content": data.get("transcript", ""),
-                        "title": data.get("title", default_title)
-                    }
-                else:
-                    # Log the full response for debugging
-                    print(f"Worker failed with status {response.status_code}")
-                    
-                    # Try to extract page title to see what the error is
-                    error_title = "Unknown Error"
-                    try:
-                        match = re.search(r'<title>(.*?)</title>', response.text, re.IGNORECASE)
-                        if match:
-                            error_title = match.group(1)
-                    except:
-                        pass
-                        
-                    print(f"Worker Error Page Title: {error_title}")
-                    print(f"Worker response content: {response.text[:1000]}") 
-                    print("Falling back to local processing...")
             except Exception as e:
                 print(f"Worker request failed with error: {str(e)}")
                 print("Falling back to local processing...")
@@ -314,16 +195,10 @@ class YtDlpService:
                 # 2. Fallback: download audio and transcribe with Whisper (OpenAI → Groq fallback)
                 print("No subtitles found, falling back to audio transcription...")
 
-                if settings.OPENAI_API_KEY:
-                    print("Using OpenAI Whisper for transcription (will fall back to Groq on quota error)")
-                    client = OpenAI(api_key=settings.OPENAI_API_KEY, http_client=httpx.Client())
-                    whisper_model = "whisper-1"
-                elif settings.GROQ_API_KEY:
-                    print("No OpenAI key — using Groq Whisper for transcription")
-                    client = OpenAI(api_key=settings.GROQ_API_KEY, base_url="https://api.groq.com/openai/v1", http_client=httpx.Client())
-                    whisper_model = "whisper-large-v3-turbo"
-                else:
-                    return {"success": False, "error": "Audio transcription requires an OpenAI or Groq API key."}
+                try:
+                    transcriber = TranscriptionService()
+                except ValueError as e:
+                    return {"success": False, "error": str(e)}
                 
                 cmd = [
                     "yt-dlp",
@@ -355,32 +230,15 @@ class YtDlpService:
                     title = os.path.splitext(os.path.basename(audio_file_path))[0]
                     print(f"Processing audio file: {audio_file_path}")
                     
-                    # Split audio if needed (20MB chunks for safety)
-                    max_size = 20 * 1024 * 1024
-                    chunk_paths = YtDlpService.split_audio_ffmpeg(audio_file_path, max_size)
+                    # Split audio into Whisper-sized chunks (single ffmpeg pass)
+                    chunk_paths = AudioChunker.split_for_whisper(audio_file_path, output_dir=temp_dir)
                     print(f"Split into {len(chunk_paths)} chunks")
                     
-                    full_transcript = ""
-                    for i, chunk_path in enumerate(chunk_paths):
-                        print(f"Transcribing chunk {i+1}/{len(chunk_paths)}: {chunk_path}")
-                        try:
-                            transcript = YtDlpService.transcribe_with_retry(client, chunk_path, model=whisper_model)
-                            full_transcript += transcript + "\n"
-                        except Exception as e:
-                            # If OpenAI quota exceeded, fall back to Groq for this and remaining chunks
-                            if ("429" in str(e) or "insufficient_quota" in str(e)) and settings.GROQ_API_KEY and whisper_model != "whisper-large-v3-turbo":
-                                print(f"OpenAI quota exceeded on chunk {i+1}, switching to Groq for remaining chunks...")
-                                client = OpenAI(api_key=settings.GROQ_API_KEY, base_url="https://api.groq.com/openai/v1", http_client=httpx.Client())
-                                whisper_model = "whisper-large-v3-turbo"
-                                try:
-                                    transcript = YtDlpService.transcribe_with_retry(client, chunk_path, model=whisper_model)
-                                    full_transcript += transcript + "\n"
-                                except Exception as e2:
-                                    print(f"Groq also failed for chunk {i+1}: {str(e2)}")
-                            else:
-                                print(f"Failed to transcribe chunk {i+1}: {str(e)}")
-                            # Continue with other chunks
-                        
+                    # Chunks are transcribed concurrently and reassembled in order
+                    transcripts = transcriber.transcribe_chunks(chunk_paths)
+                    full_transcript = "\n".join(t for t in transcripts if t)
+
+                    for chunk_path in chunk_paths:
                         # Clean up chunk file if it's not the original
                         if chunk_path != audio_file_path and os.path.exists(chunk_path):
                             os.remove(chunk_path)
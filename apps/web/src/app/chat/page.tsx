@@ -24,6 +24,7 @@ export default function GlobalChatPage() {
     const [isLoading, setIsLoading] = useState(false);
     const [categories, setCategories] = useState<Category[]>([]);
     const [selectedPathId, setSelectedPathId] = useState<string | null>(null); // null = global
+    const [olderCursor, setOlderCursor] = useState<string | null>(null); // page before the oldest loaded message
     const messagesEndRef = useRef<HTMLDivElement>(null);
 
     const suggestions = [
@@ -55,27 +56,32 @@ export default function GlobalChatPage() {
         }
     };
 
+    const historyUrl = () => selectedPathId
+        ? `${API_BASE}/ai/chat/history-path/${selectedPathId}`
+        : `${API_BASE}/ai/chat/history-global`;
+
+    const toMessages = (history: any[]): Message[] => history.map((msg: any) => ({
+        id: msg.id || uuidv4(),
+        role: msg.role,
+        content: msg.content,
+        timestamp: msg.created_at ? new Date(msg.created_at) : new Date(),
+        metadata: msg.metadata // Backend might return metadata for citations too
+    }));
+
     const loadHistory = async () => {
         try {
             const headers = buildAIHeaders();
-            const url = selectedPathId 
-                ? `${API_BASE}/ai/chat/history-path/${selectedPathId}`
-                : `${API_BASE}/ai/chat/history-global`;
 
             // Reset messages before loading new context to prevent layout shift
             setMessages([]);
+            setOlderCursor(null);
 
-            const response = await fetch(url, { headers });
+            const response = await fetch(historyUrl(), { headers });
             if (response.ok) {
                 const history = await response.json();
                 if (Array.isArray(history)) {
-                    setMessages(history.map((msg: any) => ({
-                        id: uuidv4(),
-                        role: msg.role,
-                        content: msg.content,
-                        timestamp: msg.created_at ? new Date(msg.created_at) : new Date(),
-                        metadata: msg.metadata // Backend might return metadata for citations too
-                    })));
+                    setMessages(toMessages(history));
+                    setOlderCursor(response.headers.get("X-Prev-Cursor"));
                 }
             } else {
                 console.error("Chat history fetch failed with status:", response.status);
@@ -85,6 +91,20 @@ export default function GlobalChatPage() {
         }
     };
 
+    const loadEarlier = async () => {
+        if (!olderCursor) return;
+        try {
+            const response = await fetch(`${historyUrl()}?before=${encodeURIComponent(olderCursor)}`, { headers: buildAIHeaders() });
+            if (response.ok) {
+                const history = await response.json();
+                setMessages((prev) => [...toMessages(history), ...prev]);
+                setOlderCursor(response.headers.get("X-Prev-Cursor"));
+            }
+        } catch (error) {
+            console.error("Failed to load earlier messages:", error);
+        }
+    };
+
     const buildHeaders = (): Record<string, string> => {
         const headers: Record<string, string> = { "Content-Type": "application/json" };
         const token = localStorage.getItem("token");
@@ -271,6 +291,16 @@ export default function GlobalChatPage() {
                     </div>
                 ) : (
                     <div className="space-y-10 pb-10">
+                        {olderCursor && (
+                            <div className="flex justify-center">
+                                <button
+                                    onClick={loadEarlier}
+                                    className="px-4 py-1.5 text-xs font-bold text-slate-500 dark:text-slate-400 rounded-full border border-slate-200 dark:border-white/10 hover:bg-slate-100 dark:hover:bg-white/5 transition-colors"
+                                >
+                                    Load earlier messages
+                                </button>
+                            </div>
+                        )}
                         {messages.map((m, i) => (
                             <div key={m.id} className={cn(
                                 "flex flex-col gap-3 animate-in fade-in slide-in-from-bottom-2 duration-300",
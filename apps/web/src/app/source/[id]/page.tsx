@@ -124,6 +124,18 @@ export default function SourcePage() {
             const headers: HeadersInit = {};
             if (token) headers['Authorization'] = `Bearer ${token}`;
 
+            // While processing, poll the lightweight status endpoint and only refetch the full source once it is done
+            if (isProcessing && source) {
+                const statusRes = await fetch(`${API_BASE}/sources/${params.id}/status`, { headers });
+                if (statusRes.ok) {
+                    const status = await statusRes.json();
+                    if (status.status === 'processing') {
+                        setTimeout(loadSource, 3000);
+                        return;
+                    }
+                }
+            }
+
             const response = await fetch(`${API_BASE}/sources/${params.id}`, { headers });
             if (response.ok) {
                 const data = await response.json();
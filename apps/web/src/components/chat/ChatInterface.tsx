@@ -25,6 +25,8 @@ interface ChatInterfaceProps {
 export function ChatInterface({ sourceId, initialMessage }: ChatInterfaceProps) {
     const [messages, setMessages] = useState<Message[]>([]);
     const [isLoading, setIsLoading] = useState(false);
+    // Cursor for the page before the oldest loaded message (null once it is all loaded)
+    const [olderCursor, setOlderCursor] = useState<string | null>(null);
 
     // Default suggestions
     const suggestions = [
@@ -38,23 +40,40 @@ export function ChatInterface({ sourceId, initialMessage }: ChatInterfaceProps)
         loadHistory();
     }, [sourceId]);
 
+    const toMessages = (history: any[]): Message[] => history.map((msg: any) => ({
+        id: msg.id || uuidv4(),
+        role: msg.role,
+        content: msg.content,
+        timestamp: msg.created_at ? new Date(msg.created_at) : new Date()
+    }));
+
     const loadHistory = async () => {
         try {
             const response = await fetch(`${API_BASE}/ai/chat/history/${sourceId}`);
             if (response.ok) {
                 const history = await response.json();
-                setMessages(history.map((msg: any) => ({
-                    id: uuidv4(),
-                    role: msg.role,
-                    content: msg.content,
-                    timestamp: new Date()
-                })));
+                setMessages(toMessages(history));
+                setOlderCursor(response.headers.get("X-Prev-Cursor"));
             }
         } catch (error) {
             console.error("Failed to load chat history:", error);
         }
     };
 
+    const loadEarlier = async () => {
+        if (!olderCursor) return;
+        try {
+            const response = await fetch(`${API_BASE}/ai/chat/history/${sourceId}?before=${encodeURIComponent(olderCursor)}`);
+            if (response.ok) {
+                const history = await response.json();
+                setMessages((prev) => [...toMessages(history), ...prev]);
+                setOlderCursor(response.headers.get("X-Prev-Cursor"));
+            }
+        } catch (error) {
+            console.error("Failed to load earlier messages:", error);
+        }
+    };
+
     const handleSend = async (content: string) => {
         const userMessage: Message = {
             id: uuidv4(),
@@ -160,6 +179,14 @@ export function ChatInterface({ sourceId, initialMessage }: ChatInterfaceProps)
                 variants={fadeUp}
                 className="flex-1 flex flex-col min-h-0"
             >
+                {olderCursor && (
+                    <button
+                        onClick={loadEarlier}
+                        className="mx-auto mt-3 px-4 py-1.5 text-xs font-bold text-slate-500 dark:text-slate-400 rounded-full border border-slate-200 dark:border-white/10 hover:bg-slate-100 dark:hover:bg-white/5 transition-colors"
+                    >
+                        Load earlier messages
+                    </button>
+                )}
                 <MessageList messages={messages} isLoading={isLoading} />
             </motion.div>
             
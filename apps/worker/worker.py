@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 import subprocess
 import tempfile
@@ -6,15 +6,33 @@ import glob
 import os
 from openai import OpenAI
 import shutil
-import math
+import sys
 import time
-from typing import List
+import threading
+import uuid
+import httpx
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+# Audio chunking is shared with the API (apps/api/services/audio.py), so the
+# worker must run from a checkout of the repository.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "api"))
+from services.audio import AudioChunker
 
 app = FastAPI()
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "service": "VibeKnowing Worker"}
+    # Load figures let the API's worker pool route to the least busy worker
+    active = sum(1 for job in list(jobs.values()) if job["status"] in ("queued", "running"))
+    return {
+        "status": "healthy",
+        "service": "VibeKnowing Worker",
+        "active_jobs": active,
+        "max_jobs": WORKER_MAX_JOBS,
+        "max_queued_jobs": WORKER_MAX_QUEUED_JOBS,
+    }
 
 # Get OpenAI API key from environment variable or hardcoded value
 # PASTE YOUR API KEY HERE IF RUNNING LOCALLY WITHOUT ENV VARS
@@ -25,70 +43,12 @@ if not OPENAI_API_KEY:
     raise ValueError("OPENAI_API_KEY is required. Please set OPENAI_API_KEY_HARDCODED in worker.py or use environment variable.")
 client = OpenAI(api_key=OPENAI_API_KEY, timeout=300.0)  # 5 minute timeout
 
+# Number of Whisper requests in flight per transcription job
+WHISPER_MAX_CONCURRENCY = int(os.getenv("WHISPER_MAX_CONCURRENCY", "4"))
+
 class VideoRequest(BaseModel):
     url: str
 
-def split_audio_ffmpeg(audio_file: str, max_size: int = 20*1024*1024) -> List[str]:
-    """Split audio file into chunks smaller than max_size bytes"""
-    file_size = os.path.getsize(audio_file)
-    if file_size <= max_size:
-        return [audio_file]
-    
-    # Check if ffmpeg is available
-    try:
-        subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print("ffmpeg not available, returning original file")
-        return [audio_file]
-    
-    # Get duration in seconds
-    result = subprocess.run(
-        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of',
-         'default=noprint_wrappers=1:nokey=1', audio_file],
-        capture_output=True, text=True
-    )
-    
-    if result.returncode != 0:
-        print(f"Error getting duration: {result.stderr}")
-        return [audio_file]
-    
-    try:
-        duration = float(result.stdout.strip())
-    except ValueError:
-        print(f"Could not parse duration: {result.stdout}")
-        return [audio_file]
-    
-    # Calculate number of chunks needed
-    num_chunks = math.ceil(file_size / max_size)
-    chunk_duration = duration / num_chunks
-    
-    chunk_paths = []
-    base_name = os.path.splitext(audio_file)[0]
-    
-    for i in range(num_chunks):
-        start_time = i * chunk_duration
-        end_time = min((i + 1) * chunk_duration, duration)
-        chunk_path = f"{base_name}_chunk_{i:03d}.mp3"
-        
-        cmd = [
-            'ffmpeg', '-y', '-i', audio_file,
-            '-ss', str(start_time),
-            '-t', str(end_time - start_time),
-            '-acodec', 'libmp3lame',
-            '-ar', '16000',
-            '-ac', '1',
-            '-b:a', '128k',
-            chunk_path
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-        if result.returncode == 0 and os.path.exists(chunk_path):
-            chunk_paths.append(chunk_path)
-        else:
-            print(f"Error creating chunk {i}: {result.stderr}")
-    
-    return chunk_paths if chunk_paths else [audio_file]
-
 def transcribe_with_retry(audio_file_path: str, max_retries: int = 3) -> str:
     """Transcribe audio file with retry logic"""
     for attempt in range(max_retries):
@@ -110,6 +70,21 @@ def transcribe_with_retry(audio_file_path: str, max_retries: int = 3) -> str:
     # This should never be reached, but just in case
     raise RuntimeError("All transcription attempts failed")
 
+def transcribe_chunks(chunk_paths: List[str]) -> str:
+    """Transcribe chunks concurrently and join the results in chunk order"""
+    def run(index: int, chunk_path: str) -> Optional[str]:
+        print(f"Transcribing chunk {index+1}/{len(chunk_paths)}: {chunk_path}")
+        try:
+            return transcribe_with_retry(chunk_path)
+        except Exception as e:
+            print(f"Failed to transcribe chunk {index+1}: {str(e)}")
+            return None
+
+    workers = max(1, min(len(chunk_paths), WHISPER_MAX_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        transcripts = list(executor.map(run, range(len(chunk_paths)), chunk_paths))
+    return "\n".join(t for t in transcripts if t)
+
 @app.post("/transcribe")
 def transcribe_video(req: VideoRequest):
     url = req.url
@@ -222,21 +197,12 @@ def transcribe_video(req: VideoRequest):
                 audio_file_path = audio_files[0]
                 print(f"Processing audio file: {audio_file_path}")
                 
-                # Split audio if needed (20MB chunks for safety)
-                max_size = 20 * 1024 * 1024
-                chunk_paths = split_audio_ffmpeg(audio_file_path, max_size)
+                # Split audio into Whisper-sized chunks (single ffmpeg pass)
+                chunk_paths = AudioChunker.split_for_whisper(audio_file_path, output_dir=temp_dir)
                 print(f"Split into {len(chunk_paths)} chunks")
                 
-                full_transcript = ""
-                for i, chunk_path in enumerate(chunk_paths):
-                    print(f"Transcribing chunk {i+1}/{len(chunk_paths)}: {chunk_path}")
-                    try:
-                        transcript = transcribe_with_retry(chunk_path)
-                        full_transcript += transcript + "\n"
-                    except Exception as e:
-                        print(f"Failed to transcribe chunk {i+1}: {str(e)}")
-                        # Continue with other chunks
-                    
+                full_transcript = transcribe_chunks(chunk_paths)
+                for chunk_path in chunk_paths:
                     # Clean up chunk file if it's not the original
                     if chunk_path != audio_file_path and os.path.exists(chunk_path):
                         os.remove(chunk_path)
@@ -271,83 +237,189 @@ def transcribe_video(req: VideoRequest):
         print(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+ALLOWED_UPLOAD_TYPES = [
+    'video/mp4', 'video/webm', 'video/quicktime', 'video/x-msvideo',
+    'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav', 'audio/mp4', 'audio/m4a',
+    'audio/x-m4a', 'audio/ogg', 'audio/webm'
+]
+
+def transcribe_saved_file(temp_file_path: str, filename: str) -> dict:
+    """Transcribe an uploaded file already saved to disk (chunks go next to it)"""
+    temp_dir = os.path.dirname(temp_file_path)
+    print(f"Saved file to: {temp_file_path}, size: {os.path.getsize(temp_file_path)} bytes")
+
+    # Extract 16 kHz mono audio and split it into Whisper-sized chunks in one ffmpeg pass
+    try:
+        chunk_paths = AudioChunker.split_for_whisper(temp_file_path, output_dir=temp_dir, always_transcode=True)
+    except Exception as e:
+        print(f"Audio extraction failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to extract audio from file")
+    print(f"Split into {len(chunk_paths)} chunks")
+
+    full_transcript = transcribe_chunks(chunk_paths)
+    for chunk_path in chunk_paths:
+        # Clean up chunk file if it's not the original
+        if chunk_path != temp_file_path and os.path.exists(chunk_path):
+            os.remove(chunk_path)
+
+    if full_transcript.strip():
+        # Extract title from filename (remove extension)
+        title = os.path.splitext(filename)[0]
+        return {"method": "file_upload", "transcript": full_transcript.strip(), "title": title}
+    raise HTTPException(status_code=500, detail="Failed to transcribe any audio chunks")
+
+def save_upload(file: UploadFile, temp_dir: str) -> str:
+    """Stream an upload into temp_dir without holding it in memory"""
+    file_ext = os.path.splitext(file.filename or '')[1] or '.mp4'
+    temp_file_path = f"{temp_dir}/uploaded{file_ext}"
+    with open(temp_file_path, "wb") as f:
+        shutil.copyfileobj(file.file, f, 1024 * 1024)
+    return temp_file_path
+
 @app.post("/transcribe-file")
-async def transcribe_file(file: UploadFile = File(...)):
+def transcribe_file(file: UploadFile = File(...)):
     """Transcribe uploaded video or audio file"""
     print(f"Received file upload: {file.filename}, content_type: {file.content_type}")
     
     # Validate file type
-    allowed_types = [
-        'video/mp4', 'video/webm', 'video/quicktime', 'video/x-msvideo',
-        'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav', 'audio/mp4', 'audio/m4a',
-        'audio/x-m4a', 'audio/ogg', 'audio/webm'
-    ]
-    
-    if file.content_type not in allowed_types:
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
         print(f"Unsupported file type: {file.content_type}")
         raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.content_type}")
     
     try:
         with tempfile.TemporaryDirectory() as temp_dir:
-            # Save uploaded file
-            file_ext = os.path.splitext(file.filename)[1] or '.mp4'
-            temp_file_path = f"{temp_dir}/uploaded{file_ext}"
-            
-            with open(temp_file_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-            
-            print(f"Saved file to: {temp_file_path}, size: {os.path.getsize(temp_file_path)} bytes")
-            
-            # Extract audio from video if needed
-            audio_file_path = f"{temp_dir}/audio.mp3"
-            cmd = [
-                'ffmpeg', '-y', '-i', temp_file_path,
-                '-vn',  # No video
-                '-acodec', 'libmp3lame',
-                '-ar', '16000',
-                '-ac', '1',
-                '-b:a', '128k',
-                audio_file_path
-            ]
-            
-            print(f"Extracting audio: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-            
-            if result.returncode != 0 or not os.path.exists(audio_file_path):
-                print(f"Audio extraction failed: {result.stderr}")
-                raise HTTPException(status_code=500, detail="Failed to extract audio from file")
-            
-            print(f"Audio extracted: {audio_file_path}, size: {os.path.getsize(audio_file_path)} bytes")
-            
-            # Split audio if needed (20MB chunks for safety)
-            max_size = 20 * 1024 * 1024
-            chunk_paths = split_audio_ffmpeg(audio_file_path, max_size)
-            print(f"Split into {len(chunk_paths)} chunks")
-            
-            full_transcript = ""
-            for i, chunk_path in enumerate(chunk_paths):
-                print(f"Transcribing chunk {i+1}/{len(chunk_paths)}: {chunk_path}")
-                try:
-                    transcript = transcribe_with_retry(chunk_path)
-                    full_transcript += transcript + "\n"
-                except Exception as e:
-                    print(f"Failed to transcribe chunk {i+1}: {str(e)}")
-                    # Continue with other chunks
-                
-                # Clean up chunk file if it's not the original
-                if chunk_path != audio_file_path and os.path.exists(chunk_path):
-                    os.remove(chunk_path)
-            
-            if full_transcript.strip():
-                # Extract title from filename (remove extension)
-                title = os.path.splitext(file.filename)[0]
-                return {"method": "file_upload", "transcript": full_transcript.strip(), "title": title}
-            else:
-                raise HTTPException(status_code=500, detail="Failed to transcribe any audio chunks")
-                
+            return transcribe_saved_file(save_upload(file, temp_dir), file.filename)
     except Exception as e:
         print(f"Error in transcribe_file: {str(e)}")
         import traceback
         print(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+# --- Asynchronous jobs ---
+# Submissions return a job id immediately; the transcription runs on a bounded
+# pool and the caller polls GET /jobs/{job_id} (or receives a callback), so a
+# dropped connection no longer throws away a finished transcription.
+
+# Transcriptions running at once (each uses up to WHISPER_MAX_CONCURRENCY Whisper requests)
+WORKER_MAX_JOBS = int(os.getenv("WORKER_MAX_JOBS", "2"))
+# Queued + running jobs accepted before new submissions get a 503
+WORKER_MAX_QUEUED_JOBS = int(os.getenv("WORKER_MAX_QUEUED_JOBS", "8"))
+# Finished jobs are kept this long for polling
+WORKER_JOB_TTL_SECONDS = int(os.getenv("WORKER_JOB_TTL_SECONDS", "3600"))
+# Sent as X-Worker-Token with completion callbacks
+WORKER_CALLBACK_TOKEN = os.getenv("WORKER_CALLBACK_TOKEN", "")
+
+job_executor = ThreadPoolExecutor(max_workers=WORKER_MAX_JOBS, thread_name_prefix="transcribe-job")
+jobs: Dict[str, dict] = {}
+jobs_lock = threading.Lock()
+
+class TranscribeJobRequest(BaseModel):
+    url: str
+    callback_url: Optional[str] = None
+
+def job_view(job: dict) -> dict:
+    return {k: v for k, v in job.items() if k != "callback_url"}
+
+def prune_jobs():
+    cutoff = time.time() - WORKER_JOB_TTL_SECONDS
+    with jobs_lock:
+        for job_id in [j for j, job in jobs.items() if job.get("finished_at") and job["finished_at"] < cutoff]:
+            del jobs[job_id]
+
+def create_job(kind: str, callback_url: Optional[str]) -> dict:
+    prune_jobs()
+    with jobs_lock:
+        active = sum(1 for job in jobs.values() if job["status"] in ("queued", "running"))
+        if active >= WORKER_MAX_QUEUED_JOBS:
+            raise HTTPException(status_code=503, detail="Transcription queue is full", headers={"Retry-After": "30"})
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "callback_url": callback_url,
+        }
+        jobs[job["job_id"]] = job
+    return job
+
+def send_callback(job: dict, max_retries: int = 3):
+    """POST the finished job to its callback_url; best effort, the job stays pollable"""
+    headers = {"X-Worker-Token": WORKER_CALLBACK_TOKEN} if WORKER_CALLBACK_TOKEN else {}
+    for attempt in range(max_retries):
+        try:
+            response = httpx.post(job["callback_url"], json=job_view(job), headers=headers, timeout=30)
+            if response.status_code < 500:
+                return
+            print(f"Callback for job {job['job_id']} returned {response.status_code}")
+        except Exception as e:
+            print(f"Callback for job {job['job_id']} failed: {str(e)}")
+        if attempt < max_retries - 1:
+            time.sleep(2 ** attempt)
+
+def run_job(job: dict, work, cleanup_dir: Optional[str] = None):
+    job["status"] = "running"
+    job["started_at"] = time.time()
+    try:
+        job["result"] = work()
+        job["status"] = "completed"
+    except HTTPException as e:
+        job["error"] = e.detail
+        job["status"] = "failed"
+    except Exception as e:
+        job["error"] = str(e)
+        job["status"] = "failed"
+    finally:
+        job["finished_at"] = time.time()
+        if cleanup_dir:
+            shutil.rmtree(cleanup_dir, ignore_errors=True)
+    print(f"Job {job['job_id']} {job['status']} in {job['finished_at'] - job['started_at']:.1f}s")
+    if job["callback_url"]:
+        send_callback(job)
+
+@app.post("/jobs/transcribe", status_code=202)
+def submit_transcribe_job(req: TranscribeJobRequest):
+    job = create_job("url", req.callback_url)
+    job_executor.submit(run_job, job, lambda: transcribe_video(VideoRequest(url=req.url)))
+    print(f"Queued job {job['job_id']} for URL: {req.url}")
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+@app.post("/jobs/transcribe-file", status_code=202)
+def submit_transcribe_file_job(file: UploadFile = File(...), callback_url: Optional[str] = Form(None)):
+    if file.content_type not in ALLOWED_UPLOAD_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type: {file.content_type}")
+    job = create_job("file", callback_url)
+    # The upload outlives this request, so it goes to a directory the job removes when done
+    temp_dir = tempfile.mkdtemp(prefix="vk_job_")
+    try:
+        temp_file_path = save_upload(file, temp_dir)
+    except Exception as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        with jobs_lock:
+            jobs.pop(job["job_id"], None)
+        raise HTTPException(status_code=500, detail=f"Failed to save upload: {str(e)}")
+    filename = file.filename or "upload"
+    job_executor.submit(run_job, job, lambda: transcribe_saved_file(temp_file_path, filename), temp_dir)
+    print(f"Queued job {job['job_id']} for file: {filename}")
+    return {"job_id": job["job_id"], "status": job["status"]}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]